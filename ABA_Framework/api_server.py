@@ -0,0 +1,398 @@
+from helpers.aba import ABA
+from helpers.aba_generator import ABA_Generator, AttackLevel, ConvertTo
+from helpers.attack_matrix import Backend
+from helpers.jobs import Job
+from helpers.result_table import ResultTable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+
+# Operations exposed by the API, each endpoint /v1/<operation> calling the matching generator method
+OPERATIONS = {
+    "framework": ABA_Generator.create_aba_framework,
+    "atomic": ABA_Generator.convert_to_atomic,
+    "non_circular": ABA_Generator.convert_to_non_circular,
+    "arguments": ABA_Generator.create_arguments,
+    "attacks": ABA_Generator.create_attacks,
+    "normal_reverse_attacks": ABA_Generator.create_normal_reverse_attacks,
+}
+
+# Fields describing a framework, in the order expected by the generator methods
+FIELDS = ("language", "assumptions", "rules", "contraries", "preferences")
+
+# Options accepted by the operations building arguments, the other operations only accept the framework
+OPTIONS = {
+    "arguments": ("convert_to", "simplify"),
+    "attacks": ("convert_to", "simplify"),
+    "normal_reverse_attacks": ("convert_to", "simplify", "prune_assumptions", "backend", "level"),
+}
+
+MAX_BATCH = 1000
+MAX_BODY = 16 * 1024 * 1024
+DEFAULT_TIMEOUT = 60
+# Seconds a request waits for a free slot before writing the results computed meanwhile
+SLOT_WAIT = 0.1
+
+def framework_to_dict(aba: ABA, stats: bool = False) -> dict:
+    """
+    Converts a framework and the results computed for it into a dictionary that can be serialized as JSON.
+
+    Args:
+        aba (ABA): The framework to convert.
+        stats (bool): Whether to include the profiling statistics of the framework. Defaults to False.
+
+    Returns:
+        dict: The language, assumptions, rules, contraries and preferences of the framework, along with
+              one list of rows for each result computed, see ResultTable.
+    """
+    result = {
+        "language": sorted(aba.language),
+        "assumptions": sorted(aba.assumptions),
+        "rules": [{"head": rule.head, "body": [rule.body] if isinstance(rule.body, str) and rule.body else list(rule.body)}
+                  for rule in aba.rules],
+        "contraries": [{"assumption": contr.contrary, "contrary": contr.arg} for contr in aba.contraries],
+        "preferences": [{"least": pref.least, "most": pref.most} for pref in aba.preferences],
+    }
+    if aba.rule_mapping:
+        # The mapping is a dict keyed by the index of each rule, sent as a list in the order of the rules
+        result["rule_mapping"] = [aba.rule_mapping[i] for i in range(len(aba.rules))]
+    for name in ResultTable.available(aba):
+        result[name] = list(ResultTable(aba, name).rows())
+    if aba.inert_assumptions:
+        result["inert_assumptions"] = sorted(aba.inert_assumptions)
+    if stats:
+        result["stats"] = aba.stats.to_dict()
+    return result
+
+def parse_options(operation: str, item: dict) -> dict:
+    """
+    Reads the options of an operation from a request item.
+
+    Args:
+        operation (str): The operation requested.
+        item (dict): The framework and options sent for it.
+
+    Returns:
+        dict: The keyword arguments to pass to the generator method.
+
+    Raises:
+        ValueError: If an option is unknown or has an invalid value.
+    """
+    allowed = OPTIONS.get(operation, ())
+    unknown = set(item) - set(FIELDS) - set(allowed) - {"id", "stats", "timeout"}
+    if unknown:
+        raise ValueError(f"Unknown fields for {operation}: {', '.join(sorted(unknown))}")
+    kwargs = {}
+    try:
+        if item.get("convert_to") is not None:
+            kwargs["convert_to"] = ConvertTo(item["convert_to"])
+        if item.get("level") is not None:
+            kwargs["level"] = AttackLevel(item["level"])
+        if item.get("backend") is not None:
+            kwargs["backend"] = Backend(item["backend"])
+    except ValueError as e:
+        raise ValueError(f"Invalid option: {e}")
+    for flag in ("simplify", "prune_assumptions"):
+        if flag in item:
+            if not isinstance(item[flag], bool):
+                raise ValueError(f"Invalid option: {flag} must be true or false")
+            kwargs[flag] = item[flag]
+    return kwargs
+
+def run_operation(operation: str, item: dict, max_timeout: float) -> dict:
+    """
+    Computes an operation on one framework, run by a process of the worker pool. Errors are returned
+    instead of being raised so that a failing framework doesn't fail the whole batch.
+
+    Args:
+        operation (str): The operation requested.
+        item (dict): The framework and options sent for it.
+        max_timeout (float): The maximum number of seconds the computation may take.
+
+    Returns:
+        dict: The framework converted with framework_to_dict under "result", or the error under "error".
+    """
+    try:
+        if not isinstance(item, dict):
+            raise ValueError("Each framework must be a JSON object")
+        missing = [field for field in FIELDS[:4] if not isinstance(item.get(field), str)]
+        if missing:
+            raise ValueError(f"Missing or invalid fields: {', '.join(missing)}")
+        if item.get("preferences") is not None and not isinstance(item["preferences"], str):
+            raise ValueError("Missing or invalid fields: preferences")
+        kwargs = parse_options(operation, item)
+        timeout = item.get("timeout", max_timeout)
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout <= 0:
+            raise ValueError("Invalid option: timeout must be a positive number of seconds")
+        if operation == "normal_reverse_attacks":
+            kwargs["timeout"] = None
+        # The deadline is checked at each checkpoint of the computation so a framework too large stops on time
+        with Job.time_limit(min(timeout, max_timeout)):
+            aba = OPERATIONS[operation](*(item.get(field) for field in FIELDS), **kwargs)
+        return {"ok": True, "result": framework_to_dict(aba, item.get("stats") is True)}
+    except TimeoutError:
+        return {"ok": False, "error": "TimeoutError", "message": "The computation took longer than its time limit"}
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__, "message": str(e)}
+
+class APIServer(ThreadingHTTPServer):
+    """
+    The APIServer class serves the ABA generator operations over HTTP. Each request is handled by its own thread
+    while the frameworks are computed by a pool of processes, so that computations run in parallel on all the
+    cores and the number of frameworks being computed at once stays bounded whatever the number of clients.
+
+    When a process of the pool dies, for instance killed for using too much memory, the pool is broken and every
+    framework it was computing fails. A new pool then replaces it so that the next frameworks are computed again.
+
+    Attributes:
+        pool (ProcessPoolExecutor): The processes computing the frameworks.
+        workers (int): The number of processes computing the frameworks.
+        slots (threading.BoundedSemaphore): The slots of the frameworks submitted to the pool and not yet computed.
+        max_timeout (float): The maximum number of seconds the computation of a framework may take.
+
+    Methods:
+        __init__(self, address: tuple[str, int], workers: int, max_pending: int, max_timeout: float):
+            Initializes the server and its pool of processes.
+
+        submit(self, operation: str, item: dict, timeout: float | None = None) -> Future | None:
+            Submits the computation of one framework to the pool, waiting for a free slot.
+
+        replace_pool(self, broken: ProcessPoolExecutor):
+            Replaces the pool of processes once broken.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], workers: int, max_pending: int, max_timeout: float):
+        """
+        Initializes the APIServer object and its pool of processes.
+
+        Args:
+            address (tuple[str, int]): The host and port to listen on.
+            workers (int): The number of processes computing the frameworks.
+            max_pending (int): The maximum number of frameworks submitted to the pool and not yet computed.
+            max_timeout (float): The maximum number of seconds the computation of a framework may take.
+        """
+        super().__init__(address, APIHandler)
+        self.workers = workers
+        self.pool = self._new_pool()
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.max_timeout = max_timeout
+        self._pool_lock = threading.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        """
+        Creates a pool of processes, spawned rather than forked since the server already runs threads.
+        """
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, operation: str, item: dict, timeout: float | None = None):
+        """
+        Submits the computation of one framework to the pool. When all the slots are taken the caller waits,
+        which slows down the clients sending the most frameworks instead of letting the queue grow.
+
+        Args:
+            operation (str): The operation requested.
+            item (dict): The framework and options sent for it.
+            timeout (float | None): The maximum number of seconds to wait for a free slot, None to wait until one is
+                                    freed. Defaults to None.
+
+        Returns:
+            Future | None: The future holding the dictionary returned by run_operation, or None if no slot was freed
+                           in time.
+        """
+        if not self.slots.acquire(timeout=timeout):
+            return None
+        try:
+            pool = self.pool
+            try:
+                future = pool.submit(run_operation, operation, item, self.max_timeout)
+            except BrokenProcessPool:
+                # The pool broke since the last framework was submitted, it is replaced before submitting this one
+                self.replace_pool(pool)
+                pool = self.pool
+                future = pool.submit(run_operation, operation, item, self.max_timeout)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda done: self._computed(pool, done))
+        return future
+
+    def _computed(self, pool: ProcessPoolExecutor, future):
+        """
+        Frees the slot of a framework once computed, replacing the pool that computed it if it broke meanwhile.
+        """
+        self.slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.replace_pool(pool)
+
+    def replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        Replaces the pool of processes once broken. The frameworks of the broken pool all fail at the same time,
+        so the pool is only replaced if it is still the current one.
+
+        Args:
+            broken (ProcessPoolExecutor): The pool found broken.
+        """
+        with self._pool_lock:
+            if self.pool is not broken:
+                return
+            self.pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def server_close(self):
+        """
+        Stops listening and shuts down the pool of processes.
+        """
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+class APIHandler(BaseHTTPRequestHandler):
+    """
+    The APIHandler class handles the requests of the API:
+
+        GET  /health                    Returns {"status": "ok"}.
+        GET  /v1/operations             Returns the operations and the options they accept.
+        POST /v1/<operation>            Computes the operation on a batch of frameworks.
+
+    The body of a POST request is either a single framework or {"frameworks": [...]}, each framework being an object
+    with the language, assumptions, rules, contraries and optionally preferences written as in the application,
+    along with the options of the operation. The response is streamed as JSON lines, one per framework in the
+    order they are computed, each line holding the index of the framework in the batch and its result or error.
+    Results are written while the rest of the batch is still being submitted, and a framework whose process died
+    gets an error line like the frameworks whose computation failed.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """
+        Handles the GET requests.
+        """
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/v1/operations":
+            self._send_json(200, {name: list(OPTIONS.get(name, ())) for name in OPERATIONS})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        """
+        Handles the POST requests, streaming the result of each framework as soon as it is computed.
+        """
+        prefix = "/v1/"
+        operation = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        if operation not in OPERATIONS:
+            self._send_json(404, {"error": f"Unknown operation, expected one of {', '.join(OPERATIONS)}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._send_json(413, {"error": f"The body can't be larger than {MAX_BODY} bytes"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+        items = body["frameworks"] if isinstance(body, dict) and "frameworks" in body else [body]
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_BATCH:
+            self._send_json(400, {"error": f"frameworks must be a list of 1 to {MAX_BATCH} frameworks"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # Identical frameworks of the batch are only computed once: the futures not written yet are kept with the
+        # key and the indices of their framework and the outcomes written with the key of their framework
+        futures = {}
+        pending = {}
+        outcomes = {}
+        try:
+            for index, item in enumerate(items):
+                key = json.dumps(item, sort_keys=True)
+                if key in outcomes:
+                    self._write_outcome(items, [index], outcomes[key])
+                elif key in futures:
+                    pending[futures[key]][1].append(index)
+                else:
+                    # While waiting for a free slot the frameworks computed meanwhile are written
+                    while (future := self.server.submit(operation, item, SLOT_WAIT if pending else None)) is None:
+                        self._write_done(items, pending, outcomes)
+                    futures[key] = future
+                    pending[future] = (key, [index])
+                self._write_done(items, pending, outcomes)
+            while pending:
+                wait(pending, return_when=FIRST_COMPLETED)
+                self._write_done(items, pending, outcomes)
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client left, the frameworks not computed yet are dropped
+            for future in pending:
+                future.cancel()
+
+    def _write_done(self, items: list, pending: dict, outcomes: dict):
+        """
+        Writes the outcome of the frameworks computed among the pending ones, the pool failing to compute a framework
+        giving an error as run_operation does.
+        """
+        for future in [future for future in pending if future.done()]:
+            key, indices = pending.pop(future)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = {"ok": False, "error": type(e).__name__, "message": str(e) or "The computation was stopped"}
+            outcomes[key] = outcome
+            self._write_outcome(items, indices, outcome)
+
+    def _write_outcome(self, items: list, indices: list[int], outcome: dict):
+        """
+        Writes one JSON line per index of the batch with the outcome of its framework.
+        """
+        for index in indices:
+            item = items[index]
+            line = {"index": index, "id": item.get("id") if isinstance(item, dict) else None, **outcome}
+            self._write_chunk(json.dumps(line).encode() + b"\n")
+
+    def _write_chunk(self, data: bytes):
+        """
+        Writes a chunk of the response body, an empty chunk ending the response.
+        """
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict):
+        """
+        Sends a whole JSON response.
+        """
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API computing ABA frameworks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of processes computing the frameworks")
+    parser.add_argument("--max-pending", type=int, default=256, help="maximum number of frameworks waiting for a process")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="maximum number of seconds spent on a framework")
+    args = parser.parse_args()
+    server = APIServer((args.host, args.port), args.workers, args.max_pending, args.timeout)
+    print(f"Serving the ABA API on http://{args.host}:{args.port} with {args.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
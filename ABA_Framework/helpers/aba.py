@@ -1,6 +1,45 @@
 from helpers.rule import Rule
 from helpers.contrary import Contrary
-from copy import deepcopy
+from helpers.assumption import Assumption
+from helpers.preference import Preference
+from helpers.argument import Argument
+from helpers.attack import Attack
+from helpers.subset_attack import SubsetAttack
+from helpers.spilled_attacks import SpilledAttacks
+from helpers.preference_order import PreferenceOrder
+from helpers.attack_matrix import AttackMatrix, Backend
+from helpers.jobs import Job
+from helpers.stats import Stats
+from contextlib import contextmanager
+from copy import copy, deepcopy
+import gc
+import threading
+
+# Number of computations pausing the garbage collector, see paused_gc
+_gc_pauses = 0
+_gc_was_enabled = False
+_gc_lock = threading.Lock()
+
+@contextmanager
+def paused_gc():
+    """
+    Pauses the garbage collector while millions of objects without cycles, such as the attacks, are built,
+    as it would otherwise scan all the objects already built over and over. Computations running at the same
+    time share the pause, the collector being enabled again once the last of them is done, if it was enabled.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
 
 class ABA:
     """
@@ -16,8 +55,15 @@ class ABA:
         preferences (list): The list of preferences among arguments or assumptions.
         arguments (optional[list): The arguments generated from the assumptions and rules.
         attacks (optional[list]): The attacks between arguments.
-        normal_attacks (optional[list]): Normal attacks using preferences
-        reverse_attacks (optional[list]): Reverse attacks using preferences
+        normal_attacks (optional[list[SubsetAttack] or list[Attack] or SpilledAttacks]): Normal attacks using preferences, between subsets of assumptions or between arguments
+        reverse_attacks (optional[list[SubsetAttack] or list[Attack] or SpilledAttacks]): Reverse attacks using preferences, between subsets of assumptions or between arguments
+        inert_assumptions (set[str]): Assumptions left out of the normal and reverse attacks as they cannot change them
+        rule_mapping (optional[dict[int, list[int]]]): Indices of the rules given as input each rule stands for, once simplified or made non circular
+        stats (Stats): Profiling timings, counters and peak memory collected while building the framework
+
+    Once the arguments and attacks are built, the framework can be edited with the add and remove methods which
+    only recompute the arguments, attacks and normal and reverse attacks the edit can change. Arguments keep their
+    index across edits, a removed argument being left as None, and added rules and arguments are put at the end.
 
     Methods:
         __init__(self, language: set[str], assumptions: set[str], rules: list[Rule], 
@@ -45,9 +91,54 @@ class ABA:
         _derive_rules(self) -> list[Rule]:
             Derives new rules based on the existing rules in the argumentation framework recursively.
 
+        _dependency_graph(self) -> dict[str, set[str]]:
+            Builds the graph linking the head of each rule to the non-assumption literals of its body.
+
+        _cyclic_components(self) -> list[set[str]]:
+            Computes the strongly connected components of the dependency graph that contain a cycle.
+
         _is_circular(self) -> bool:
             Checks for circular dependencies in the rules of the argumentation framework.
 
+        _relevant_assumptions(self) -> set[str]:
+            Retrieves the assumptions that can change the normal and reverse attacks.
+
+        expand_subset_attacks(self, attacks: list[SubsetAttack]):
+            Yields the attacks between all subsets of assumptions by adding the inert assumptions back.
+
+        build_arguments(self):
+            Builds the arguments of the framework from its rules and assumptions.
+
+        build_attacks(self):
+            Builds the attacks between the arguments of the framework.
+
+        build_normal_reverse_attacks(self, prune_assumptions: bool = True, backend: Backend = Backend.PYTHON, memory_budget: int | None = None, spill_directory: str | None = None):
+            Builds the normal and reverse attacks between subsets of assumptions, in memory or on disk.
+
+        build_argument_attacks(self):
+            Builds the normal and reverse attacks between arguments.
+
+        add_rule(self, head: str, body='', index: int | None = None), remove_rule(self, index: int):
+            Edit the rules and update what was built from the framework.
+
+        add_assumption(self, literal: str), remove_assumption(self, literal: str):
+            Edit the assumptions and update what was built from the framework.
+
+        add_contrary(self, assumption: str, contrary: str), remove_contrary(self, assumption: str, contrary: str):
+            Edit the contraries and update what was built from the framework.
+
+        add_preference(self, least: str, most: str), remove_preference(self, least: str, most: str):
+            Edit the preferences and update what was built from the framework.
+
+        batch_edits(self):
+            Context manager grouping edits so the preferences are checked and the normal and reverse attacks updated once.
+
+        edit_copy(self) -> ABA:
+            Returns a copy of the framework which can be edited without changing this one, only copying what edits modify.
+
+        framework_repr(self) -> str:
+            Returns a string representation of the framework itself, without the arguments and attacks built from it.
+
         __repr__(self) -> str:
             Returns a string representation of the ABA object, summarizing its attributes and relationships.
     """
@@ -74,6 +165,13 @@ class ABA:
         self.attacks = None
         self.normal_attacks = None
         self.reverse_attacks = None
+        self.rule_mapping = None
+        self.inert_assumptions = set()
+        self.stats = Stats()
+        self._rule_argument_index = {}
+        self._assumption_argument_index = {}
+        self._subset_state = None
+        self._batch = False
 
     def _get_literals_in_rules(self) -> set:
         """
@@ -173,6 +271,8 @@ class ABA:
         Returns:
             list[Rule]: A list of derived rules.
         """
+        # Stop here if the computation was cancelled
+        Job.checkpoint()
         # Create a deep copy of the current ABA object
         myaba = deepcopy(self)
         # Variable to track if any rules were changed
@@ -201,32 +301,807 @@ class ABA:
                         return myaba._derive_rules()
         return myaba.rules
 
+    def _dependency_graph(self) -> dict[str, set[str]]:
+        """
+        Builds the dependency graph of the framework where each head of a rule is linked to
+        the literals of its body that are not assumptions.
+
+        Returns:
+            dict[str, set[str]]: A dictionary mapping each head to the non-assumption literals it depends on.
+        """
+        graph = {}
+        for rule in self.rules:
+            body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+            graph.setdefault(rule.head, set()).update(elem for elem in body if elem and elem not in self.assumptions)
+        return graph
+
+    def _cyclic_components(self) -> list[set[str]]:
+        """
+        Computes the strongly connected components of the dependency graph using Tarjan's algorithm
+        and keeps those containing a cycle, that is components with more than one literal or
+        a literal depending on itself. The traversal is iterative so it runs in linear time
+        without hitting the recursion limit.
+
+        Returns:
+            list[set[str]]: The list of cyclic components, ordered so that a component only depends on the ones before it.
+        """
+        graph = self._dependency_graph()
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in graph:
+            if root in index:
+                continue
+            # Each frame holds a literal and an iterator over the literals it depends on
+            frames = [(root, iter(graph.get(root, ())))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while frames:
+                node, successors = frames[-1]
+                successor = next(successors, None)
+                if successor is not None:
+                    # Visit the successor if it wasn't visited yet, otherwise update the lowlink if it is on the stack
+                    if successor not in index:
+                        index[successor] = lowlink[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        frames.append((successor, iter(graph.get(successor, ()))))
+                    elif successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                    continue
+                # All successors were visited so propagate the lowlink to the parent and pop the component if node is its root
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while True:
+                        elem = stack.pop()
+                        on_stack.discard(elem)
+                        component.add(elem)
+                        if elem == node:
+                            break
+                    if len(component) > 1 or node in graph.get(node, ()):
+                        components.append(component)
+        return components
+
     def _is_circular(self) -> bool:
         """
-        Checks for circular dependencies in the arguments of the framework.
+        Checks for circular dependencies in the rules of the framework.
+        The framework is circular if the dependency graph contains a cycle, meaning a literal
+        can be used to derive itself.
 
         Returns:
             bool: True if circular dependencies are found; False otherwise.
         """
-        # Derive rule to recursively create new rules by replacing the body if union of rule can be found and convert to paths
-        # By converting to paths the aim is to get all paths from the head to the leaves
-        derived_rules = [derived_rule.to_paths() for derived_rule in self._derive_rules()]
-        # Iterate over each rule
-        for rule in self.rules:
-            # Check for rules containing assumptions in their body as those are what we will use to create arguments
-            if (isinstance(rule.body, tuple) and 
-                any(elem in self.assumptions for elem in rule.body)) or \
-                (rule.body in self.assumptions):
-                # If any derived rules exist
-                if derived_rules:
-                    # Check that for each of the derived rules there doesn't exist two different paths to the root (rule's head) by
-                    # checking how many times it appears in the path and if it doesn't more than once then a circular dependency 
-                    # was found
-                    for derived_rule in derived_rules:
-                        if not all(path.count(element) == 1 for path in derived_rule for element in path):
-                            return True
-        return False
+        return len(self._cyclic_components()) > 0
    
+    def _relevant_assumptions(self) -> set[str]:
+        """
+        Retrieves the assumptions that can change the normal and reverse attacks between subsets of assumptions.
+        An assumption is relevant if it can be attacked by an argument or if it is a leaf of an argument attacking
+        an assumption. Adding any other assumption to either side of an attack between two subsets never changes
+        whether the attack holds, so the attacks only need to be computed over the subsets of relevant assumptions.
+        This method requires the arguments to be computed.
+
+        Returns:
+            set[str]: The set of relevant assumptions.
+        """
+        contraries = Contrary.to_dict(self.contraries)
+        relevant = set()
+        for arg in self.arguments:
+            # A fact has the empty leaf and is supported by the empty subset, as for the attacks between arguments
+            leaves = set(arg.leaves) - {''} if arg is not None else None
+            # Arguments with a leaf which isn't an assumption are never contained in a subset of assumptions
+            if leaves is None or not leaves.issubset(self.assumptions):
+                continue
+            attacked = {elem for elem in self.assumptions if arg.claim in contraries.get(elem, ())}
+            if attacked:
+                relevant.update(attacked)
+                relevant.update(leaves)
+        return relevant
+
+    def expand_subset_attacks(self, attacks: list[SubsetAttack]):
+        """
+        Yields the attacks between all subsets of assumptions from attacks computed over the relevant assumptions,
+        by adding every subset of the inert assumptions to the source and to the destination of each attack.
+
+        Args:
+            attacks (list[SubsetAttack]): The normal or reverse attacks computed over the relevant assumptions.
+
+        Yields:
+            SubsetAttack: The attacks between subsets of all the assumptions.
+        """
+        inert_subsets = Assumption.get_subsets(self.inert_assumptions)
+        for attack in attacks:
+            for source in inert_subsets:
+                for destination in inert_subsets:
+                    yield SubsetAttack(attack.source + source, attack.destination + destination)
+
+    def _live_rules(self, rules: list[Rule]) -> list[int]:
+        """
+        Finds the rules whose body can be derived from the assumptions with the given rules, the other rules being
+        dead. The derivable literals are computed by forward chaining where each rule keeps a count of the literals
+        of its body not derived yet, so this is linear in the size of the rules.
+
+        Args:
+            rules (list[Rule]): The rules.
+
+        Returns:
+            list[int]: The indices of the live rules, in order.
+        """
+        bodies = [set(rule.body if isinstance(rule.body, tuple) else (rule.body,)) - {''} for rule in rules]
+        # Count for each rule the literals of its body that aren't derived yet and index the rules by the literals of their body
+        missing = [len(body - self.assumptions) for body in bodies]
+        waiting = {}
+        for i, body in enumerate(bodies):
+            for elem in body - self.assumptions:
+                waiting.setdefault(elem, []).append(i)
+        # Start from the rules with a derivable body and derive their heads, each newly derived literal decreasing the counts
+        # of the rules waiting for it
+        derived = set()
+        queue = [i for i, count in enumerate(missing) if count == 0]
+        while queue:
+            head = rules[queue.pop()].head
+            if head in derived:
+                continue
+            derived.add(head)
+            for j in waiting.get(head, ()):
+                missing[j] -= 1
+                if missing[j] == 0:
+                    queue.append(j)
+        return [i for i, count in enumerate(missing) if count == 0]
+
+    def _claim_arguments(self, rules: list[Rule]) -> dict[str, Argument]:
+        """
+        Builds the arguments of the heads of the given rules, the rules being derived among themselves only.
+        As a rule is only ever derived from the rules whose head it can reach, building the arguments from a set
+        of rules closed under this relation gives the same arguments as building them from all the rules.
+        The dead rules, whose body can't be derived, are left out as a literal without any rule would otherwise
+        be taken as a leaf which is always available.
+
+        Args:
+            rules (list[Rule]): The rules to build the arguments from, in the order of the framework.
+
+        Returns:
+            dict[str, Argument]: The argument built for each claim, in the order the claims are first met.
+        """
+        # Derive new rules from the live rules and convert them into paths this allows us to get all the claims and leaves
+        Job.checkpoint(0.0, "Deriving rules")
+        with self.stats.phase("derive_rules"):
+            live = [rules[i] for i in self._live_rules(rules)]
+            derived = ABA(self.language, self.assumptions, live, [], [])._derive_rules()
+        self.stats.increment("rules_derived", len(derived))
+        with self.stats.phase("path_expansion"):
+            derived_rules = [derived_rule.to_paths() for derived_rule in derived]
+            pairs = []
+            # Iterate over each derived rule and its paths and add for each path create the dictionary with head and leaf
+            for derived_rule in derived_rules:
+                for path in derived_rule:
+                    pairs.append({path[0]: path[-1]})
+        self.stats.increment("paths_expanded", len(pairs))
+        with self.stats.phase("argument_assembly"):
+            result = {}
+            # Process each pair and for each key in the pair if it appears in multiple dictionaries then create turn the value
+            # into a tuple containing all the values of it is a key for
+            for d in pairs:
+                for key, value in d.items():
+                    if key in result:
+                        if not isinstance(result[key], tuple):
+                            result[key] = (result[key],)
+                        result[key] += (value,)
+                    else:
+                        result[key] = value
+            myargs = {}
+            # Iterate through the result dictionary to create arguments by only keeping the element in the value that are in assumptions
+            # or correspond to the empty string
+            for key, value in result.items():
+                if isinstance(value, tuple):
+                    new_leaves = ()
+                    for l in value:
+                        if l in self.assumptions:
+                            new_leaves = new_leaves + (l,)
+                    myargs[key] = Argument(key, new_leaves)
+                else:
+                    if value in self.assumptions or value == '':
+                        myargs[key] = Argument(key, (value,))
+        return myargs
+
+    def build_arguments(self):
+        """
+        Builds the arguments of the framework from its rules and assumptions, each assumption being an argument for itself.
+        """
+        claim_arguments = self._claim_arguments(self.rules)
+        myargs = list(claim_arguments.values())
+        # Add all assumptions as arguments
+        for assump in self.assumptions:
+            myargs.append(Argument(assump, (assump,)))
+        self.stats.increment("arguments_built", len(myargs))
+        # Keep the index of each argument so they can be updated when the framework is edited
+        self._rule_argument_index = {claim: i for i, claim in enumerate(claim_arguments)}
+        self._assumption_argument_index = {assump: len(claim_arguments) + i for i, assump in enumerate(self.assumptions)}
+        self.arguments = myargs
+
+    def _attacks_between(self, sources, destinations) -> list[Attack]:
+        """
+        Computes the attacks from some arguments to other arguments based on contraries.
+
+        Args:
+            sources (iterable[int]): The indices of the attacking arguments.
+            destinations (iterable[int]): The indices of the attacked arguments.
+
+        Returns:
+            list[Attack]: The attacks found, ordered by source then destination.
+        """
+        contraries = Contrary.to_dict(self.contraries)
+        sources = list(sources)
+        destinations = list(destinations)
+        attacks = []
+        # Iterate over each argument in the ABA framework, the arguments removed by an edit being skipped
+        for k, i in enumerate(sources):
+            Job.checkpoint(k / len(sources), "Computing attacks")
+            arg = self.arguments[i]
+            if arg is None:
+                continue
+            for j in destinations:
+                other_arg = self.arguments[j]
+                # Check if the claim of the current argument has any contraries in the leaves of the other argument and if so add an attack
+                if other_arg is not None and any(arg.claim in contraries[elem] for elem in other_arg.leaves if elem in contraries):
+                    attacks.append(Attack(i, j))
+        return attacks
+
+    def build_attacks(self):
+        """
+        Builds the attacks between the arguments of the framework, which must have been built beforehand.
+        """
+        with self.stats.phase("attacks"):
+            attacks = self._attacks_between(range(len(self.arguments)), range(len(self.arguments)))
+        self.stats.increment("attacks_emitted", len(attacks))
+        self.attacks = attacks
+
+    def _encode_arguments(self, order: PreferenceOrder) -> list[tuple[int, int, int]]:
+        """
+        Encodes each argument as bitsets: its leaves, the assumptions it attacks without any of its leaves being
+        less preferred (normal) and the assumptions it attacks with a less preferred leaf (reverse).
+
+        Args:
+            order (PreferenceOrder): The preference order giving the bit of each assumption.
+
+        Returns:
+            list[tuple[int, int, int]]: The (leaves, normal attacked, reverse attacked) bitsets of each argument.
+        """
+        contraries_dict = Contrary.to_dict(self.contraries)
+        encoded_args = []
+        for arg in self.arguments:
+            # The empty leaf of a fact is left out as in _relevant_assumptions
+            leaves = set(arg.leaves) - {''} if arg is not None else None
+            # Arguments with a leaf which isn't an assumption are never contained in a subset of assumptions
+            if leaves is None or not leaves.issubset(self.assumptions):
+                continue
+            leaves = order.mask(leaves)
+            attacked = order.mask(x for x in self.assumptions if arg.claim in contraries_dict.get(x, ()))
+            dominated = order.dominated(leaves)
+            encoded_args.append((leaves, attacked & ~dominated, attacked & dominated))
+        return encoded_args
+
+    def build_normal_reverse_attacks(self, prune_assumptions: bool = True, backend: Backend = Backend.PYTHON, memory_budget: int | None = None, spill_directory: str | None = None):
+        """
+        Builds the normal and reverse attacks between subsets of assumptions, the arguments must have been built beforehand.
+
+        When a memory budget is given the attacks are written to disk as they are computed instead of being kept in
+        memory, and normal_attacks and reverse_attacks are SpilledAttacks objects yielding them in sorted order.
+
+        Args:
+            prune_assumptions (bool): Whether to enumerate only the subsets of relevant assumptions. Defaults to True
+            backend (Backend): The implementation used to compute the attacks, both giving the same result. Defaults to Backend.PYTHON
+            memory_budget (Optional[int]): The number of bytes the attacks may use in memory while computed, see _spill_normal_reverse_attacks,
+                                           None to keep them all in memory. Defaults to None
+            spill_directory (Optional[str]): The directory of the files holding the attacks. Defaults to the default temporary directory
+
+        Raises:
+            ValueError: If no preferences are specified or if they aren't a strict order.
+        """
+        # Check if any preferences are specified and raise a ValueError if not
+        if len(self.preferences) == 0:
+            raise ValueError("No preferences specified; cannot compute.")
+        # Leave out the assumptions that cannot change the attacks if asked for
+        if prune_assumptions:
+            with self.stats.phase("relevance_pruning"):
+                relevant = self._relevant_assumptions()
+            self.inert_assumptions = self.assumptions - relevant
+            self.stats.increment("inert_assumptions", len(self.inert_assumptions))
+        else:
+            relevant = self.assumptions
+        # Convert preferences into a transitively closed order for easier lookup
+        with self.stats.phase("preference_closure"):
+            order = PreferenceOrder(self.preferences, self.assumptions)
+        encoded_args = self._encode_arguments(order)
+        self.stats.increment("subsets_visited", 4 ** len(relevant))
+        # The options are kept so the attacks can be updated when the framework is edited
+        state = {
+            "prune_assumptions": prune_assumptions,
+            "backend": backend,
+            "memory_budget": memory_budget,
+            "spill_directory": spill_directory,
+            "assumptions": set(self.assumptions),
+            "relevant": set(relevant),
+        }
+        if memory_budget is not None:
+            with self.stats.phase("normal_reverse_attacks"):
+                self._spill_normal_reverse_attacks(relevant, order, encoded_args, backend, memory_budget, spill_directory)
+            self.stats.increment("normal_attacks_emitted", len(self.normal_attacks))
+            self.stats.increment("reverse_attacks_emitted", len(self.reverse_attacks))
+            self._subset_state = state
+            return
+        # Get all subsets of the relevant assumptions
+        with self.stats.phase("subset_enumeration"):
+            subsets = Assumption.get_subsets(relevant)
+        masks = [order.mask(subset) for subset in subsets]
+        with self.stats.phase("normal_reverse_attacks"):
+            # Compute the pairs of attacking subsets with the chosen backend
+            matrix = AttackMatrix(masks, encoded_args)
+            if backend == Backend.NUMPY:
+                normal_pairs, reverse_pairs = matrix.numpy_pairs()
+            else:
+                normal_pairs, reverse_pairs = matrix.python_pairs()
+            normal_attacks = []
+            reverse_attacks = []
+            # Each pair of subsets is listed once so the attacks are distinct, they are built by blocks so the progress can be reported
+            with paused_gc():
+                for attacks, (rows, columns) in ((normal_attacks, normal_pairs), (reverse_attacks, reverse_pairs)):
+                    for start in range(0, len(rows), 65536):
+                        Job.checkpoint(start / len(rows), "Collecting normal and reverse attacks")
+                        attacks.extend(map(SubsetAttack, map(subsets.__getitem__, rows[start:start + 65536]),
+                                           map(subsets.__getitem__, columns[start:start + 65536])))
+            # Assign the constructed attacks to the ABA framework
+            self.normal_attacks = normal_attacks
+            self.reverse_attacks = reverse_attacks
+        self.stats.increment("normal_attacks_emitted", len(self.normal_attacks))
+        self.stats.increment("reverse_attacks_emitted", len(self.reverse_attacks))
+        # Keep the subsets and their targets so only the attacks of the subsets whose targets change are updated
+        self._subset_state = {**state, "subsets": subsets, "masks": masks, "targets": matrix.targets()}
+
+    def _spill_normal_reverse_attacks(self, relevant: set[str], order: PreferenceOrder, encoded_args: list[tuple[int, int, int]],
+                                      backend: Backend, memory_budget: int, spill_directory: str | None):
+        """
+        Computes the normal and reverse attacks by tiles of pairs of subsets and writes them to disk as SpilledAttacks.
+        The subsets are never enumerated nor kept: subset k holds the relevant assumptions whose bit is set in k, the
+        arguments being encoded over these bits, and the targets are computed for the attacking subsets of each tile.
+
+        The memory budget bounds what grows with the number of attacks: an eighth goes to the tile of attacks being
+        computed and three eighths to the buffer of sorted keys of each relation, then to the merge of its runs.
+        It doesn't bound what grows with the framework, the arguments and their encoding, nor the targets of a tile
+        when there are more arguments than a tile can hold. Without NumPy the runs take several times the budget.
+        """
+        literals = list(relevant)
+        positions = [order.index[literal] for literal in literals]
+        relevant_mask = order.mask(literals)
+
+        def to_index(mask):
+            # Gather the bits of the relevant assumptions of a bitset of the order into the bits of a subset index
+            return sum(1 << t for t, position in enumerate(positions) if mask >> position & 1)
+
+        # Arguments with a leaf outside the relevant assumptions are never contained in one of the subsets
+        index_args = [tuple(map(to_index, arg)) for arg in encoded_args if arg[0] & ~relevant_mask == 0]
+        count = 2 ** len(literals)
+        matrix = AttackMatrix(range(count), index_args)
+        # A pair of subsets of a tile takes up to 25 bytes with NumPy and 120 bytes in the Python lists of both relations
+        cells = max(1, memory_budget // 8 // (25 if backend == Backend.NUMPY else 120))
+        columns = min(count, cells)
+        rows = max(1, cells // max(columns, len(index_args), 1))
+        tiles = matrix.numpy_keys(rows, columns) if backend == Backend.NUMPY else matrix.python_keys(rows, columns)
+        normal_attacks = SpilledAttacks(literals, memory_budget * 3 // 8, spill_directory)
+        reverse_attacks = SpilledAttacks(literals, memory_budget * 3 // 8, spill_directory)
+        for normal_keys, reverse_keys in tiles:
+            normal_attacks.add(normal_keys)
+            reverse_attacks.add(reverse_keys)
+        normal_attacks.finish()
+        reverse_attacks.finish()
+        self.normal_attacks = normal_attacks
+        self.reverse_attacks = reverse_attacks
+
+    def build_argument_attacks(self):
+        """
+        Builds the normal and reverse attacks of ABA+ between arguments, the arguments must have been built beforehand.
+        An argument A attacking an assumption b of an argument B gives a normal attack from A to B if no leaf of A is
+        less preferred than b, and a reverse attack from B to A otherwise. Attacks on an assumption are given as attacks
+        on the argument the assumption is for itself. The attacks use the indices of the arguments as in the attacks
+        attribute, so there are at most quadratically many of them in the number of arguments.
+
+        Raises:
+            ValueError: If no preferences are specified or if they aren't a strict order.
+        """
+        # Check if any preferences are specified and raise a ValueError if not
+        if len(self.preferences) == 0:
+            raise ValueError("No preferences specified; cannot compute.")
+        with self.stats.phase("preference_closure"):
+            order = PreferenceOrder(self.preferences, self.assumptions)
+        contraries = Contrary.to_dict(self.contraries)
+        normal_attacks = []
+        reverse_attacks = []
+        with self.stats.phase("normal_reverse_attacks"):
+            # The leaves of each argument that are assumptions as bitsets
+            masks = [order.mask(elem for elem in arg.leaves if elem in self.assumptions) if arg is not None else 0 for arg in self.arguments]
+            for i, arg in enumerate(self.arguments):
+                Job.checkpoint(i / len(self.arguments), "Computing normal and reverse attacks")
+                if arg is None:
+                    continue
+                for j, other_arg in enumerate(self.arguments):
+                    if other_arg is None:
+                        continue
+                    # Check each assumption of the other argument the claim of the current argument is contrary to
+                    attacked = [elem for elem in other_arg.leaves if arg.claim in contraries.get(elem, ())]
+                    if any(not order.any_below(masks[i], elem) for elem in attacked):
+                        normal_attacks.append(Attack(i, j))
+                    if any(order.any_below(masks[i], elem) for elem in attacked):
+                        reverse_attacks.append(Attack(j, i))
+        # Reverse attacks are ordered by source then destination as the other attacks
+        reverse_attacks.sort(key=lambda attack: (attack.source, attack.destination))
+        self.normal_attacks = normal_attacks
+        self.reverse_attacks = reverse_attacks
+        self.inert_assumptions = set()
+        self.stats.increment("normal_attacks_emitted", len(self.normal_attacks))
+        self.stats.increment("reverse_attacks_emitted", len(self.reverse_attacks))
+        # Attacks between arguments are cheap so they are built again when the framework is edited
+        self._subset_state = None
+
+    def add_rule(self, head: str, body='', index: int | None = None):
+        """
+        Adds a rule and updates what was built from the framework.
+
+        Args:
+            head (str): The head of the rule.
+            body (str or tuple): The body of the rule, a literal, a tuple of literals or '' for a fact.
+            index (optional[int]): The index to insert the rule at, the rule being put at the end if None.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        index = len(self.rules) if index is None else index
+        self.rules.insert(index, Rule((head, body)))
+        self.rule_mapping = None
+        self._apply_edit(lambda: self.rules.pop(index), literals={head})
+
+    def remove_rule(self, index: int):
+        """
+        Removes the rule at the given index and updates what was built from the framework.
+
+        Args:
+            index (int): The index of the rule to remove.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        rule = self.rules.pop(index)
+        self.rule_mapping = None
+        self._apply_edit(lambda: self.rules.insert(index, rule), literals={rule.head})
+
+    def add_assumption(self, literal: str):
+        """
+        Adds an assumption and updates what was built from the framework.
+
+        Args:
+            literal (str): The literal to add to the assumptions.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        if literal in self.assumptions:
+            return
+        self.assumptions.add(literal)
+        self._apply_edit(lambda: self.assumptions.discard(literal), literals={literal}, assumption=literal)
+
+    def remove_assumption(self, literal: str):
+        """
+        Removes an assumption and updates what was built from the framework.
+
+        Args:
+            literal (str): The literal to remove from the assumptions.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        if literal not in self.assumptions:
+            return
+        self.assumptions.discard(literal)
+        self._apply_edit(lambda: self.assumptions.add(literal), literals={literal}, assumption=literal)
+
+    def add_contrary(self, assumption: str, contrary: str):
+        """
+        Adds a contrary of an assumption and updates what was built from the framework.
+
+        Args:
+            assumption (str): The assumption having the contrary.
+            contrary (str): The literal contrary to the assumption.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        self.contraries.append(Contrary((assumption, contrary)))
+        self._apply_edit(lambda: self.contraries.pop(), claims={contrary})
+
+    def remove_contrary(self, assumption: str, contrary: str):
+        """
+        Removes a contrary of an assumption and updates what was built from the framework.
+
+        Args:
+            assumption (str): The assumption having the contrary.
+            contrary (str): The literal contrary to the assumption.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        index = next((i for i, contr in enumerate(self.contraries) if (contr.contrary, contr.arg) == (assumption, contrary)), None)
+        if index is None:
+            return
+        removed = self.contraries.pop(index)
+        self._apply_edit(lambda: self.contraries.insert(index, removed), claims={contrary})
+
+    def add_preference(self, least: str, most: str):
+        """
+        Adds a preference between two assumptions and updates what was built from the framework.
+
+        Args:
+            least (str): The less preferred assumption.
+            most (str): The more preferred assumption.
+
+        Raises:
+            ValueError: If the framework becomes invalid or the preferences aren't a strict order, in which case the edit is undone.
+        """
+        self.preferences.append(Preference((least, most)))
+        self._apply_edit(lambda: self.preferences.pop())
+
+    def remove_preference(self, least: str, most: str):
+        """
+        Removes a preference between two assumptions and updates what was built from the framework.
+
+        Args:
+            least (str): The less preferred assumption.
+            most (str): The more preferred assumption.
+
+        Raises:
+            ValueError: If the framework becomes invalid, in which case the edit is undone.
+        """
+        index = next((i for i, pref in enumerate(self.preferences) if (pref.least, pref.most) == (least, most)), None)
+        if index is None:
+            return
+        removed = self.preferences.pop(index)
+        self._apply_edit(lambda: self.preferences.insert(index, removed))
+
+    def _apply_edit(self, undo, literals: set[str] = frozenset(), claims: set[str] = frozenset(), assumption: str | None = None):
+        """
+        Checks an edit of the framework and updates the arguments, attacks and normal and reverse attacks
+        that were already built, only recomputing the parts the edit can change.
+
+        Args:
+            undo (callable): Undoes the edit if the framework becomes invalid.
+            literals (set[str]): The literals whose rules or assumption status changed.
+            claims (set[str]): The claims whose contraries changed.
+            assumption (optional[str]): The assumption added or removed, if any.
+
+        Raises:
+            ValueError: If the framework becomes invalid.
+        """
+        try:
+            if not self._is_valid():
+                raise ValueError("Invalid literals detected in the ABA framework.")
+            # Within a batch the preferences may only be valid once all the edits are done
+            if not self._batch:
+                self._check_preferences()
+        except ValueError:
+            undo()
+            raise
+        self.stats.increment("edits")
+        if self.arguments is None:
+            return
+        with self.stats.phase("incremental_arguments"):
+            changed = self._update_arguments(literals, assumption)
+        self.stats.increment("arguments_updated", len(changed))
+        if self.attacks is not None:
+            # The attacks from and to the changed arguments and from the arguments whose claim is a changed contrary are recomputed
+            sources = changed | {i for i, arg in enumerate(self.arguments) if arg is not None and arg.claim in claims}
+            with self.stats.phase("incremental_attacks"):
+                self._update_attacks(sources, changed)
+        if self.normal_attacks is not None and not self._batch:
+            with self.stats.phase("incremental_normal_reverse_attacks"):
+                self._update_normal_reverse_attacks()
+
+    def _check_preferences(self):
+        """
+        Checks the preferences can still be used for the normal and reverse attacks, if they were built.
+
+        Raises:
+            ValueError: If there are no preferences or they aren't a strict order.
+        """
+        if self.normal_attacks is not None:
+            if len(self.preferences) == 0:
+                raise ValueError("No preferences specified; cannot compute.")
+            # Building the order checks the preferences are still a strict order
+            PreferenceOrder(self.preferences, self.assumptions)
+
+    @contextmanager
+    def batch_edits(self):
+        """
+        Groups several edits, such as replacing one preference by another, whose intermediate states may not have valid
+        preferences. Each edit is still checked and updates the arguments and attacks, but the preferences are only
+        checked, and the normal and reverse attacks only updated, once all the edits of the batch are done.
+
+        Raises:
+            ValueError: If the preferences aren't valid at the end of the batch. The edits of the batch are not undone,
+                        the caller has to restore the framework.
+        """
+        self._batch = True
+        try:
+            yield self
+        finally:
+            self._batch = False
+        self._check_preferences()
+        if self.arguments is not None and self.normal_attacks is not None:
+            with self.stats.phase("incremental_normal_reverse_attacks"):
+                self._update_normal_reverse_attacks()
+
+    def edit_copy(self) -> "ABA":
+        """
+        Returns a copy of the framework which can be edited without changing this one, for instance when this one is
+        shared. Only the containers the edits modify in place are copied, so the copy takes time in the number of rules
+        and arguments: the attacks, which edits replace rather than modify, and the rules, arguments and other elements,
+        which are never modified, are shared with this framework.
+
+        Returns:
+            ABA: The copy of the framework.
+        """
+        aba = copy(self)
+        aba.language = set(self.language)
+        aba.assumptions = set(self.assumptions)
+        aba.rules = list(self.rules)
+        aba.contraries = list(self.contraries)
+        aba.preferences = list(self.preferences)
+        aba.arguments = list(self.arguments) if self.arguments is not None else None
+        aba.inert_assumptions = set(self.inert_assumptions)
+        aba.stats = deepcopy(self.stats)
+        aba._rule_argument_index = dict(self._rule_argument_index)
+        aba._assumption_argument_index = dict(self._assumption_argument_index)
+        aba._subset_state = dict(self._subset_state) if self._subset_state is not None else None
+        return aba
+
+    def _update_arguments(self, literals: set[str], assumption: str | None = None) -> set[int]:
+        """
+        Rebuilds the arguments whose claim can reach one of the given literals through the rules.
+        Arguments keep their index, a removed argument being replaced by None so the attacks stay valid.
+
+        Args:
+            literals (set[str]): The literals whose rules or assumption status changed.
+            assumption (optional[str]): The assumption added or removed, if any.
+
+        Returns:
+            set[int]: The indices of the arguments that were added, changed or removed.
+        """
+        # Link each literal to the heads of the rules using it in their body
+        used_by = {}
+        for rule in self.rules:
+            body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+            for elem in body:
+                used_by.setdefault(elem, set()).add(rule.head)
+        # The claims affected are the literals themselves and every head reaching them
+        affected = set(literals)
+        stack = list(literals)
+        while stack:
+            for head in used_by.get(stack.pop(), ()):
+                if head not in affected:
+                    affected.add(head)
+                    stack.append(head)
+        # Rebuild the arguments of the affected claims from the rules they can reach, following every literal of the
+        # bodies as _derive_rules also expands the assumptions heading a rule
+        uses = {}
+        for rule in self.rules:
+            body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+            uses.setdefault(rule.head, set()).update(body)
+        reachable = set(affected)
+        stack = list(affected)
+        while stack:
+            for elem in uses.get(stack.pop(), ()):
+                if elem not in reachable:
+                    reachable.add(elem)
+                    stack.append(elem)
+        new_arguments = self._claim_arguments([rule for rule in self.rules if rule.head in reachable])
+        changed = set()
+        for claim in affected:
+            index = self._rule_argument_index.get(claim)
+            arg = new_arguments.get(claim)
+            if arg is None:
+                if index is not None:
+                    self.arguments[index] = None
+                    del self._rule_argument_index[claim]
+                    changed.add(index)
+            elif index is None:
+                self._rule_argument_index[claim] = len(self.arguments)
+                changed.add(len(self.arguments))
+                self.arguments.append(arg)
+            elif self.arguments[index].leaves != arg.leaves:
+                self.arguments[index] = arg
+                changed.add(index)
+        # An assumption is an argument for itself
+        if assumption is not None:
+            if assumption in self.assumptions:
+                self._assumption_argument_index[assumption] = len(self.arguments)
+                changed.add(len(self.arguments))
+                self.arguments.append(Argument(assumption, (assumption,)))
+            else:
+                index = self._assumption_argument_index.pop(assumption)
+                self.arguments[index] = None
+                changed.add(index)
+        return changed
+
+    def _update_attacks(self, sources: set[int], destinations: set[int]):
+        """
+        Recomputes the attacks from the given source arguments and to the given destination arguments.
+
+        Args:
+            sources (set[int]): The indices of the arguments whose attacks are recomputed.
+            destinations (set[int]): The indices of the arguments whose incoming attacks are recomputed.
+        """
+        attacks = [attack for attack in self.attacks if attack.source not in sources and attack.destination not in destinations]
+        all_arguments = range(len(self.arguments))
+        attacks.extend(self._attacks_between(sources, all_arguments))
+        attacks.extend(self._attacks_between((i for i in all_arguments if i not in sources), destinations))
+        # Keep the attacks ordered by source then destination as when all of them are built
+        attacks.sort(key=lambda attack: (attack.source, attack.destination))
+        self.attacks = attacks
+
+    def _update_normal_reverse_attacks(self):
+        """
+        Updates the normal and reverse attacks. Attacks between arguments are built again. For attacks between subsets
+        of assumptions, when the subsets are unchanged only the attacks from the subsets whose normal targets changed
+        and to the subsets whose reverse targets changed are recomputed, otherwise all of them are built again.
+        """
+        state = self._subset_state
+        if state is None:
+            self.build_argument_attacks()
+            return
+        relevant = self._relevant_assumptions() if state["prune_assumptions"] else self.assumptions
+        # Attacks written to disk are built again rather than edited in memory
+        if self.assumptions != state["assumptions"] or relevant != state["relevant"] or state["memory_budget"] is not None:
+            self.build_normal_reverse_attacks(state["prune_assumptions"], state["backend"], state["memory_budget"], state["spill_directory"])
+            return
+        subsets, masks = state["subsets"], state["masks"]
+        order = PreferenceOrder(self.preferences, self.assumptions)
+        matrix = AttackMatrix(masks, self._encode_arguments(order))
+        normal_targets, reverse_targets = matrix.numpy_targets() if state["backend"] == Backend.NUMPY else matrix.targets()
+        old_normal_targets, old_reverse_targets = state["targets"]
+        rows = [i for i, targets in enumerate(normal_targets) if targets != old_normal_targets[i]]
+        columns = [j for j, targets in enumerate(reverse_targets) if targets != old_reverse_targets[j]]
+        self.stats.increment("subset_rows_updated", len(rows) + len(columns))
+        # Replace the normal attacks from the changed rows and the reverse attacks to the changed columns
+        sources = {subsets[i] for i in rows}
+        self.normal_attacks = [attack for attack in self.normal_attacks if attack.source not in sources]
+        for i in rows:
+            self.normal_attacks.extend(SubsetAttack(subsets[i], subsets[j]) for j, mask in enumerate(masks) if normal_targets[i] & mask)
+        destinations = {subsets[j] for j in columns}
+        self.reverse_attacks = [attack for attack in self.reverse_attacks if attack.destination not in destinations]
+        for j in columns:
+            self.reverse_attacks.extend(SubsetAttack(subsets[i], subsets[j]) for i, mask in enumerate(masks) if reverse_targets[j] & mask)
+        state["targets"] = (normal_targets, reverse_targets)
+
+    def framework_repr(self) -> str:
+        """
+        Returns a string representation of the framework itself, without the arguments and attacks built from it.
+
+        Returns:
+            str: A summary of the language, assumptions, rules, contraries and preferences of the framework.
+        """
+        return (
+            f"Language : {self.language}\n"
+            f"\nAssumptions : {self.assumptions}\n"
+            f"\nRules:\n" + "\n".join(f"R{i}: {rule}" + (f" (from {', '.join(f'R{j}' for j in self.rule_mapping[i])})" if self.rule_mapping else "")
+                                      for i, rule in enumerate(self.rules)) + "\n" +
+            f"\nContraries:\n" + "\n".join(f"C{i}: {contr}" for i, contr in enumerate(self.contraries)) + "\n" +
+            f"\nPreferences:\n" + "\n".join(f"P{i}:{pref}" for i, pref in enumerate(self.preferences)) + "\n"
+        )
+
     def __repr__(self):
         """
         Returns a string representation of the ABA object, summarizing its attributes and relationships.
@@ -236,17 +1111,15 @@ class ABA:
                  preferences, arguments, and attacks.
         """
         return (
-            f"Language : {self.language}\n"
-            f"\nAssumptions : {self.assumptions}\n"
-            f"\nRules:\n" + "\n".join(f"R{i}: {rule}" for i, rule in enumerate(self.rules)) + "\n" +
-            f"\nContraries:\n" + "\n".join(f"C{i}: {contr}" for i, contr in enumerate(self.contraries)) + "\n" +
-            f"\nPreferences:\n" + "\n".join(f"P{i}:{pref}" for i, pref in enumerate(self.preferences)) + "\n" +
+            self.framework_repr() +
             f"\nArguments:\n" + 
             ( "\n".join(f"A{i}: {arg}" for i, arg in enumerate(self.arguments) if arg is not None) + "\n" if self.arguments else "") +
             f"\nAttacks:\n" +
             ( "\n".join(str(attack) for attack in self.attacks if attack is not None) if self.attacks else "") +
             f"\nNormal Attacks:\n" +
-            ( "\n".join(attack for attack in self.normal_attacks if attack is not None) if self.normal_attacks else "") +
+            ( "\n".join(str(attack) for attack in self.normal_attacks if attack is not None) if self.normal_attacks else "") +
             f"\nReverse Attacks:\n" +
-            ( "\n".join(attack for attack in self.reverse_attacks if attack is not None) if self.reverse_attacks else "")
+            ( "\n".join(str(attack) for attack in self.reverse_attacks if attack is not None) if self.reverse_attacks else "") +
+            ( f"\n\nInert assumptions: {self.inert_assumptions} (each normal and reverse attack also holds when adding any of them to either side)"
+              if self.inert_assumptions else "")
         )
@@ -3,11 +3,13 @@ from helpers.rule import Rule
 from helpers.assumption import Assumption
 from helpers.contrary import Contrary
 from helpers.aba import ABA
-from helpers.argument import Argument
-from helpers.attack import Attack
 from helpers.preference import Preference
+from helpers.attack_matrix import Backend
+from helpers.stats import Stats
+from helpers.jobs import Job
+from difflib import SequenceMatcher
+from itertools import combinations
 from enum import Enum
-import threading
 
 class ConvertTo(Enum):
     """Enumeration for conversion types.
@@ -22,6 +24,19 @@ class ConvertTo(Enum):
     ATOMIC = 'atomic'
     NON_CIRCULAR = 'non_circular'
 
+class AttackLevel(Enum):
+    """Enumeration for the levels normal and reverse attacks are reported at.
+
+    This enum defines the possible outputs that can be used
+    when computing the normal and reverse attacks of ABA+.
+
+    Attributes:
+        SUBSETS (str): Represents attacks between subsets of assumptions.
+        ARGUMENTS (str): Represents attacks between arguments, indexed as the attacks.
+    """
+    SUBSETS = 'subsets'
+    ARGUMENTS = 'arguments'
+
 class ConversionFailedError(Exception):
     """Exception raised when a conversion fails.
 
@@ -64,6 +79,18 @@ class ABA_Generator:
             convert_to_non_circular(language: str, assumptions: str, rules: str, contraries: str, preferences: Optional[str] = None) -> ABA
                 Converts the framework to a non-circular form, modifying rules as necessary
 
+            _simplify(aba: ABA) -> ABA
+                Removes the dead, duplicate and subsumed rules of an existing framework in place, keeping a mapping to the original rules
+
+            _compose_mapping(aba: ABA, sources: list[list[int]]) -> dict[int, list[int]]
+                Maps new rules to the rules given as input through the rules of the framework they stand for
+
+            _make_atomic(aba: ABA) -> ABA
+                Converts an existing framework to an atomic form in place, adding new literals only for those used in rule bodies
+
+            _make_non_circular(aba: ABA) -> ABA
+                Converts an existing framework to a non-circular form in place, duplicating only the rules in cyclic components
+
             convert_first(language: str, assumptions: str, rules: str, contraries: str, preferences: Optional[str] = None, convert_to: ConvertTo | None = None) -> ABA
                 Converts the framework to atomic or non-circular based on the value provided, if None then just create the normal ABA framework
 
@@ -75,6 +102,9 @@ class ABA_Generator:
 
             create_normal_reverse_attacks(language: str, assumptions: str, rules: str, contraries: str, preferences: Optional[str] = None) -> ABA
                 Computes normal and reverse attacks based on preferences among subsets of assumptions
+
+            update_framework(aba: ABA, language: str, assumptions: str, rules: str, contraries: str, preferences: Optional[str] = None) -> ABA
+                Edits an existing framework to match new inputs, only updating what the differences can change
     """
 
     @staticmethod
@@ -95,22 +125,30 @@ class ABA_Generator:
             Raises
                 ConversionFailedError: If the framework generated is invalid
         """
-        # Parse the inputs into structured format using the corresponding parser and create the set of language
-        # and assumptions
-        language = Language(language).parse()
-        assumptions = Assumption(assumptions).parse()
-        # Create a list of Rule objects by parsing each rule string using the Rule class
-        rules = [Rule(rule) for rule in Rule.parser(rules)]
-        # Create a list of Contrary objects by parsing each contrary string using the Contrary class
-        contraries = [Contrary(contr) for contr in Contrary.parser(contraries)]
-        # Check if preferences are provided if so, parse them into a list of Preference objects and if not return an empty list
-        if preferences is not None:
-            preferences = [Preference(pref) for pref in Preference.parser(preferences)]
-        else:
-            preferences = []
+        stats = Stats()
+        # The peak memory is measured from the memory used before the framework is built
+        stats.reset_peak_memory()
+        with stats.phase("parsing"):
+            # Parse the inputs into structured format using the corresponding parser and create the set of language
+            # and assumptions
+            language = Language(language).parse()
+            assumptions = Assumption(assumptions).parse()
+            # Create a list of Rule objects by parsing each rule string using the Rule class
+            rules = [Rule(rule) for rule in Rule.parser(rules)]
+            # Create a list of Contrary objects by parsing each contrary string using the Contrary class
+            contraries = [Contrary(contr) for contr in Contrary.parser(contraries)]
+            # Check if preferences are provided if so, parse them into a list of Preference objects and if not return an empty list
+            if preferences is not None:
+                preferences = [Preference(pref) for pref in Preference.parser(preferences)]
+            else:
+                preferences = []
         aba = ABA(language, assumptions, rules, contraries, preferences)
+        # Attach the statistics collected while parsing to the framework so later phases can add to them
+        aba.stats = stats
         # Check if the framework generated is valid, if not raise a ConversionFailedError
-        if not aba._is_valid():
+        with stats.phase("validation"):
+            valid = aba._is_valid()
+        if not valid:
             raise ConversionFailedError("Invalid literals detected in the ABA framework.")
         return aba
         
@@ -133,40 +171,67 @@ class ABA_Generator:
                 ConversionNotNeededError: If the ABA framework is already atomic
                 ConversionFailedError: If the conversion to atomic failed
         """
-        # Create the corresponding ABA framework
+        # Create the corresponding ABA framework and convert it
         aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
+        return ABA_Generator._make_atomic(aba)
+
+    @staticmethod
+    def _make_atomic(aba: ABA) -> ABA:
+        """
+            Converts an existing ABA framework to an atomic form in place.
+
+            If the framework is circular it is first made non circular in place. Only the non-assumption
+            literals used in the body of a rule get their "_d" and "_nd" assumptions, with the contraries
+            created the first time a literal is rewritten. Each rule is checked once it has been rewritten
+            rather than checking the whole framework again at the end.
+
+            Args:
+                aba (ABA): The ABA framework to convert
+
+            Returns:
+                ABA: The converted ABA framework
+
+            Raises:
+                ConversionNotNeededError: If the ABA framework is already atomic
+                ConversionFailedError: If the conversion to atomic failed
+        """
         # If the ABA is circular the start by converting it to a non circular framework first
-        if aba._is_circular():
-            aba = ABA_Generator.convert_to_non_circular(language, assumptions, rules, contraries, preferences)
-        # If the ABA is already atomic then raise a ConversionNotNeededError; if not
-        if not aba._is_atomic():
-            # Initialize a set to store new literals to be added
-            to_add = set()
-            # Iterate over each literal in the language
-            for l in aba.language:
-                # If the literal is not assumption, generate new literals with "_d" and "_nd" suffixes to add as well as the contrary relations
-                if not l in aba.assumptions:
-                    to_add.add(f"{l}_d")
-                    to_add.add(f"{l}_nd")
-                    aba.contraries.append(Contrary((f"{l}_d",f"{l}_nd")))
-                    aba.contraries.append(Contrary((f"{l}_nd",f"{l}")))
-            # Update the language and assumptions with the new literals
-            aba.language.update(to_add)
-            aba.assumptions.update(to_add)
-            # Update the body of each rule to include the new literals
+        try:
+            ABA_Generator._make_non_circular(aba)
+        except ConversionNotNeededError:
+            pass
+        # Collect the literals of the rule bodies that are not assumptions, if there are none the ABA is already atomic
+        # and we raise a ConversionNotNeededError
+        with aba.stats.phase("atomicity_check"):
+            to_replace = set()
             for rule in aba.rules:
-                if isinstance(rule.body, tuple):
-                    rule.body = tuple(f"{s}_d" if s and not s in aba.assumptions else s for s in rule.body)
-                else:
-                    s = rule.body
-                    rule.body = f"{s}_d" if s and not s in aba.assumptions else s
-            # Check again if the ABA framework is atomic after updates and if not raise a ConversionFailedError, if so return it
-            if not aba._is_atomic():
-                raise ConversionFailedError("There was something wrong during conversion")
-            else:
-                return aba
-        else:
+                body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+                to_replace.update(elem for elem in body if elem and elem not in aba.assumptions)
+        if not to_replace:
             raise ConversionNotNeededError("ABA Framework is already atomic no conversion needed")
+        with aba.stats.phase("atomic_conversion"):
+            replacements = {}
+            # Update the body of each rule to use the "_d" literal of the non-assumptions
+            for rule in aba.rules:
+                body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+                new_body = []
+                for elem in body:
+                    if elem in to_replace:
+                        # Create the new literals and their contraries the first time the literal is met
+                        if elem not in replacements:
+                            replacements[elem] = f"{elem}_d"
+                            aba.language.update((f"{elem}_d", f"{elem}_nd"))
+                            aba.assumptions.update((f"{elem}_d", f"{elem}_nd"))
+                            aba.contraries.append(Contrary((f"{elem}_d", f"{elem}_nd")))
+                            aba.contraries.append(Contrary((f"{elem}_nd", f"{elem}")))
+                        elem = replacements[elem]
+                    new_body.append(elem)
+                rule.body = tuple(new_body) if isinstance(rule.body, tuple) else new_body[0]
+                # Check the rewritten rule is atomic and if not raise a ConversionFailedError
+                if not aba._is_atmomic_rule(rule):
+                    raise ConversionFailedError("There was something wrong during conversion")
+            aba.stats.increment("atomic_literals_added", 2 * len(replacements))
+        return aba
 
     @staticmethod
     def convert_to_non_circular(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None) -> ABA:
@@ -187,52 +252,191 @@ class ABA_Generator:
                 ConversionNotNeededError: If the ABA framework is already non circular
                 ConversionFailedError: If the conversion to non circular failed
         """
-        # Create the corresponding ABA framework
+        # Create the corresponding ABA framework and convert it
         aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
-        # If the ABA is already atomic then raise a ConversionNotNeededError; if not
-        if aba._is_circular():
-            # Determine the number of literals in the language that are not assumptions k =|L\A|
-            k = len(aba.language.difference(aba.assumptions))
+        return ABA_Generator._make_non_circular(aba)
+
+    @staticmethod
+    def _make_non_circular(aba: ABA) -> ABA:
+        """
+            Converts an existing ABA framework to a non-circular form in place.
+
+            Only the rules whose head belongs to a cyclic strongly connected component of the dependency
+            graph are duplicated. A component of size m is unrolled into m levels where the literals of
+            the component used in the body of a rule at level i refer to their copy at level i-1, the last
+            level keeping the original names. The rules outside of cyclic components are left untouched.
+            The rule_mapping attribute of the framework maps the index of each new rule to the index of the
+            rule it was copied from.
+
+            Args:
+                aba (ABA): The ABA framework to convert
+
+            Returns:
+                ABA: The converted ABA framework
+
+            Raises:
+                ConversionNotNeededError: If the ABA framework is already non circular
+                ConversionFailedError: If the conversion to non circular failed
+        """
+        # If the ABA is already non circular then raise a ConversionNotNeededError; if not
+        with aba.stats.phase("circularity_check"):
+            components = aba._cyclic_components()
+        if not components:
+            raise ConversionNotNeededError("ABA Framework is already non circular no conversion needed")
+        with aba.stats.phase("non_circular_conversion"):
+            # Map each literal in a cyclic component to its component and name its copies by appending the level,
+            # adding underscores if the name is already used in the language
+            component_of = {}
+            copies = {}
+            taken = set(aba.language)
+            for component in components:
+                for literal in component:
+                    component_of[literal] = component
+                    for i in range(1, len(component)):
+                        name = f"{literal}{i}"
+                        while name in taken:
+                            name = f"{name}_"
+                        taken.add(name)
+                        copies[(literal, i)] = name
             new_rules = []
+            # The index of the rule each new rule was copied from
+            origins = []
             to_add = set()
             # Iterate over each rule in the existing ABA framework
-            for rule in aba.rules:
-                # If the current rule is atomic then generate new rules by appending indices to the head of atomic rules
-                if aba._is_atmomic_rule(rule):
-                    for i in range(1, k+1):
-                        if i != k:
-                            new_rules.append(Rule((f"{rule.head}{i}", rule.body)))
-                            to_add.add(f"{rule.head}{i}")
-                        else:
-                            new_rules.append(Rule((f"{rule.head}", rule.body)))
-                else:
-                    # If the rule is not atomic, generate new rules for its body
-                    for i in range(2, k+1):
-                        new_body = list(rule.body)
-                        for j, elem in enumerate(new_body):
-                            if not elem in aba.assumptions:
-                                new_body[j] = f"{elem}{i-1}"
-                                to_add.add(f"{elem}{i-1}")
-                        new_body = tuple(new_body) if len(new_body) > 1 else new_body[0]
-                        if i != k:
-                            new_rules.append(Rule((f"{rule.head}{i}", new_body)))
-                            to_add.add(f"{rule.head}{i}")
-                        else:
-                            new_rules.append(Rule((f"{rule.head}", new_body)))
+            for index, rule in enumerate(aba.rules):
+                component = component_of.get(rule.head)
+                # If the head is not part of a cycle the rule is kept as is
+                if component is None:
+                    new_rules.append(rule)
+                    origins.append(index)
+                    continue
+                k = len(component)
+                body = rule.body if isinstance(rule.body, tuple) else (rule.body,)
+                # Rules depending on literals of their own component can only be used from the second level
+                cyclic = any(elem in component for elem in body)
+                for i in range(2 if cyclic else 1, k+1):
+                    # Replace the literals of the component in the body by their copy at the previous level
+                    new_body = tuple(copies[(elem, i-1)] if elem in component else elem for elem in body)
+                    to_add.update(copies[(elem, i-1)] for elem in body if elem in component)
+                    new_body = new_body if isinstance(rule.body, tuple) else new_body[0]
+                    # Generate new rules using the copy of the head at this level except for the last level
+                    if i != k:
+                        new_rules.append(Rule((copies[(rule.head, i)], new_body)))
+                        to_add.add(copies[(rule.head, i)])
+                    else:
+                        new_rules.append(Rule((f"{rule.head}", new_body)))
+                    origins.append(index)
+            aba.stats.increment("cyclic_components", len(components))
+            aba.stats.increment("rules_duplicated", len(new_rules) - len(aba.rules))
             # Update the language and rules in the ABA framework
             aba.language.update(to_add)
             aba.rules = new_rules
-            # Check again if the ABA framework is circular after updates and if not raise a ConversionFailedError, if so return it
-            if aba._is_circular():
-                raise ConversionFailedError("There was something wrong during conversion")
-            else:
-                return aba
+            aba.rule_mapping = ABA_Generator._compose_mapping(aba, [[index] for index in origins])
+        # Check again if the ABA framework is circular after updates and if not raise a ConversionFailedError, if so return it
+        with aba.stats.phase("circularity_check"):
+            circular = aba._is_circular()
+        if circular:
+            raise ConversionFailedError("There was something wrong during conversion")
         else:
-            raise ConversionNotNeededError("ABA Framework is already non circular no conversion needed")
-        
+            return aba
+
+    @staticmethod
+    def _simplify(aba: ABA) -> ABA:
+        """
+            Simplifies an existing ABA framework in place before building arguments.
+
+            Three kinds of rules are removed:
+                - dead rules whose body contains a literal that can never be derived
+                - duplicate rules with the same head and the same body
+                - subsumed rules whose body strictly contains the body of another rule with the same head
+
+            The dead rules are found with ABA._live_rules, which also leaves them out of the arguments built without
+            simplification, so removing them and the duplicate rules keeps the results. The argument of a claim
+            gathering the leaves of all the rules with this head, removing the subsumed rules can however leave
+            fewer assumptions in it and so change the attacks. The subsumed
+            rules are found by going through the bodies of each head by increasing size while indexing the kept
+            bodies, a body looking its strict subsets up among them when it has fewer subsets than there are kept
+            bodies and being compared only with the kept bodies sharing one of its literals otherwise.
+
+            The rule_mapping attribute of the framework maps the index of each kept rule to the indices of
+            the rules it stands for in the framework given as input, composing the mapping left by a conversion
+            to non circular, so that results can be reported in terms of the original rules.
+
+            Args:
+                aba (ABA): The ABA framework to simplify
+
+            Returns:
+                ABA: The simplified ABA framework
+        """
+        with aba.stats.phase("simplification"):
+            bodies = [frozenset(rule.body if isinstance(rule.body, tuple) else (rule.body,)) - {''} for rule in aba.rules]
+            live = aba._live_rules(aba.rules)
+            # Group the live rules by head and body, the first rule of each group standing for its duplicates
+            groups = {}
+            for i in live:
+                groups.setdefault((aba.rules[i].head, bodies[i]), []).append(i)
+            # Sort the groups of each head by body size so that a rule can only be subsumed by a rule seen before it
+            by_head = {}
+            for (head, body), indices in groups.items():
+                by_head.setdefault(head, []).append((body, indices))
+            kept = []
+            for head, entries in by_head.items():
+                entries.sort(key=lambda entry: len(entry[0]))
+                head_kept = []
+                # The position in head_kept of each kept body and the positions of the kept bodies using each literal
+                position_of = {}
+                using = {}
+                for body, indices in entries:
+                    if 2 ** len(body) <= len(head_kept):
+                        # A small body looks its strict subsets up among the kept bodies
+                        subsets = (frozenset(subset) for size in range(len(body)) for subset in combinations(body, size))
+                        subsuming = [position_of[subset] for subset in subsets if subset in position_of]
+                    else:
+                        # A kept body is contained in this one when all its literals are found in it, and strictly as
+                        # the bodies are distinct and not larger
+                        found = {}
+                        for elem in body:
+                            for position in using.get(elem, ()):
+                                found[position] = found.get(position, 0) + 1
+                        subsuming = [position for position, count in found.items() if count == len(head_kept[position][0])]
+                        # A fact subsumes every other rule with its head
+                        if head_kept and not head_kept[0][0]:
+                            subsuming.append(0)
+                    if not subsuming:
+                        position_of[body] = len(head_kept)
+                        for elem in body:
+                            using.setdefault(elem, []).append(len(head_kept))
+                        head_kept.append((body, list(indices)))
+                    else:
+                        head_kept[min(subsuming)][1].extend(indices)
+                kept.extend(head_kept)
+            # Keep the rules in their original order and record which original rules each one stands for
+            kept.sort(key=lambda entry: entry[1][0])
+            aba.stats.increment("dead_rules_removed", len(aba.rules) - len(live))
+            aba.stats.increment("rules_removed", len(aba.rules) - len(kept))
+            aba.rule_mapping = ABA_Generator._compose_mapping(aba, [indices for _, indices in kept])
+            aba.rules = [aba.rules[indices[0]] for _, indices in kept]
+        return aba
 
     @staticmethod
-    def _convert_first(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None) -> ABA:
+    def _compose_mapping(aba: ABA, sources: list[list[int]]) -> dict[int, list[int]]:
+        """
+            Returns the rule mapping of new rules given the indices of the current rules each one stands for,
+            going back to the rules given as input through the current rule mapping if there is one.
+
+            Args:
+                aba (ABA): The ABA framework whose rules are being replaced
+                sources (list[list[int]]): The indices of the current rules each new rule stands for
+
+            Returns:
+                dict[int, list[int]]: The indices of the rules given as input each new rule stands for
+        """
+        if aba.rule_mapping is None:
+            return {i: sorted(indices) for i, indices in enumerate(sources)}
+        return {i: sorted({original for index in indices for original in aba.rule_mapping[index]}) for i, indices in enumerate(sources)}
+
+    @staticmethod
+    def _convert_first(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None, simplify: bool = False) -> ABA:
         """
             Converts the framework to atomic or non-circular based on the value provided, if None then just create the normal ABA framework
 
@@ -243,33 +447,28 @@ class ABA_Generator:
                 contraries (str) : A string representing the contraries in the framework
                 preferences (Optional[str]): An optional string representing preferences in the framework
                 convert_to (Optional[ConvertTo]) : An optional ConvertTo to specify a conversion to apply
+                simplify (bool): Whether to simplify the framework once converted. Defaults to False
 
             Returns:
                 ABA: An ABA object representing the framework
         """
-        # Check if conversion to atomic was asked for and if so convert it first 
-        if convert_to == ConvertTo.ATOMIC:
-            try:
-                aba = ABA_Generator.convert_to_atomic(language, assumptions, rules, contraries, preferences)
-            # If the aba is already atomic then just create the normal framework
-            except ConversionNotNeededError:
-                print("Here")
-                aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
-        else:
-            # Check if conversion to non circular was asked and if so convert it first
-            if convert_to == ConvertTo.NON_CIRCULAR:
-                try:
-                    aba = ABA_Generator.convert_to_non_circular(language, assumptions, rules, contraries, preferences)
-                # If the aba is already circular then just create the normal framework
-                except ConversionNotNeededError:
-                    aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
-            # By default just create the normal framework
-            else:
-                aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
+        # Create the corresponding ABA framework and apply the conversion asked for in place
+        aba = ABA_Generator.create_aba_framework(language, assumptions, rules, contraries, preferences)
+        try:
+            if convert_to == ConvertTo.ATOMIC:
+                ABA_Generator._make_atomic(aba)
+            elif convert_to == ConvertTo.NON_CIRCULAR:
+                ABA_Generator._make_non_circular(aba)
+        # If no conversion was needed then just keep the framework as is
+        except ConversionNotNeededError:
+            pass
+        # Simplify the framework if asked for
+        if simplify:
+            ABA_Generator._simplify(aba)
         return aba
     
     @staticmethod
-    def create_arguments(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None) -> ABA:
+    def create_arguments(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None, simplify: bool = False) -> ABA:
         """
             Creates arguments for the ABA framework based on the derived rules.
 
@@ -280,53 +479,19 @@ class ABA_Generator:
                 contraries (str): A string representing the contraries in the framework
                 preferences (Optional[str]): An optional string representing preferences in the framework
                 convert_to (Optional[ConvertTo]) : An optional ConvertTo to specify a conversion to apply
+                simplify (bool): Whether to simplify the framework before building the arguments. Defaults to False
 
             Returns:
                 ABA: The ABA object with generated arguments
         """
         # Convert the framework if neeed
-        aba = ABA_Generator._convert_first(language, assumptions, rules, contraries, preferences, convert_to)
-        # Derive new rules from the ABA framework and convert them into paths this allows us to get all the claims and leaves
-        derived_rules = [derived_rule.to_paths() for derived_rule in aba._derive_rules()]
-        pairs = []
-        # Iterate over each derived rule and its paths and add for each path create the dictionary with head and leaf
-        for derived_rule in derived_rules:
-            for path in derived_rule:
-                pairs.append({path[0]: path[-1]})
-        result = {}
-        # Process each pair and for each key in the pair if it appears in multiple dictionaries then create turn the value
-        # into a tuple containing all the values of it is a key for
-        for d in pairs:
-            for key, value in d.items():
-                if key in result:
-                    if not isinstance(result[key], tuple):
-                        result[key] = (result[key],)
-                    result[key] += (value,)
-                else:
-                    result[key] = value
-        myargs = []
-        # Iterate through the result dictionary to create arguments by only keeping the element in the value that are in assumptions
-        # or correspond to the empty string
-        for key, value in result.items():
-            if isinstance(value, tuple):
-                new_leaves = ()
-                for l in value:
-                    if l in aba.assumptions:
-                        new_leaves = new_leaves + (l,)
-                myargs.append(Argument(key, new_leaves))
-            else:
-                if value in aba.assumptions or value == '':
-                    myargs.append(Argument(key, (value,)))
-        # Add all assumptions as arguments
-        for assump in aba.assumptions:
-            if not Argument(assump, (assump,)) in myargs:
-                myargs.append(Argument(assump, (assump,)))
-        # Assign the constructed arguments to the ABA framework and return it
-        aba.arguments = myargs
+        aba = ABA_Generator._convert_first(language, assumptions, rules, contraries, preferences, convert_to, simplify)
+        # Build the arguments from the rules and assumptions of the framework
+        aba.build_arguments()
         return aba
 
     @staticmethod
-    def create_attacks(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None) -> ABA:
+    def create_attacks(language: str, assumptions: str, rules: str, contraries:str, preferences: str|None = None, convert_to: ConvertTo | None = None, simplify: bool = False) -> ABA:
         """
             Establishes attack relations among the arguments based on contraries.
 
@@ -337,29 +502,27 @@ class ABA_Generator:
                 contraries (str) : A string representing the contraries in the framework
                 preferences (Optional[str]): An optional string representing preferences in the framework
                 convert_to (Optional[ConvertTo]) : An optional ConvertTo to specify a conversion to apply
+                simplify (bool): Whether to simplify the framework before building the arguments. Defaults to False
 
             Returns:
                 ABA: An ABA object representing the framework with attacks computed
         """
         # Generate the argument for the ABA framework
-        aba = ABA_Generator.create_arguments(language, assumptions, rules, contraries, preferences, convert_to)
-        attacks = []
-        contraries = Contrary.to_dict(aba.contraries)
-        # Iterate over each argument in the ABA framework
-        for i, arg in enumerate(aba.arguments):
-            for j, other_arg in enumerate(aba.arguments):
-                # Check if the claim of the current argument has any contraries in the leaves of the other argument and if so add an attack
-                if any(arg.claim in contraries[elem] for elem in other_arg.leaves if elem in contraries):
-                    attacks.append(Attack(i,j))
-        # Assign the constructed attacks to the ABA framework and return it
-        aba.attacks = attacks
+        aba = ABA_Generator.create_arguments(language, assumptions, rules, contraries, preferences, convert_to, simplify)
+        # Build the attacks between the arguments based on contraries
+        aba.build_attacks()
         return aba
     
     @staticmethod
-    def create_normal_reverse_attacks(language: str, assumptions: str, rules: str, contraries: str, preferences: str | None = None, convert_to: ConvertTo | None = None) -> ABA:
+    def create_normal_reverse_attacks(language: str, assumptions: str, rules: str, contraries: str, preferences: str | None = None, convert_to: ConvertTo | None = None, simplify: bool = False, prune_assumptions: bool = True, backend: Backend = Backend.PYTHON, level: AttackLevel = AttackLevel.SUBSETS, timeout: float | None = 60, memory_budget: int | None = None, spill_directory: str | None = None) -> ABA:
         """
         Creates normal and reverse attacks for the ABA framework based on preferences.
 
+        By default the subsets are only enumerated over the assumptions that can change the attacks, the other
+        assumptions being stored in the inert_assumptions attribute of the framework. Each attack found then also
+        holds when adding any subset of the inert assumptions to either side, see ABA.expand_subset_attacks.
+        With AttackLevel.ARGUMENTS the attacks are instead reported between arguments, see ABA.build_argument_attacks.
+
         Args:
             language (str): A string representing the literals of the language in the framework
             assumptions (str): A string representing the literals of the assumptions in the framework
@@ -367,6 +530,14 @@ class ABA_Generator:
             contraries (str): A string representing the contraries in the framework
             preferences (Optional[str]): An optional string representing preferences in the framework
             convert_to (Optional[ConvertTo]) : An optional ConvertTo to specify a conversion to apply
+            simplify (bool): Whether to simplify the framework before building the arguments. Defaults to False
+            prune_assumptions (bool): Whether to enumerate only the subsets of relevant assumptions. Defaults to True
+            backend (Backend): The implementation used to compute the attacks, both giving the same result. Defaults to Backend.PYTHON
+            level (AttackLevel): Whether to report the attacks between subsets of assumptions or between arguments. Defaults to AttackLevel.SUBSETS
+            timeout (Optional[float]): The number of seconds the computation may take, None for no limit. Defaults to 60
+            memory_budget (Optional[int]): The number of bytes the attacks between subsets may use in memory, the attacks being
+                written to disk as SpilledAttacks when given. Defaults to None, keeping them all in memory
+            spill_directory (Optional[str]): The directory of the files holding the attacks. Defaults to the default temporary directory
 
         Returns:
             ABA: The ABA object with generated normal and reverse attacks.
@@ -376,51 +547,112 @@ class ABA_Generator:
             TimeoutError: If the attacks are taking too long to compute this can be due to the set of assumptions being very large.
         """
 
-        # Target function to run the computation in order to raise TimeoutError
-        def run_computation():
-            # Create arguments for the ABA framework using the specified components
-            aba = ABA_Generator.create_arguments(language, assumptions, rules, contraries, preferences, convert_to)
-            # Check if any preferences are specified and raise a ValueError if not
-            if len(aba.preferences) == 0:
-                raise ValueError("No preferences specified; cannot compute.")
-            # Get all subsets of the assumptions
-            subsets = Assumption.get_subsets(aba.assumptions)
-            # Convert contraries and preferences into dictionary format for easier lookup
-            contraries_dict = Contrary.to_dict(aba.contraries)
-            preferences_dict = Preference.to_dict(aba.preferences)
-            normal_attacks = []
-            reverse_attacks = []
-            # Iterate through each subset of assumptions
-            for subset in subsets:
-                for other_subset in subsets:
-                    for arg in aba.arguments:
-                        # Check if the argument's leaves are a subset of the current subset
-                        if set(arg.leaves).issubset(set(subset)):
-                            for y in other_subset:
-                                if y in contraries_dict:
-                                    # Check if the argument's claim has a contrary in the other subset
-                                    if arg.claim in contraries_dict[y]:
-                                        # Ensure no preferences exist for y in the leaves of the argument and if so add as a normal attack
-                                        if not any(y in preferences_dict[x] for x in arg.leaves if x in preferences_dict):
-                                            normal_attacks.append(f"{subset} -> {other_subset}")
-                        # Check if the argument's leaves are a subset of the other subset
-                        if set(arg.leaves).issubset(set(other_subset)):
-                            for x in subset:
-                                if x in contraries_dict:
-                                    # Check if the argument's claim has a contrary in the current subset
-                                    if arg.claim in contraries_dict[x]:
-                                        # Ensure preferences exist for x in the leaves of the argument and if so add as reverse attack
-                                        if any(x in preferences_dict[y] for y in arg.leaves if y in preferences_dict):
-                                            reverse_attacks.append(f"{subset} -> {other_subset}")
-            # Assign the constructed attacks to the ABA framework
-            aba.normal_attacks = list(set(normal_attacks))
-            aba.reverse_attacks = list(set(reverse_attacks))
-            return aba
-        # Create a thread to run the computation and wait for it complete with a timeout of 1 minute
-        computation_thread = threading.Thread(target=run_computation)
-        computation_thread.start()
-        computation_thread.join(timeout=60)
-        if computation_thread.is_alive():
+        # The computation checks its deadline at each checkpoint so it really stops once the time limit is over,
+        # instead of running on in an abandoned thread
+        try:
+            with Job.time_limit(timeout):
+                # Create arguments for the ABA framework using the specified components
+                aba = ABA_Generator.create_arguments(language, assumptions, rules, contraries, preferences, convert_to, simplify)
+                # Build the normal and reverse attacks between the arguments or between the subsets of assumptions
+                if level == AttackLevel.ARGUMENTS:
+                    aba.build_argument_attacks()
+                else:
+                    aba.build_normal_reverse_attacks(prune_assumptions, backend, memory_budget, spill_directory)
+        except TimeoutError:
             raise TimeoutError("Attacks are taking too long to compute this can be due to the set of assumptions being very large..")
-        # If the thread completed we simply return the result
-        return run_computation()
+        return aba
+
+    @staticmethod
+    def update_framework(aba: ABA, language: str, assumptions: str, rules: str, contraries: str, preferences: str | None = None) -> ABA:
+        """
+        Edits an existing framework in place so it matches the given inputs. Only the rules, assumptions, contraries
+        and preferences that differ are removed or added, and the arguments and attacks already built are updated
+        accordingly instead of being built again. The inputs are checked before the first edit, so the framework
+        is left unchanged if they can't be applied, and the preferences are only used once all the edits are done.
+
+        Args:
+            aba (ABA): The framework previously created from other inputs, without conversion nor simplification
+            language (str): A string representing the literals of the language in the framework
+            assumptions (str): A string representing the literals of the assumptions in the framework
+            rules (str): A string representing the rules in the framework
+            contraries (str): A string representing the contraries in the framework
+            preferences (Optional[str]): An optional string representing preferences in the framework
+
+        Returns:
+            ABA: The edited ABA object
+
+        Raises:
+            ConversionFailedError: If the framework generated is invalid
+        """
+        language = Language(language).parse()
+        assumptions = Assumption(assumptions).parse()
+        rules = Rule.parser(rules)
+        contraries = Contrary.parser(contraries)
+        preferences = Preference.parser(preferences) if preferences is not None else []
+
+        def difference(old: list, new: list) -> tuple[list, list]:
+            # Match the identical elements of both lists and return the indices of the old ones left and the new ones left
+            remaining = {}
+            for elem in new:
+                remaining[elem] = remaining.get(elem, 0) + 1
+            removed = []
+            for i, elem in enumerate(old):
+                if remaining.get(elem, 0) > 0:
+                    remaining[elem] -= 1
+                else:
+                    removed.append(i)
+            added = []
+            for elem in reversed(new):
+                if remaining.get(elem, 0) > 0:
+                    remaining[elem] -= 1
+                    added.append(elem)
+            return removed, added[::-1]
+
+        # Check the inputs before changing anything. Every intermediate framework only uses literals of one of both
+        # languages, and preferences either kept or added last, so once the framework given by the inputs is valid
+        # none of the edits can fail and the framework is never left half edited
+        target = ABA(language, assumptions, [Rule(rule) for rule in rules], [Contrary(contr) for contr in contraries],
+                     [Preference(pref) for pref in preferences])
+        if not target._is_valid():
+            raise ConversionFailedError("Invalid literals detected in the ABA framework.")
+        if aba.normal_attacks is not None:
+            # The preferences are checked as those of the framework will be once edited
+            target.normal_attacks = []
+            try:
+                target._check_preferences()
+            except ValueError as e:
+                raise ConversionFailedError(str(e))
+        # All the edits are done as a batch: replacing the preferences only has to give valid ones at the end
+        with aba.batch_edits():
+            # Keep the literals of both languages while editing so each edit can be checked
+            aba.language = aba.language | language
+            # Remove what is no longer there first, the preferences and contraries before the assumptions they use
+            removed, added_preferences = difference([(pref.least, pref.most) for pref in aba.preferences], [tuple(pref) for pref in preferences])
+            for least, most in [(aba.preferences[i].least, aba.preferences[i].most) for i in removed]:
+                aba.remove_preference(least, most)
+            removed, added_contraries = difference([(contr.contrary, contr.arg) for contr in aba.contraries], [tuple(contr) for contr in contraries])
+            for assumption, contrary in [(aba.contraries[i].contrary, aba.contraries[i].arg) for i in removed]:
+                aba.remove_contrary(assumption, contrary)
+            # The rules are matched in order as the arguments built depend on the order of the rules
+            rules = [tuple(rule) for rule in rules]
+            matcher = SequenceMatcher(None, [(rule.head, rule.body) for rule in aba.rules], rules, autojunk=False)
+            opcodes = matcher.get_opcodes()
+            for tag, i1, i2, _, _ in reversed(opcodes):
+                if tag in ('delete', 'replace'):
+                    for i in reversed(range(i1, i2)):
+                        aba.remove_rule(i)
+            for literal in sorted(assumptions - aba.assumptions):
+                aba.add_assumption(literal)
+            for literal in sorted(aba.assumptions - assumptions):
+                aba.remove_assumption(literal)
+            # Then add what is new, the assumptions being there already
+            for tag, _, _, j1, j2 in opcodes:
+                if tag in ('insert', 'replace'):
+                    for j in range(j1, j2):
+                        aba.add_rule(rules[j][0], rules[j][1], j)
+            for assumption, contrary in added_contraries:
+                aba.add_contrary(assumption, contrary)
+            for least, most in added_preferences:
+                aba.add_preference(least, most)
+            aba.language = language
+        return aba
@@ -1,4 +1,5 @@
 from helpers.language import Language
+from helpers.jobs import Job
 import itertools
 
 class Assumption(Language):
@@ -26,5 +27,9 @@ class Assumption(Language):
         """
         subsets = []
         for i in range(len(assumptions) + 1):
-            subsets.extend(itertools.combinations(assumptions, i))
+            combinations = itertools.combinations(assumptions, i)
+            # Enumerate by batches so a cancelled or timed out computation stops before the subsets fill the memory
+            while batch := list(itertools.islice(combinations, 65536)):
+                Job.checkpoint(message="Enumerating the subsets of assumptions")
+                subsets.extend(batch)
         return subsets
@@ -0,0 +1,358 @@
+from helpers.jobs import Job
+from enum import Enum
+
+class Backend(Enum):
+    """Enumeration for the backends computing the normal and reverse attacks.
+
+    This enum defines the possible implementations that can be used
+    when computing the attacks between subsets of assumptions.
+
+    Attributes:
+        PYTHON (str): Represents the reference implementation with Python loops.
+        NUMPY (str): Represents the vectorized implementation with NumPy matrices.
+    """
+    PYTHON = 'python'
+    NUMPY = 'numpy'
+
+class AttackMatrix:
+    """
+    The AttackMatrix class computes which subsets of assumptions attack each other in the ABA+ framework.
+    Subsets and arguments are given as bitsets of assumptions, see PreferenceOrder, and the attack relations
+    can be computed either with plain Python loops or with NumPy boolean matrices.
+
+    Attributes:
+        masks (list[int] or range): The bitset of each subset of assumptions, range(2 ** n) when the subsets are all the
+            subsets of n assumptions each given by its index.
+        encoded_args (list[tuple[int, int, int]]): For each argument, the bitsets of its leaves, of the assumptions it
+            attacks normally and of the assumptions it attacks through a reverse attack.
+
+    Methods:
+        __init__(self, masks: list[int], encoded_args: list[tuple[int, int, int]]):
+            Initializes the matrix with the subsets and the encoded arguments.
+
+        targets(self) -> tuple[list[int], list[int]]:
+            Returns for each subset the assumptions attacked normally and reversely by the arguments it contains.
+
+        numpy_targets(self) -> tuple[list[int], list[int]]:
+            Returns the same targets as targets computed with NumPy matrices.
+
+        python_pairs(self) -> tuple[tuple[list, list], tuple[list, list]]:
+            Returns the index pairs of the normal and reverse attacks using Python loops.
+
+        numpy_pairs(self, chunk_size: int = 1024) -> tuple[tuple[list, list], tuple[list, list]]:
+            Returns the index pairs of the normal and reverse attacks using NumPy matrices.
+
+        python_chunks(self, chunk_size: int = 1024):
+            Yields the index pairs of the normal and reverse attacks by chunks of attacking subsets using Python loops.
+
+        numpy_chunks(self, chunk_size: int = 1024):
+            Yields the index pairs of the normal and reverse attacks by chunks of attacking subsets using NumPy matrices.
+
+        python_keys(self, rows: int, columns: int):
+            Yields the keys of the normal and reverse attacks by tiles of subsets using Python loops.
+
+        numpy_keys(self, rows: int, columns: int):
+            Yields the keys of the normal and reverse attacks by tiles of subsets using NumPy matrices.
+    """
+
+    def __init__(self, masks: list[int] | range, encoded_args: list[tuple[int, int, int]]):
+        """
+        Initializes the AttackMatrix object with the subsets and the encoded arguments.
+
+        Args:
+            masks (list[int] or range): The bitset of each subset of assumptions.
+            encoded_args (list[tuple[int, int, int]]): The (leaves, normal attacked, reverse attacked) bitsets of each argument.
+        """
+        self.masks = masks
+        self.encoded_args = encoded_args
+        # The targets are computed once by whichever backend needs them first
+        self._targets = None
+
+    def targets(self) -> tuple[list[int], list[int]]:
+        """
+        Computes for each subset the assumptions attacked normally and reversely by the arguments contained in it.
+
+        Returns:
+            tuple[list[int], list[int]]: The normal and reverse targets bitsets of each subset.
+        """
+        if self._targets is None:
+            self._targets = self._python_targets(self.masks, True)
+        return self._targets
+
+    def _python_targets(self, masks, progress: bool = False) -> tuple[list[int], list[int]]:
+        """
+        Computes the normal and reverse targets bitsets of the given subsets with Python loops.
+        """
+        normal_targets = []
+        reverse_targets = []
+        for k, mask in enumerate(masks):
+            if progress:
+                Job.checkpoint(k / len(masks), "Computing the attacks of each subset")
+            normal, reverse = 0, 0
+            for leaves, normal_attacked, reverse_attacked in self.encoded_args:
+                if leaves & ~mask == 0:
+                    normal |= normal_attacked
+                    reverse |= reverse_attacked
+            normal_targets.append(normal)
+            reverse_targets.append(reverse)
+        return normal_targets, reverse_targets
+
+    def numpy_targets(self) -> tuple[list[int], list[int]]:
+        """
+        Computes the same targets as targets, with boolean matrix products instead of a loop over the subsets.
+
+        Returns:
+            tuple[list[int], list[int]]: The normal and reverse targets bitsets of each subset.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        if self._targets is None:
+            self._numpy_matrices()
+        return self._targets
+
+    def _numpy_matrices(self):
+        """
+        Encodes the subsets as a boolean matrix over the assumptions they use and computes the boolean matrices
+        of their normal and reverse targets, keeping the targets as bitsets as well.
+
+        Returns:
+            tuple: The subsets, normal targets and reverse targets matrices.
+        """
+        # NumPy is only needed by this backend so it is imported lazily
+        import numpy as np
+
+        # Only keep the assumptions used by at least one subset as columns
+        used = 0
+        for mask in self.masks:
+            used |= mask
+        bits = [b for b in range(used.bit_length()) if used >> b & 1]
+        small = used.bit_length() <= 64
+
+        def to_matrix(values):
+            # Bitsets fitting in 64 bits are unpacked with a vectorized shift, larger ones one by one
+            if small:
+                array = np.array(values, dtype=np.uint64).reshape(-1, 1)
+                return (array >> np.array(bits, dtype=np.uint64) & np.uint64(1)).astype(bool)
+            matrix = np.zeros((len(values), len(bits)), dtype=bool)
+            for row, value in enumerate(values):
+                matrix[row] = [value >> b & 1 for b in bits]
+            return matrix
+
+        def to_bitsets(matrix):
+            # The columns are distinct bits so summing their weights gives the bitset of each row
+            if small:
+                weights = np.uint64(1) << np.array(bits, dtype=np.uint64)
+                return (matrix * weights).sum(axis=1, dtype=np.uint64).tolist()
+            return [sum(1 << bits[k] for k in np.flatnonzero(row)) for row in matrix]
+
+        subsets = to_matrix(self.masks)
+        # Arguments whose leaves aren't all in some subset can never be used
+        encoded_args = [arg for arg in self.encoded_args if arg[0] & ~used == 0]
+        leaves = to_matrix([arg[0] for arg in encoded_args])
+        normal_attacked = to_matrix([arg[1] for arg in encoded_args])
+        reverse_attacked = to_matrix([arg[2] for arg in encoded_args])
+
+        # contained[s, a] is True when all the leaves of argument a are in subset s
+        contained = ~(~subsets @ leaves.T)
+        # targets[s, x] is True when an argument contained in subset s attacks assumption x
+        normal_targets = contained @ normal_attacked
+        reverse_targets = contained @ reverse_attacked
+        if self._targets is None:
+            self._targets = (to_bitsets(normal_targets), to_bitsets(reverse_targets))
+        return subsets, normal_targets, reverse_targets
+
+    def python_pairs(self) -> tuple[tuple[list, list], tuple[list, list]]:
+        """
+        Returns the index pairs (i, j) such that subset i attacks subset j, respectively normally and reversely.
+        Each relation is given as the list of the i indices and the list of the matching j indices.
+        This is the reference implementation, the pairs are listed in row-major order.
+
+        Returns:
+            tuple[tuple[list, list], tuple[list, list]]: The (rows, columns) of the normal attacks and of the reverse attacks.
+        """
+        return self._concatenate(self.python_chunks())
+
+    def numpy_pairs(self, chunk_size: int = 1024) -> tuple[tuple[list, list], tuple[list, list]]:
+        """
+        Returns the index pairs (i, j) such that subset i attacks subset j, respectively normally and reversely.
+        The subsets and arguments are encoded as boolean matrices over the assumptions so that containment
+        and attacks are computed with boolean matrix products. The subset pairs are processed by chunks
+        of rows to bound the memory used, and listed in the same row-major order as python_pairs.
+
+        Args:
+            chunk_size (int): The number of subsets handled at once as attackers. Defaults to 1024.
+
+        Returns:
+            tuple[tuple[list, list], tuple[list, list]]: The (rows, columns) of the normal attacks and of the reverse attacks.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        return self._concatenate(self.numpy_chunks(chunk_size))
+
+    @staticmethod
+    def _concatenate(chunks) -> tuple[tuple[list, list], tuple[list, list]]:
+        """
+        Concatenates the index pairs of the chunks yielded by python_chunks or numpy_chunks.
+        """
+        normal_pairs = ([], [])
+        reverse_pairs = ([], [])
+        for chunk_normal, chunk_reverse in chunks:
+            for pairs, chunk in ((normal_pairs, chunk_normal), (reverse_pairs, chunk_reverse)):
+                pairs[0].extend(chunk[0])
+                pairs[1].extend(chunk[1])
+        return normal_pairs, reverse_pairs
+
+    def python_chunks(self, chunk_size: int = 1024):
+        """
+        Yields the index pairs (i, j) such that subset i attacks subset j, respectively normally and reversely,
+        for each chunk of chunk_size attacking subsets i in turn, so the pairs never have to be held all at once.
+
+        Args:
+            chunk_size (int): The number of subsets handled at once as attackers. Defaults to 1024.
+
+        Yields:
+            tuple[tuple[list, list], tuple[list, list]]: The (rows, columns) of the normal and reverse attacks of the chunk.
+        """
+        normal_targets, reverse_targets = self.targets()
+        for start in range(0, len(self.masks), chunk_size):
+            normal_pairs = ([], [])
+            reverse_pairs = ([], [])
+            for i in range(start, min(start + chunk_size, len(self.masks))):
+                Job.checkpoint(i / len(self.masks), "Computing normal and reverse attacks")
+                for j, mask in enumerate(self.masks):
+                    # An argument from the subset attacks an assumption of the other subset none of its leaves is less preferred than
+                    if normal_targets[i] & mask:
+                        normal_pairs[0].append(i)
+                        normal_pairs[1].append(j)
+                    # An argument from the other subset attacks an assumption of the subset one of its leaves is less preferred than
+                    if reverse_targets[j] & self.masks[i]:
+                        reverse_pairs[0].append(i)
+                        reverse_pairs[1].append(j)
+            yield normal_pairs, reverse_pairs
+
+    def numpy_chunks(self, chunk_size: int = 1024):
+        """
+        Yields the index pairs (i, j) such that subset i attacks subset j, respectively normally and reversely,
+        for each chunk of chunk_size attacking subsets i in turn, see numpy_pairs.
+
+        Args:
+            chunk_size (int): The number of subsets handled at once as attackers. Defaults to 1024.
+
+        Yields:
+            tuple[tuple[list, list], tuple[list, list]]: The (rows, columns) of the normal and reverse attacks of the chunk.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        # NumPy is only needed by this backend so it is imported lazily
+        import numpy as np
+
+        subsets, normal_targets, reverse_targets = self._numpy_matrices()
+        for start in range(0, len(self.masks), chunk_size):
+            Job.checkpoint(start / len(self.masks), "Computing normal and reverse attacks")
+            stop = start + chunk_size
+            # normal[i, j]: subset i attacks an assumption of subset j
+            normal = normal_targets[start:stop] @ subsets.T
+            # reverse[i, j]: subset j attacks an assumption of subset i
+            reverse = subsets[start:stop] @ reverse_targets.T
+            chunk = []
+            for matrix in (normal, reverse):
+                rows, columns = np.nonzero(matrix)
+                chunk.append(((rows + start).tolist(), columns.tolist()))
+            yield tuple(chunk)
+
+    def python_keys(self, rows: int, columns: int):
+        """
+        Yields the keys i * n + j, n being the number of subsets, of the pairs such that subset i attacks subset j,
+        respectively normally and reversely. The pairs are handled by tiles of at most rows attacking subsets and columns
+        attacked subsets, the targets being computed for the attacking subsets of each tile, so neither the targets of
+        all the subsets nor the keys of more than a tile are ever held. The keys aren't yielded in any particular order.
+
+        Args:
+            rows (int): The number of subsets handled at once as attackers.
+            columns (int): The number of subsets handled at once as attacked.
+
+        Yields:
+            tuple[list[int], list[int]]: The keys of the normal and reverse attacks of the tile.
+        """
+        n = len(self.masks)
+        for start in range(0, n, rows):
+            attackers = range(start, min(start + rows, n))
+            normal_targets, reverse_targets = self._python_targets(self.masks[start:start + rows])
+            for first in range(0, n, columns):
+                Job.checkpoint(start / n, "Computing normal and reverse attacks")
+                attacked = self.masks[first:first + columns]
+                # An argument from subset i attacks an assumption of subset j none of its leaves is less preferred than
+                normal_keys = [i * n + first + j for i, targets in zip(attackers, normal_targets) for j, mask in enumerate(attacked) if targets & mask]
+                # An argument from subset i attacks an assumption of subset j one of its leaves is less preferred than,
+                # giving the reverse attack from j to i
+                reverse_keys = [(first + j) * n + i for i, targets in zip(attackers, reverse_targets) for j, mask in enumerate(attacked) if targets & mask]
+                yield normal_keys, reverse_keys
+                # The keys of the tile are released before computing the next one
+                del normal_keys, reverse_keys
+
+    def numpy_keys(self, rows: int, columns: int):
+        """
+        Yields the same keys as python_keys by tiles of subsets, the targets of the attacking subsets of each tile
+        and the attacks of the tile being computed as NumPy arrays. The bitsets must fit in 64 bits, which is always
+        the case for subsets given by their index. A tile takes about 25 bytes per pair of subsets, and computing the
+        targets about 20 bytes per attacking subset and argument.
+
+        Args:
+            rows (int): The number of subsets handled at once as attackers.
+            columns (int): The number of subsets handled at once as attacked.
+
+        Yields:
+            tuple[numpy.ndarray, numpy.ndarray]: The keys of the normal and reverse attacks of the tile.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        # NumPy is only needed by this backend so it is imported lazily
+        import numpy as np
+
+        def to_array(masks):
+            if isinstance(masks, range):
+                return np.arange(masks.start, masks.stop, dtype=np.uint64)
+            return np.array(masks, dtype=np.uint64)
+
+        n = len(self.masks)
+        leaves, normal_attacked, reverse_attacked = (np.array([arg[k] for arg in self.encoded_args], dtype=np.uint64) for k in range(3))
+        zero = np.uint64(0)
+
+        def tile(targets, attacked):
+            # The rows and columns (i, j) of the tile such that targets[i] & attacked[j] is set
+            columns = np.flatnonzero((targets[:, None] & attacked[None, :]) != zero)
+            rows = columns // len(attacked)
+            columns %= len(attacked)
+            return rows, columns
+
+        for start in range(0, n, rows):
+            attackers = to_array(self.masks[start:start + rows])
+            # contained[s, a] is True when all the leaves of argument a are in subset s
+            contained = (attackers[:, None] & leaves[None, :]) == leaves[None, :]
+            normal_targets = np.bitwise_or.reduce(np.where(contained, normal_attacked[None, :], zero), axis=1, initial=zero)
+            reverse_targets = np.bitwise_or.reduce(np.where(contained, reverse_attacked[None, :], zero), axis=1, initial=zero)
+            del contained
+            for first in range(0, n, columns):
+                Job.checkpoint(start / n, "Computing normal and reverse attacks")
+                attacked = to_array(self.masks[first:first + columns])
+                # Subset start + i attacks subset first + j normally, the key being computed in place
+                normal_keys, offsets = tile(normal_targets, attacked)
+                normal_keys += start
+                normal_keys *= n
+                offsets += first
+                normal_keys += offsets
+                del offsets
+                # Subset start + i attacks an assumption of subset first + j with a less preferred leaf, the reverse attack going from first + j to start + i
+                sources, reverse_keys = tile(reverse_targets, attacked)
+                reverse_keys += first
+                reverse_keys *= n
+                sources += start
+                reverse_keys += sources
+                del sources
+                yield normal_keys, reverse_keys
+                # The keys of the tile are released before computing the next one
+                del normal_keys, reverse_keys
@@ -0,0 +1,381 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+import time
+
+# The job run by the current thread and the deadline of its computation, if any
+_local = threading.local()
+
+class JobCancelledError(Exception):
+    """
+    Exception raised inside a computation when the job running it was cancelled.
+
+    Attributes:
+        message (str): Explanation of the error
+    """
+    def __init__(self, message="The computation was cancelled"):
+        self.message = message
+        super().__init__(self.message)
+
+class AdmissionError(Exception):
+    """
+    Exception raised when a job can't be accepted because too many jobs are waiting or the user already runs too many.
+
+    Attributes:
+        message (str): Explanation of the error
+    """
+    def __init__(self, message="Too many computations are waiting, please try again later"):
+        self.message = message
+        super().__init__(self.message)
+
+class Job:
+    """
+    The Job class represents a computation running in the background. The computation can report its
+    progress and check whether it was cancelled by calling Job.checkpoint, which does nothing when
+    the code isn't run by a job so the same functions can be called directly.
+
+    Attributes:
+        key (tuple): The key identifying the computation, made of the operation and its inputs.
+        progress (float): The progress of the computation between 0 and 1.
+        message (str): A description of the step currently computed.
+        future (optional[Future]): The future holding the result of the computation once submitted.
+        owners (set): The users waiting for the result of the job.
+        started (bool): Whether the computation was started by a thread of the pool.
+
+    Methods:
+        __init__(self, key: tuple):
+            Initializes the job with no progress.
+
+        cancel(self):
+            Asks the computation to stop at its next checkpoint.
+
+        cancelled(self) -> bool:
+            Checks if the job was cancelled.
+
+        done(self) -> bool:
+            Checks if the computation is over, whether it succeeded, failed or was cancelled.
+
+        failed(self) -> bool:
+            Checks if the computation raised an exception or was cancelled.
+
+        result(self):
+            Returns the result of the computation, raising its exception if it failed.
+
+        running(self):
+            Context manager making the job the current job of the thread.
+
+        current() -> Job | None:
+            Static method returning the job run by the current thread.
+
+        checkpoint(progress: float | None = None, message: str | None = None):
+            Static method reporting the progress of the current job and stopping it if it was cancelled or is past its deadline.
+
+        time_limit(seconds: float | None):
+            Static context manager giving a deadline to the computations of the enclosed block.
+    """
+
+    def __init__(self, key: tuple):
+        """
+        Initializes the Job object with no progress.
+
+        Args:
+            key (tuple): The key identifying the computation, made of the operation and its inputs.
+        """
+        self.key = key
+        self.progress = 0.0
+        self.message = ""
+        self.future = None
+        self.owners = set()
+        self.started = False
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        Asks the computation to stop. A job still waiting to be run never starts, a running one stops at its next checkpoint.
+        """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def cancelled(self) -> bool:
+        """
+        Checks if the job was cancelled.
+
+        Returns:
+            bool: True if the job was cancelled; False otherwise.
+        """
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        """
+        Checks if the computation is over, whether it succeeded, failed or was cancelled.
+
+        Returns:
+            bool: True if the computation is over; False otherwise.
+        """
+        return self.future is not None and self.future.done()
+
+    def failed(self) -> bool:
+        """
+        Checks if the computation raised an exception or was cancelled.
+
+        Returns:
+            bool: True if the computation is over without a result; False otherwise.
+        """
+        return self.done() and (self.future.cancelled() or self.future.exception() is not None)
+
+    def result(self):
+        """
+        Returns the result of the computation, waiting for it if needed.
+
+        Returns:
+            The value returned by the computation.
+
+        Raises:
+            JobCancelledError: If the job was cancelled.
+            Exception: The exception raised by the computation if it failed.
+        """
+        if self.future.cancelled():
+            raise JobCancelledError()
+        return self.future.result()
+
+    @contextmanager
+    def running(self):
+        """
+        Makes the job the current job of the thread for the enclosed block so checkpoints report to it.
+        """
+        previous = getattr(_local, "job", None)
+        _local.job = self
+        try:
+            yield self
+        finally:
+            _local.job = previous
+
+    @staticmethod
+    def current() -> "Job | None":
+        """
+        Returns the job run by the current thread.
+
+        Returns:
+            Job | None: The current job, None if the code isn't run by a job.
+        """
+        return getattr(_local, "job", None)
+
+    @staticmethod
+    def checkpoint(progress: float | None = None, message: str | None = None):
+        """
+        Reports the progress of the current job and stops the computation if it was cancelled or if the
+        deadline set by time_limit is over. Only the deadline is checked if the code isn't run by a job.
+
+        Args:
+            progress (optional[float]): The progress of the computation between 0 and 1.
+            message (optional[str]): A description of the step currently computed.
+
+        Raises:
+            JobCancelledError: If the current job was cancelled.
+            TimeoutError: If the deadline of the computation is over.
+        """
+        deadline = getattr(_local, "deadline", None)
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("The computation took longer than its time limit")
+        job = getattr(_local, "job", None)
+        if job is None:
+            return
+        if progress is not None:
+            job.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            job.message = message
+        if job._cancelled.is_set():
+            raise JobCancelledError()
+
+    @staticmethod
+    @contextmanager
+    def time_limit(seconds: float | None):
+        """
+        Gives a deadline to the computations of the enclosed block in the current thread, the first checkpoint
+        reached after it raising a TimeoutError. Unlike a timeout on a thread, the computation really stops.
+        A deadline set by an enclosing block is kept if it is earlier.
+
+        Args:
+            seconds (optional[float]): The time the block is allowed to take, no deadline being set if None.
+        """
+        previous = getattr(_local, "deadline", None)
+        if seconds is not None:
+            deadline = time.monotonic() + seconds
+            _local.deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            _local.deadline = previous
+
+class JobRunner:
+    """
+    The JobRunner class runs computations in a bounded pool of background threads and memoizes them by key,
+    so submitting the same operation with the same inputs again returns the job already computed or being
+    computed instead of starting a new one. A single runner can be shared by all the users of the application:
+    jobs wait in a bounded queue for a free thread, each user can only have a limited number of jobs running
+    or waiting, and a job no user waits for anymore is cancelled.
+
+    Attributes:
+        cache_size (int): The maximum number of jobs kept once finished, the least recently used being dropped first.
+        max_queued (int): The maximum number of jobs waiting for a free thread.
+        max_per_owner (int): The maximum number of unfinished jobs a user can wait for.
+
+    Methods:
+        __init__(self, max_workers: int = 2, cache_size: int = 32, max_queued: int = 16, max_per_owner: int = 2):
+            Initializes the runner with its pool of threads.
+
+        submit(self, key: tuple, fn, *args, owner=None, **kwargs) -> Job:
+            Returns the job computing the given key, starting it if it isn't known.
+
+        get(self, key: tuple) -> Job | None:
+            Returns the job computing the given key if it is known.
+
+        release(self, key: tuple, owner):
+            Tells the runner a user no longer waits for a job, cancelling it if no other user does.
+
+        position(self, job: Job) -> int:
+            Returns the position of a job in the queue, 0 once it is started.
+    """
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 32, max_queued: int = 16, max_per_owner: int = 2):
+        """
+        Initializes the JobRunner object with its pool of threads.
+
+        Args:
+            max_workers (int): The number of computations run at the same time. Defaults to 2.
+            cache_size (int): The maximum number of jobs kept once finished. Defaults to 32.
+            max_queued (int): The maximum number of jobs waiting for a free thread. Defaults to 16.
+            max_per_owner (int): The maximum number of unfinished jobs a user can wait for. Defaults to 2.
+        """
+        self.cache_size = cache_size
+        self.max_queued = max_queued
+        self.max_per_owner = max_per_owner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aba-job")
+        self._jobs = OrderedDict()
+        # The jobs waiting for a free thread, in the order they will be started
+        self._waiting = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key: tuple, fn, *args, owner=None, **kwargs) -> Job:
+        """
+        Returns the job computing the given key. If a job for the key is known and didn't fail it is reused,
+        otherwise a new job running fn(*args, **kwargs) is queued. In both cases the owner is added to the
+        users waiting for the job.
+
+        Args:
+            key (tuple): The key identifying the computation, made of the operation and its inputs.
+            fn (callable): The function doing the computation.
+            *args: The positional arguments of the function.
+            owner (optional): The user submitting the job, used to limit the number of jobs of each user.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            Job: The job computing the key.
+
+        Raises:
+            AdmissionError: If the queue is full or the owner already waits for too many unfinished jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled() and not job.failed():
+                if not job.done() and owner is not None and owner not in job.owners:
+                    self._admit(owner)
+                self._jobs.move_to_end(key)
+            else:
+                if owner is not None:
+                    self._admit(owner)
+                if len(self._waiting) >= self.max_queued:
+                    raise AdmissionError()
+                job = Job(key)
+                self._waiting[key] = job
+                job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+                self._jobs[key] = job
+                self._evict()
+            if owner is not None:
+                job.owners.add(owner)
+            return job
+
+    def _admit(self, owner):
+        """
+        Checks the owner can wait for one more unfinished job, the lock being held.
+
+        Raises:
+            AdmissionError: If the owner already waits for too many unfinished jobs.
+        """
+        running = sum(1 for job in self._jobs.values() if owner in job.owners and not job.done() and not job.cancelled())
+        if running >= self.max_per_owner:
+            raise AdmissionError(f"You already have {running} computations running, please wait for them to finish or cancel them")
+
+    def get(self, key: tuple) -> Job | None:
+        """
+        Returns the job computing the given key if it is known.
+
+        Args:
+            key (tuple): The key identifying the computation.
+
+        Returns:
+            Job | None: The job computing the key, None if it isn't known.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def release(self, key: tuple, owner):
+        """
+        Tells the runner a user no longer waits for the job computing the given key. If the job is unfinished and
+        no other user waits for it, it is cancelled so abandoned computations don't keep a thread busy.
+
+        Args:
+            key (tuple): The key identifying the computation.
+            owner: The user who no longer waits for the job.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return
+            job.owners.discard(owner)
+            if not job.owners and not job.done():
+                job.cancel()
+                self._waiting.pop(key, None)
+                self._jobs.pop(key, None)
+
+    def position(self, job: Job) -> int:
+        """
+        Returns the position of a job in the queue.
+
+        Args:
+            job (Job): The job to locate.
+
+        Returns:
+            int: The number of jobs started before it plus one while it waits, 0 once it is started.
+        """
+        with self._lock:
+            for i, waiting in enumerate(self._waiting.values()):
+                if waiting is job:
+                    return i + 1
+            return 0
+
+    def _run(self, job: Job, fn, args, kwargs):
+        """
+        Runs the computation of a job in a thread of the pool.
+        """
+        with self._lock:
+            self._waiting.pop(job.key, None)
+            job.started = True
+        with job.running():
+            Job.checkpoint(0.0)
+            result = fn(*args, **kwargs)
+        job.progress = 1.0
+        return result
+
+    def _evict(self):
+        """
+        Drops the least recently used finished jobs while more than cache_size jobs are kept.
+        """
+        finished = [key for key, job in self._jobs.items() if job.done()]
+        while len(self._jobs) > self.cache_size and finished:
+            del self._jobs[finished.pop(0)]
@@ -0,0 +1,119 @@
+from helpers.preference import Preference
+
+class PreferenceOrder:
+    """
+    The PreferenceOrder class represents the strict order induced by a list of preferences over a set of assumptions.
+    The transitive closure of the preferences is computed once and stored as bitsets, where each assumption is
+    given a bit, so that comparisons between assumptions and sets of assumptions are done with integer operations.
+
+    Attributes:
+        literals (list[str]): The ordered list of assumptions, the position of each one being its bit.
+        index (dict[str, int]): The bit of each assumption.
+        below (list[int]): For each assumption, the bitset of the assumptions strictly less preferred.
+        above (list[int]): For each assumption, the bitset of the assumptions strictly more preferred.
+
+    Methods:
+        __init__(self, preferences: list[Preference], literals):
+            Initializes the order by computing the transitive closure of the preferences.
+
+        mask(self, literals) -> int:
+            Returns the bitset of the given assumptions.
+
+        is_less(self, least: str, most: str) -> bool:
+            Checks if an assumption is strictly less preferred than another one.
+
+        any_below(self, mask: int, literal: str) -> bool:
+            Checks if any assumption of a bitset is strictly less preferred than the given assumption.
+
+        dominated(self, mask: int) -> int:
+            Returns the bitset of the assumptions strictly more preferred than at least one assumption of a bitset.
+    """
+
+    def __init__(self, preferences: list[Preference], literals):
+        """
+        Initializes the order by computing the transitive closure of the preferences over the given assumptions.
+
+        Args:
+            preferences (list[Preference]): The preferences between assumptions.
+            literals (iterable): The assumptions of the framework.
+
+        Raises:
+            ValueError: If the preferences contain a cycle and thus aren't a strict order.
+        """
+        self.literals = sorted(literals)
+        self.index = {literal: i for i, literal in enumerate(self.literals)}
+        self.below = [0] * len(self.literals)
+        for pref in preferences:
+            self.below[self.index[pref.most]] |= 1 << self.index[pref.least]
+        # Compute the transitive closure: if k is below i then everything below k is also below i
+        for k in range(len(self.literals)):
+            bit = 1 << k
+            for i in range(len(self.literals)):
+                if self.below[i] & bit:
+                    self.below[i] |= self.below[k]
+        # A strict order is irreflexive so no assumption can be below itself
+        for i, literal in enumerate(self.literals):
+            if self.below[i] >> i & 1:
+                raise ValueError(f"Preferences are not a strict order: {literal} is less preferred than itself.")
+        self.above = [0] * len(self.literals)
+        for i in range(len(self.literals)):
+            for j in range(len(self.literals)):
+                if self.below[i] >> j & 1:
+                    self.above[j] |= 1 << i
+
+    def mask(self, literals) -> int:
+        """
+        Returns the bitset of the given assumptions.
+
+        Args:
+            literals (iterable): The assumptions to convert into a bitset.
+
+        Returns:
+            int: The bitset with the bit of each assumption set.
+        """
+        mask = 0
+        for literal in literals:
+            mask |= 1 << self.index[literal]
+        return mask
+
+    def is_less(self, least: str, most: str) -> bool:
+        """
+        Checks if an assumption is strictly less preferred than another one.
+
+        Args:
+            least (str): The assumption expected to be less preferred.
+            most (str): The assumption expected to be more preferred.
+
+        Returns:
+            bool: True if least < most; False otherwise.
+        """
+        return bool(self.below[self.index[most]] >> self.index[least] & 1)
+
+    def any_below(self, mask: int, literal: str) -> bool:
+        """
+        Checks if any assumption of a bitset is strictly less preferred than the given assumption.
+
+        Args:
+            mask (int): The bitset of assumptions, for instance the leaves of an argument.
+            literal (str): The assumption to compare with.
+
+        Returns:
+            bool: True if some assumption x of the bitset satisfies x < literal; False otherwise.
+        """
+        return bool(self.below[self.index[literal]] & mask)
+
+    def dominated(self, mask: int) -> int:
+        """
+        Returns the bitset of the assumptions strictly more preferred than at least one assumption of a bitset.
+
+        Args:
+            mask (int): The bitset of assumptions, for instance the leaves of an argument.
+
+        Returns:
+            int: The bitset of the assumptions y such that x < y for some x in the bitset.
+        """
+        dominated = 0
+        for i in range(len(self.literals)):
+            if mask >> i & 1:
+                dominated |= self.above[i]
+        return dominated
@@ -0,0 +1,255 @@
+from helpers.aba import ABA
+from helpers.attack import Attack
+from array import array
+from itertools import islice
+import csv
+import io
+import json
+import re
+import tempfile
+
+class ResultTable:
+    """
+    The ResultTable class gives a tabular view over one of the results of an ABA framework: its arguments, attacks,
+    normal attacks or reverse attacks. Rows are built lazily from the framework so only the rows displayed or
+    written are ever turned into text, which keeps large results cheap to browse, filter and export. The positions
+    of the rows matching the last queries are kept, so any page of a search is built without scanning the rows before it.
+
+    Attributes:
+        aba (ABA): The framework holding the results.
+        name (str): The name of the table, one of TABLES.
+
+    Methods:
+        __init__(self, aba: ABA, name: str):
+            Initializes the table over the given result of the framework.
+
+        available(aba: ABA) -> list[str]:
+            Static method returning the names of the tables computed for the framework.
+
+        columns(self) -> list[str]:
+            Returns the names of the columns of the table.
+
+        rows(self, query: str = ""):
+            Yields the rows of the table matching the query.
+
+        count(self, query: str = "") -> int:
+            Returns the number of rows matching the query.
+
+        page(self, number: int, size: int, query: str = "") -> list[dict]:
+            Returns the rows of the given page among the rows matching the query.
+
+        write_csv(self, file, query: str = ""):
+            Writes the rows matching the query to a file as CSV.
+
+        write_json(self, file, query: str = ""):
+            Writes the rows matching the query to a file as a JSON array.
+
+        export(self, format: str, query: str = ""):
+            Returns a temporary file holding the rows matching the query in the given format.
+    """
+
+    TABLES = ("arguments", "attacks", "normal_attacks", "reverse_attacks")
+    # Number of queries whose matching positions are kept
+    CACHED_QUERIES = 8
+
+    def __init__(self, aba: ABA, name: str):
+        """
+        Initializes the ResultTable object over the given result of the framework.
+
+        Args:
+            aba (ABA): The framework holding the results.
+            name (str): The name of the table, one of TABLES.
+
+        Raises:
+            ValueError: If the name isn't one of TABLES.
+        """
+        if name not in self.TABLES:
+            raise ValueError(f"Unknown table {name}, expected one of {', '.join(self.TABLES)}.")
+        self.aba = aba
+        self.name = name
+        self._positions = {}
+
+    @staticmethod
+    def available(aba: ABA) -> list[str]:
+        """
+        Returns the names of the tables computed for the framework.
+
+        Args:
+            aba (ABA): The framework holding the results.
+
+        Returns:
+            list[str]: The names of the results that were computed.
+        """
+        return [name for name in ResultTable.TABLES if getattr(aba, name) is not None]
+
+    def _between_arguments(self) -> bool:
+        """
+        Checks if the rows are attacks between arguments rather than between subsets of assumptions.
+        """
+        items = getattr(self.aba, self.name)
+        return self.name == "attacks" or any(isinstance(item, Attack) for item in islice(items, 1))
+
+    def columns(self) -> list[str]:
+        """
+        Returns the names of the columns of the table.
+
+        Returns:
+            list[str]: The names of the columns.
+        """
+        if self.name == "arguments":
+            return ["argument", "claim", "leaves"]
+        if self._between_arguments():
+            return ["source", "destination", "source_claim", "destination_claim"]
+        return ["source", "destination"]
+
+    def _item(self, item):
+        """
+        Returns the row built from an item of the result with the literals it is about, which the queries are matched against.
+        """
+        if self.name == "arguments":
+            i, arg = item
+            return {"argument": f"A{i}", "claim": arg.claim, "leaves": ", ".join(arg.leaves)}, (arg.claim, *arg.leaves)
+        if isinstance(item, Attack):
+            source, destination = self.aba.arguments[item.source], self.aba.arguments[item.destination]
+            return ({"source": f"A{item.source}", "destination": f"A{item.destination}",
+                     "source_claim": source.claim, "destination_claim": destination.claim},
+                    (source.claim, *source.leaves, destination.claim, *destination.leaves))
+        return ({"source": ", ".join(item.source), "destination": ", ".join(item.destination)},
+                (*item.source, *item.destination))
+
+    def _items(self):
+        """
+        Yields the position of each row of the table in the result with the row and the literals it is about.
+        """
+        if self.name == "arguments":
+            for i, arg in enumerate(self.aba.arguments):
+                if arg is not None:
+                    yield i, *self._item((i, arg))
+        else:
+            for i, item in enumerate(getattr(self.aba, self.name)):
+                yield i, *self._item(item)
+
+    def _row(self, position: int) -> dict:
+        """
+        Returns the row at the given position in the result.
+        """
+        item = getattr(self.aba, self.name)[position]
+        return self._item((position, item) if self.name == "arguments" else item)[0]
+
+    def _matching(self, query: str):
+        """
+        Returns the positions in the result of the rows matching the query, computed once per query.
+        """
+        terms = frozenset(re.findall(r'\w+', query))
+        if not terms and self.name != "arguments":
+            # Every attack matches, at the position of its row
+            return range(len(getattr(self.aba, self.name)))
+        positions = self._positions.pop(terms, None)
+        if positions is None:
+            positions = array("q", (i for i, _, literals in self._items() if terms.issubset(literals)))
+            if len(self._positions) >= self.CACHED_QUERIES:
+                # Forget the query used the longest time ago
+                del self._positions[next(iter(self._positions))]
+        self._positions[terms] = positions
+        return positions
+
+    def rows(self, query: str = ""):
+        """
+        Yields the rows of the table matching the query. A row matches if each literal of the query,
+        separated by commas or spaces, is a claim, a leaf or an assumption of the row.
+
+        Args:
+            query (str): The literals to search for, every row matching an empty query.
+
+        Yields:
+            dict: The rows of the table matching the query, mapping each column to its value.
+        """
+        terms = set(re.findall(r'\w+', query))
+        for _, row, literals in self._items():
+            if terms.issubset(literals):
+                yield row
+
+    def count(self, query: str = "") -> int:
+        """
+        Returns the number of rows matching the query.
+
+        Args:
+            query (str): The literals to search for.
+
+        Returns:
+            int: The number of rows matching the query.
+        """
+        return len(self._matching(query))
+
+    def page(self, number: int, size: int, query: str = "") -> list[dict]:
+        """
+        Returns the rows of the given page among the rows matching the query, only these rows being built.
+        The rows are found from the positions matching the query, so no row before the page is read again.
+
+        Args:
+            number (int): The number of the page starting from 0.
+            size (int): The number of rows per page.
+            query (str): The literals to search for.
+
+        Returns:
+            list[dict]: The rows of the page.
+        """
+        return [self._row(position) for position in self._matching(query)[number * size:(number + 1) * size]]
+
+    def write_csv(self, file, query: str = ""):
+        """
+        Writes the rows matching the query to a file as CSV, one row at a time.
+
+        Args:
+            file (file-like): The text file to write to.
+            query (str): The literals to search for.
+        """
+        writer = csv.DictWriter(file, fieldnames=self.columns())
+        writer.writeheader()
+        for row in self.rows(query):
+            writer.writerow(row)
+
+    def write_json(self, file, query: str = ""):
+        """
+        Writes the rows matching the query to a file as a JSON array, one row at a time.
+
+        Args:
+            file (file-like): The text file to write to.
+            query (str): The literals to search for.
+        """
+        file.write("[")
+        for i, row in enumerate(self.rows(query)):
+            file.write(",\n" if i > 0 else "\n")
+            file.write(json.dumps(row))
+        file.write("\n]\n")
+
+    def export(self, format: str, query: str = ""):
+        """
+        Returns a temporary file holding the rows matching the query in the given format. The rows are encoded and
+        written to disk one at a time, so large results never have to fit in memory as text, and the file is removed
+        once closed.
+
+        Args:
+            format (str): The format of the file, either "csv" or "json".
+            query (str): The literals to search for.
+
+        Returns:
+            io.FileIO: The unbuffered binary file positioned at its start, which st.download_button accepts.
+
+        Raises:
+            ValueError: If the format isn't supported.
+        """
+        if format not in ("csv", "json"):
+            raise ValueError(f"Unknown format {format}, expected csv or json.")
+        file = tempfile.TemporaryFile(mode="w+b", buffering=0)
+        # Write the text through a buffer and a wrapper so the rows are encoded as they are written
+        text = io.TextIOWrapper(io.BufferedWriter(file), encoding="utf-8", newline="")
+        if format == "csv":
+            self.write_csv(text, query)
+        else:
+            self.write_json(text, query)
+        text.flush()
+        # Detach the wrapper and the buffer so the file stays open once they are garbage collected
+        text.detach().detach()
+        file.seek(0)
+        return file
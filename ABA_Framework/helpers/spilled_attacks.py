@@ -0,0 +1,380 @@
+from helpers.jobs import Job
+from helpers.subset_attack import SubsetAttack
+from array import array
+import heapq
+import os
+import tempfile
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    # Without NumPy the runs are sorted with Python integers, which takes more memory than the budget
+    np = None
+
+class SpilledAttacks:
+    """
+    The SpilledAttacks class holds normal or reverse attacks between subsets of assumptions on disk instead of in memory,
+    for the frameworks whose attacks don't fit in memory. A subset is given by its index, whose bit t is set when the
+    t-th assumption of literals is in the subset, and each attack by the key source * count + destination of the
+    indices of its source and destination. The keys are added in a buffer of bounded size which is sorted in place,
+    deduplicated and written to a temporary file, called a run, each time it is full. Once all the keys are added the
+    runs are merged, a bounded number at a time, into a single sorted file of pairs without duplicates, read back one
+    block at a time when iterating. The files are removed once the object is garbage collected.
+
+    The memory budget bounds the buffer of keys, the mask used to deduplicate it and the blocks read and written when
+    merging. The buffer is only committed by the system as it is filled, so small results don't take the whole budget.
+    Without NumPy the runs are sorted with Python integers, which takes several times the budget.
+
+    Attributes:
+        literals (list[str]): The assumptions the bits of the subset indices stand for.
+        count (int): The number of subsets, 2 ** len(literals).
+        memory_budget (int): The number of bytes the keys may use in memory.
+        directory (optional[str]): The directory of the temporary files, the default temporary directory if None.
+        path (optional[str]): The path of the merged file once finished.
+
+    Methods:
+        __init__(self, literals: list[str], memory_budget: int, directory: str | None = None):
+            Initializes the attacks with an empty buffer.
+
+        subset(self, index: int) -> tuple:
+            Returns the subset of assumptions of the given index.
+
+        add(self, keys):
+            Adds the keys of attacks, writing a run when the buffer is full.
+
+        finish(self):
+            Merges the runs into a single sorted file without duplicates.
+
+        pairs(self):
+            Yields the (source, destination) index pairs in sorted order.
+
+        memmap(self):
+            Returns the pairs as a read-only memory-mapped NumPy array of shape (len(self), 2).
+
+        __iter__(self):
+            Yields the attacks as SubsetAttack objects.
+
+        __getitem__(self, index: int) -> SubsetAttack:
+            Returns the attack at the given position, read from the merged file.
+
+        __len__(self) -> int:
+            Returns the number of attacks.
+    """
+
+    # Maximum number of keys read or written at once when merging the runs
+    BLOCK = 65536
+    # Number of runs merged at once, more runs being merged in several passes
+    FAN_IN = 64
+
+    def __init__(self, literals: list[str], memory_budget: int, directory: str | None = None):
+        """
+        Initializes the SpilledAttacks object with an empty buffer.
+
+        Args:
+            literals (list[str]): The assumptions the bits of the subset indices stand for.
+            memory_budget (int): The number of bytes the keys may use in memory, each key of the buffer taking 10 bytes
+                                 with the mask deduplicating it and the block copied to write it.
+            directory (optional[str]): The directory of the temporary files. Defaults to the default temporary directory.
+        """
+        self.literals = literals
+        self.count = 2 ** len(literals)
+        self.memory_budget = memory_budget
+        self.directory = directory
+        self.path = None
+        self._count = 0
+        self._runs = []
+        # The subset of each byte of an index, for each byte, so a subset is decoded a byte at a time
+        self._tables = [[tuple(literal for t, literal in enumerate(literals[b:b + 8]) if value >> t & 1) for value in range(256)]
+                        for b in range(0, len(literals), 8)]
+        # Each key takes 8 bytes in the buffer, 1 byte in the mask deduplicating it and 1 byte in the block copied to write it
+        self._capacity = max(1, memory_budget // 10)
+        self._size = 0
+        # An empty array is only backed by memory as it is written, so the buffer is allocated at its full size
+        self._buffer = np.empty(self._capacity, dtype=np.int64) if np is not None else array("q")
+        # Remove the files even if the attacks are dropped before being finished
+        self._files = []
+        self._finalizer = weakref.finalize(self, SpilledAttacks._remove, self._files)
+
+    @staticmethod
+    def _remove(files: list[str]):
+        """
+        Removes the temporary files still existing.
+        """
+        for file in files:
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+    def _new_file(self) -> str:
+        """
+        Creates a temporary file removed along with the object and returns its path.
+        """
+        descriptor, path = tempfile.mkstemp(prefix="aba_attacks_", suffix=".bin", dir=self.directory)
+        os.close(descriptor)
+        self._files.append(path)
+        return path
+
+    def subset(self, index: int) -> tuple:
+        """
+        Returns the subset of assumptions of the given index, in the order of literals.
+
+        Args:
+            index (int): The index of the subset.
+
+        Returns:
+            tuple: The assumptions whose bit is set in the index.
+        """
+        subset = ()
+        for table in self._tables:
+            subset += table[index & 255]
+            index >>= 8
+        return subset
+
+    def add(self, keys):
+        """
+        Adds the keys source * count + destination of attacks, writing a run to disk each time the buffer is full.
+
+        Args:
+            keys (list[int] or numpy.ndarray): The keys of the attacks.
+        """
+        start = 0
+        while start < len(keys):
+            # Only fill the space left in the buffer
+            stop = start + self._capacity - self._size
+            part = keys[start:stop]
+            if np is not None:
+                self._buffer[self._size:self._size + len(part)] = part
+            else:
+                self._buffer.extend(part)
+            self._size += len(part)
+            start = stop
+            if self._size >= self._capacity:
+                self._spill()
+
+    def _spill(self):
+        """
+        Sorts and deduplicates the buffer in place and writes it as a new run.
+        """
+        if self._size == 0:
+            return
+        Job.checkpoint(message="Writing normal and reverse attacks to disk")
+        path = self._new_file()
+        with open(path, "wb") as file:
+            if np is not None:
+                keys = self._buffer[:self._size]
+                keys.sort()
+                # keep[k] is True for the first of equal keys, the keys being written by eighths of the buffer to only copy an eighth at a time
+                keep = np.empty(self._size, dtype=bool)
+                keep[0] = True
+                np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+                block = max(1, self._capacity // 8)
+                for start in range(0, self._size, block):
+                    keys[start:start + block][keep[start:start + block]].tofile(file)
+                del keep
+            else:
+                array("q", sorted(set(self._buffer))).tofile(file)
+                self._buffer = array("q")
+        self._runs.append(path)
+        self._size = 0
+
+    def _read(self, path: str, block: int):
+        """
+        Yields the keys stored in a file, block keys at a time.
+        """
+        with open(path, "rb") as file:
+            while True:
+                values = array("q")
+                try:
+                    values.fromfile(file, block)
+                except EOFError:
+                    # The last block is shorter, fromfile still reads what is left
+                    pass
+                if not values:
+                    return
+                yield from values
+
+    def _merge(self, runs: list[str], pairs: bool) -> str:
+        """
+        Merges sorted runs into a new file without duplicates, the memory budget being shared by the blocks of the runs
+        read and of the file written. The keys are written as they are, or as the pairs of indices they encode.
+        """
+        path = self._new_file()
+        with open(path, "wb") as file:
+            if np is not None:
+                count = self._merge_blocks(runs, file, pairs)
+            else:
+                count = self._merge_keys(runs, file, pairs)
+        for run in runs:
+            os.remove(run)
+            self._files.remove(run)
+        if pairs:
+            self._count = count
+        return path
+
+    def _merge_keys(self, runs: list[str], file, pairs: bool) -> int:
+        """
+        Merges the runs one key at a time with a heap and returns the number of keys written.
+        """
+        block = max(1024, min(self.BLOCK, self.memory_budget // (8 * (len(runs) + 1))))
+        count = 0
+        last = None
+        values = array("q")
+        for key in heapq.merge(*(self._read(run, block) for run in runs)):
+            # The same pair can be in several runs
+            if key == last:
+                continue
+            last = key
+            if pairs:
+                values.extend(divmod(key, self.count))
+            else:
+                values.append(key)
+            count += 1
+            if len(values) >= block:
+                Job.checkpoint(message="Merging normal and reverse attacks")
+                values.tofile(file)
+                values = array("q")
+        values.tofile(file)
+        return count
+
+    def _merge_blocks(self, runs: list[str], file, pairs: bool) -> int:
+        """
+        Merges the runs a block at a time with NumPy and returns the number of keys written. All the keys up to the
+        smallest of the last keys of the current blocks are read, so they are sorted in place, deduplicated and written
+        at once, by slices of a block copied into a buffer of pairs.
+        """
+        # Each key of the blocks takes 8 bytes there, 8 bytes in their concatenation and 1 byte in the mask
+        # deduplicating it, and the slice written with its pairs takes 24 bytes per key
+        block = max(1, self.memory_budget // (17 * len(runs) + 24))
+        files = [open(run, "rb") for run in runs]
+        try:
+            blocks = [np.fromfile(run, dtype=np.int64, count=block) for run in files]
+            output = np.empty((block, 2), dtype=np.int64) if pairs else None
+            count = 0
+            last = None
+            while any(len(values) for values in blocks):
+                Job.checkpoint(message="Merging normal and reverse attacks")
+                bound = min(values[-1] for values in blocks if len(values))
+                taken = []
+                for k, values in enumerate(blocks):
+                    cut = np.searchsorted(values, bound, side="right")
+                    taken.append(values[:cut])
+                    # A run has no duplicates, so its next keys are all greater than the bound
+                    blocks[k] = values[cut:] if cut < len(values) else np.fromfile(files[k], dtype=np.int64, count=block)
+                keys = np.concatenate(taken)
+                del taken
+                keys.sort()
+                # keep[k] is True for the first of equal keys, the same pair being possibly in several runs and
+                # thus in the previous merged keys
+                keep = np.empty(len(keys), dtype=bool)
+                keep[0] = last is None or keys[0] != last
+                np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+                last = keys[-1]
+                for start in range(0, len(keys), block):
+                    part = keys[start:start + block][keep[start:start + block]]
+                    count += len(part)
+                    if pairs:
+                        np.divmod(part, self.count, out=(output[:len(part), 0], output[:len(part), 1]))
+                        output[:len(part)].tofile(file)
+                    else:
+                        part.tofile(file)
+                del keys, keep
+            return count
+        finally:
+            for run in files:
+                run.close()
+
+    def finish(self):
+        """
+        Writes the buffer as a last run and merges all the runs into a single sorted file without duplicates,
+        merging at most FAN_IN runs at once. The file stores the source and destination of each pair one after
+        the other so it can be mapped as an array of pairs.
+        """
+        self._spill()
+        # The buffer isn't needed anymore, which leaves the whole budget to the merge
+        self._buffer = None
+        runs = self._runs
+        while len(runs) > self.FAN_IN:
+            runs = [self._merge(runs[start:start + self.FAN_IN], False) for start in range(0, len(runs), self.FAN_IN)]
+        self.path = self._merge(runs, True)
+        self._runs = []
+
+    def pairs(self):
+        """
+        Yields the (source, destination) index pairs in sorted order, reading the merged file one block at a time.
+
+        Yields:
+            tuple[int, int]: The indices of the source and destination subsets of each attack.
+        """
+        values = self._read(self.path, self.BLOCK)
+        for source in values:
+            yield source, next(values)
+
+    def memmap(self):
+        """
+        Returns the pairs as a read-only memory-mapped array, the pairs being only loaded when accessed.
+
+        Returns:
+            numpy.memmap: The array of shape (len(self), 2) of the source and destination indices of each attack.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        if np is None:
+            raise ImportError("NumPy is needed to map the attacks as an array")
+        if self._count == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.memmap(self.path, dtype=np.int64, mode="r", shape=(self._count, 2))
+
+    def __iter__(self):
+        """
+        Yields the attacks as SubsetAttack objects, built one at a time from the pairs.
+
+        Yields:
+            SubsetAttack: The attacks in sorted order of their source and destination indices.
+        """
+        source, subset = None, None
+        for i, j in self.pairs():
+            # The pairs are sorted by source so each source is only decoded once
+            if i != source:
+                source, subset = i, self.subset(i)
+            yield SubsetAttack(subset, self.subset(j))
+
+    def __getitem__(self, index: int) -> SubsetAttack:
+        """
+        Returns the attack at the given position in sorted order, only its pair being read from the merged file.
+
+        Args:
+            index (int): The position of the attack, negative positions counting from the end.
+
+        Returns:
+            SubsetAttack: The attack at this position.
+
+        Raises:
+            IndexError: If there is no attack at this position.
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("attack index out of range")
+        pair = array("q")
+        with open(self.path, "rb") as file:
+            file.seek(index * 2 * pair.itemsize)
+            pair.fromfile(file, 2)
+        return SubsetAttack(self.subset(pair[0]), self.subset(pair[1]))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of attacks.
+
+        Returns:
+            int: The number of distinct pairs once finished.
+        """
+        return self._count
+
+    def __deepcopy__(self, memo):
+        """
+        Returns the object itself, the merged file never being modified once finished.
+        """
+        return self
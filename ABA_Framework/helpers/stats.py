@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # The resource module is only available on Unix platforms
+    resource = None
+
+class Stats:
+    """
+    The Stats class collects profiling information while an ABA framework is being built.
+    It records the time spent in each phase of the computation, counters of the work done
+    and the peak memory used by the build over the memory used when it started.
+
+    The peak is the peak of the memory traced by tracemalloc when it is tracing, which is reset when the build starts,
+    and otherwise the increase of the peak resident memory of the process, which stays at 0 while the build uses less
+    memory than the process already did before. Builds running at once in several threads share both peaks.
+
+    Attributes:
+        timings (dict[str, float]): The time spent in each phase in seconds.
+        counters (dict[str, int]): The counters of the work done (rules derived, paths expanded...).
+        peak_memory (optional[int]): The peak memory used by the build over its start in bytes, None if unavailable.
+
+    Methods:
+        __init__(self):
+            Initializes the Stats object with empty timings and counters.
+
+        reset_peak_memory(self):
+            Takes the memory used when the build starts as the baseline of the peak memory.
+
+        phase(self, name: str):
+            Context manager timing the enclosed block and adding it to the given phase.
+
+        increment(self, name: str, value: int = 1):
+            Increments the given counter by the provided value.
+
+        merge(self, other: Stats):
+            Adds the timings and counters of another Stats object to this one.
+
+        to_dict(self) -> dict:
+            Returns the statistics as a dictionary.
+
+        to_json(self) -> str:
+            Returns the statistics as a JSON string.
+
+        __repr__(self) -> str:
+            Returns a string representation of the statistics.
+    """
+
+    def __init__(self):
+        """
+        Initializes the Stats object with empty timings and counters.
+        """
+        self.timings = {}
+        self.counters = {}
+        self.peak_memory = None
+        # The memory the peak memory is measured from, with whether it was traced by tracemalloc
+        self._baseline = None
+        self._traced = False
+
+    def reset_peak_memory(self):
+        """
+        Takes the memory used when the build starts as the baseline of the peak memory. The peak traced by tracemalloc
+        is reset if it is tracing, the peak resident memory of the process being used otherwise.
+        """
+        self._traced = tracemalloc.is_tracing()
+        if self._traced:
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        else:
+            self._baseline = self._resident_peak()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times the enclosed block and adds the elapsed time to the given phase.
+        The peak memory is refreshed once the block is exited.
+
+        Args:
+            name (str): The name of the phase being timed.
+        """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            self._update_peak_memory()
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Increments the given counter by the provided value.
+
+        Args:
+            name (str): The name of the counter.
+            value (int): The value to add to the counter. Defaults to 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: "Stats"):
+        """
+        Adds the timings and counters of another Stats object to this one.
+
+        Args:
+            other (Stats): The statistics to merge into this object.
+        """
+        for name, value in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + value
+        for name, value in other.counters.items():
+            self.increment(name, value)
+        if other.peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, other.peak_memory)
+
+    @staticmethod
+    def _resident_peak() -> int | None:
+        """
+        Returns the peak resident memory of the process in bytes, None if it can't be measured.
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is given in bytes on macOS and in kilobytes on Linux
+        if sys.platform != "darwin":
+            peak *= 1024
+        return peak
+
+    def _update_peak_memory(self):
+        """
+        Refreshes the peak memory used over the baseline if the build was started and the memory can be measured.
+        """
+        if self._baseline is None:
+            return
+        if self._traced:
+            # The tracing may have been stopped since the build started
+            if not tracemalloc.is_tracing():
+                return
+            peak = tracemalloc.get_traced_memory()[1]
+        else:
+            peak = self._resident_peak()
+        self.peak_memory = max(self.peak_memory or 0, peak - self._baseline)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics as a dictionary.
+
+        Returns:
+            dict: A dictionary with the timings, counters and peak memory.
+        """
+        return {
+            "timings": dict(self.timings),
+            "counters": dict(self.counters),
+            "peak_memory": self.peak_memory,
+        }
+
+    def to_json(self) -> str:
+        """
+        Returns the statistics as a JSON string.
+
+        Returns:
+            str: The statistics serialized to JSON.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the statistics.
+
+        Returns:
+            str: The timings, counters and peak memory of the statistics.
+        """
+        return (
+            "\n".join(f"{name}: {value:.6f}s" for name, value in self.timings.items()) + "\n" +
+            "\n".join(f"{name}: {value}" for name, value in self.counters.items()) + "\n" +
+            f"peak_memory: {self.peak_memory}"
+        )
@@ -0,0 +1,63 @@
+class SubsetAttack:
+    """
+    The SubsetAttack class represents a normal or reverse attack between two sets of assumptions in the ABA+ framework.
+    It defines an attack from a source set of assumptions to a destination set of assumptions.
+
+    Attributes:
+        source (tuple): The set of assumptions that initiates the attack.
+        destination (tuple): The set of assumptions that is being attacked.
+
+    Methods:
+        __init__(self, source: tuple, destination: tuple):
+            Initializes the attack relationship between a source set and a destination set of assumptions.
+
+        __eq__(self, other) -> bool:
+            Checks if two attacks have the same source and destination.
+
+        __hash__(self) -> int:
+            Returns the hash of the attack so duplicates can be removed using a set.
+
+        __repr__(self) -> str:
+            Returns a string representation of the attack in the format "source -> destination".
+    """
+
+    def __init__(self, source: tuple, destination: tuple):
+        """
+        Initializes the SubsetAttack object with a source set and a destination set of assumptions.
+
+        Args:
+            source (tuple): The set of assumptions initiating the attack.
+            destination (tuple): The set of assumptions being attacked.
+        """
+        self.source = source
+        self.destination = destination
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks if two attacks have the same source and destination.
+
+        Args:
+            other (SubsetAttack): The attack to compare with.
+
+        Returns:
+            bool: True if both attacks have the same source and destination; False otherwise.
+        """
+        return isinstance(other, SubsetAttack) and self.source == other.source and self.destination == other.destination
+
+    def __hash__(self) -> int:
+        """
+        Returns the hash of the attack computed from its source and destination.
+
+        Returns:
+            int: The hash of the attack.
+        """
+        return hash((self.source, self.destination))
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the attack relation in the format "source -> destination".
+
+        Returns:
+            str: A string showing the attack relation in the format "source -> destination".
+        """
+        return f"{self.source} -> {self.destination}"
@@ -0,0 +1,129 @@
+import argparse
+import sys
+import time
+
+from helpers.aba import ABA
+from helpers.aba_generator import ABA_Generator, ConvertTo
+
+# Non flat framework where the assumption a heads a fact: the argument for p built once the rule (p,a) is added
+# has to use this fact as when the framework is built from scratch
+NON_FLAT = (
+    ("a,b,p,q", "a,b", "(q,b),(a,)", "(a,p),(b,q)", "(b,a)"),
+    ("a,b,p,q", "a,b", "(q,b),(a,),(p,a)", "(a,p),(b,q)", "(b,a)"),
+)
+
+# Framework whose rules for n2 are dead once made non circular: these rules must not give n2 an argument without
+# simplification either, or n1 gets an argument and a0 attacks sets containing a0 in the reverse attacks
+DEAD_RULES = ("a0,a1,n0,n1,n2", "a0,a1", "(n0,a1),(n1,(n0,n2,a0)),(n2,(n2,a0,a1)),(n2,(n1,a1))", "(a0,n1),(a1,a0)", "(a1,a0)")
+
+def large_framework(claims: int, edited: bool = False) -> tuple:
+    """
+    Returns the inputs of a framework whose assumption a0 is contrary to all its claims, each claim being derived from
+    a0, so each of its arguments attacks all the others and it has about claims * claims attacks.
+
+    Args:
+        claims (int): The number of claims.
+        edited (bool): Whether to derive the claim n0 from a1 instead of a0, a single rule being changed.
+
+    Returns:
+        tuple: The language, assumptions, rules, contraries and preferences of the framework.
+    """
+    language = ",".join(["a0", "a1"] + [f"n{i}" for i in range(claims)])
+    rules = ",".join(f"(n{i},{'a1' if edited and i == 0 else 'a0'})" for i in range(claims))
+    contraries = ",".join(f"(a0,n{i})" for i in range(claims))
+    return language, "a0,a1", rules, contraries, "(a1,a0)"
+
+def results(aba: ABA) -> tuple:
+    """
+    Returns the arguments and attacks of a framework independently of the indices of the arguments and of the
+    assumptions found inert.
+
+    Args:
+        aba (ABA): The framework.
+
+    Returns:
+        tuple: The sorted arguments, attacks and normal and reverse attacks, the attacks between arguments being given
+               by the arguments themselves.
+    """
+    arguments = aba.arguments or []
+
+    def attacks(values):
+        # Attacks between arguments use their indices, attacks between subsets their assumptions with the inert ones added
+        values = values or []
+        if values and not isinstance(values[0].source, int):
+            values = aba.expand_subset_attacks(values)
+        return sorted((str(arguments[attack.source]), str(arguments[attack.destination])) if isinstance(attack.source, int)
+                      else (tuple(sorted(attack.source)), tuple(sorted(attack.destination))) for attack in values)
+
+    return (sorted(str(arg) for arg in arguments if arg is not None), attacks(aba.attacks),
+            attacks(aba.normal_attacks), attacks(aba.reverse_attacks))
+
+def check_non_flat() -> bool:
+    """
+    Checks editing the non flat framework gives the same results as building the edited framework from scratch.
+
+    Returns:
+        bool: True if the results are the same for the arguments, attacks and normal and reverse attacks.
+    """
+    before, after = NON_FLAT
+    same = True
+    for func in (ABA_Generator.create_arguments, ABA_Generator.create_attacks, ABA_Generator.create_normal_reverse_attacks):
+        edited = ABA_Generator.update_framework(func(*before), *after)
+        if results(edited) != results(func(*after)):
+            print(f"{func.__name__}: the edited framework differs from the framework built from scratch")
+            same = False
+    return same
+
+def check_simplify() -> bool:
+    """
+    Checks simplifying the framework with dead rules gives the same normal and reverse attacks as not simplifying it.
+
+    Returns:
+        bool: True if the normal and reverse attacks are the same.
+    """
+    simplified, full = (results(ABA_Generator.create_normal_reverse_attacks(*DEAD_RULES, convert_to=ConvertTo.NON_CIRCULAR,
+                                                                            simplify=simplify)) for simplify in (True, False))
+    if simplified[2:] != full[2:]:
+        print("Simplifying the framework changed its normal and reverse attacks")
+        return False
+    return True
+
+def check_timing(claims: int) -> bool:
+    """
+    Checks editing one rule of a large framework is faster than building the edited framework from scratch, a copy
+    of the framework being edited as in the application where the framework edited is shared by the sessions.
+
+    Args:
+        claims (int): The number of claims of the framework, see large_framework.
+
+    Returns:
+        bool: True if the edit is faster, gives the same results and leaves the framework copied unchanged.
+    """
+    aba = ABA_Generator.create_attacks(*large_framework(claims))
+    start = time.perf_counter()
+    edited = ABA_Generator.update_framework(aba.edit_copy(), *large_framework(claims, True))
+    incremental = time.perf_counter() - start
+    start = time.perf_counter()
+    fresh = ABA_Generator.create_attacks(*large_framework(claims, True))
+    build = time.perf_counter() - start
+    print(f"{len(fresh.attacks)} attacks: edit {incremental:.2f}s, build {build:.2f}s")
+    if results(edited) != results(fresh):
+        print("The edited framework differs from the framework built from scratch")
+        return False
+    if results(aba) != results(ABA_Generator.create_attacks(*large_framework(claims))):
+        print("Editing the copy changed the framework copied")
+        return False
+    return incremental < build
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks the edits of a framework against building it from scratch")
+    parser.add_argument("--claims", type=int, default=850, help="number of claims of the framework timed")
+    args = parser.parse_args()
+
+    checks = {"non flat": check_non_flat(), "simplify": check_simplify(), "timing": check_timing(args.claims)}
+    for name, passed in checks.items():
+        print(f"{name}: {'ok' if passed else 'FAILED'}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+
+# Class examples sent as frameworks, the preferences being needed by the normal and reverse attacks
+EXAMPLES = [
+    {"language": "a,b,c,q,p,r,s,t", "assumptions": "a,b,c", "rules": "(p,(q,a)),(q,),(r,(b,c)),(t,(p,c)),(s,t)",
+     "contraries": "(a,r),(b,s),(c,t)", "preferences": "(b,a)"},
+    {"language": "a,b,x,y,z", "assumptions": "a,b", "rules": "(y,b),(y,y),(x,x),(x,a),(z,(x,y))",
+     "contraries": "(a,y),(b,x)", "preferences": "(a,b)"},
+    # The README example, simplified before building the arguments
+    {"language": "a,b,q,p", "assumptions": "a,b", "rules": "(p,(q,a)),(q,),(p,(q,a))", "contraries": "(a,p),(b,q)",
+     "preferences": "(a,b)", "simplify": True},
+]
+
+def send_batch(url: str, frameworks: list) -> tuple[float, int, int]:
+    """
+    Sends a batch of frameworks and reads the streamed results.
+
+    Args:
+        url (str): The URL of the operation.
+        frameworks (list): The frameworks of the batch.
+
+    Returns:
+        tuple[float, int, int]: The latency of the request in seconds, the number of results and the number of errors.
+    """
+    data = json.dumps({"frameworks": frameworks}).encode()
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    results, errors = 0, 0
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            results += 1
+            if not json.loads(line)["ok"]:
+                errors += 1
+    return time.perf_counter() - start, results, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the ABA API, see api_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--operation", default="arguments")
+    parser.add_argument("--requests", type=int, default=200, help="number of requests sent")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of clients sending requests at once")
+    parser.add_argument("--batch-size", type=int, default=10, help="number of frameworks per request")
+    args = parser.parse_args()
+
+    url = f"{args.url}/v1/{args.operation}"
+    # Each framework of a batch gets a distinct id so the server computes all of them
+    batches = [[{**EXAMPLES[(r + i) % len(EXAMPLES)], "id": f"{r}-{i}"} for i in range(args.batch_size)]
+               for r in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+        outcomes = list(clients.map(lambda batch: send_batch(url, batch), batches))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(outcome[0] for outcome in outcomes)
+    results = sum(outcome[1] for outcome in outcomes)
+    errors = sum(outcome[2] for outcome in outcomes)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    print(f"{args.requests} requests of {args.batch_size} frameworks with {args.concurrency} clients in {elapsed:.2f}s")
+    print(f"Throughput: {args.requests / elapsed:.1f} requests/s, {results / elapsed:.1f} frameworks/s")
+    print(f"Latency: p50 {quantiles[49] * 1000:.0f}ms, p95 {quantiles[94] * 1000:.0f}ms, p99 {quantiles[98] * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms")
+    print(f"Errors: {errors} of {results} frameworks")
+
+if __name__ == "__main__":
+    main()
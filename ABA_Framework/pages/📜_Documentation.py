@@ -75,8 +75,10 @@ Given these preference
 a > b
 c,d > e    
 The input should be as follows
-(b,a),(e,(c,d)) 
-``` 
+(b,a),(e,(c,d))
+```
+
+Preferences are chained, so giving (c,b),(b,a) also makes c less preferred than a. Preferences forming a cycle, such as (a,b),(b,a), are not a strict order and are rejected.
 
 The below image show what the expected input looks like:
 ![Expected Input](https://i.postimg.cc/2SFDzJWN/Expected-Input.png)   
@@ -101,5 +103,23 @@ By clicking on the button corresponding to their use case, a selectbox will appe
 The below example show cases the computation of arguments for the ABA framework.
 
 ![Argument Example](https://i.postimg.cc/cCLqTM4g/arguments.png)
+
+Below the selectbox, a checkbox allows to simplify the framework before the arguments are built. The simplification removes the rules whose body can never be derived, the duplicate rules and the rules whose body contains the body of another rule with the same head. Each remaining rule is then displayed with the original rules it stands for. The dead rules are left out of the arguments even without simplification, so removing them and the duplicate rules keeps the results. As the argument of a claim gathers the leaves of all the rules with this head, removing the subsumed rules can however leave fewer assumptions in this argument and so change the attacks.
+
+When computing normal and reverse attacks, the subsets are only enumerated over the assumptions that can change the result, that is the assumptions that can be attacked and the leaves of the arguments attacking them. The other assumptions are displayed as inert assumptions below the attacks: each attack shown also holds when adding any of them to either side.
+
+The normal and reverse attacks can also be reported between arguments by choosing `Arguments` instead of `Sets of assumptions`. They are then numbered as the attacks: `A0 attacks A1` in the normal attacks means that the claim of A0 is contrary to an assumption of A1 and no leaf of A0 is less preferred than it, while in the reverse attacks it means that A1 attacks an assumption of A0 with a leaf less preferred than it. Attacks on an assumption are shown as attacks on the argument the assumption is for itself. This output only grows with the square of the number of arguments whereas the attacks between sets of assumptions grow exponentially with the number of assumptions.
+
+When the inputs are changed and the same computation is run again without conversion nor simplification, the previous framework is edited instead of being built from scratch: only the rules, assumptions, contraries and preferences that changed are removed or added, and only the arguments and attacks they can affect are recomputed. Arguments keep their number across edits, so an argument that no longer exists is simply left out of the output and new arguments are numbered after the existing ones.
+
+The computations are run in the background: while they are running a progress bar is displayed along with a `Cancel` button which stops the computation. Results are kept for each operation and inputs, so interacting with the page or coming back to previous inputs displays the result already computed instead of computing it again. A computation that failed or was cancelled is run again by clicking its button.
+
+The computations of all the users of the application share a small pool of workers, so only a few of them run at once and the others wait in a queue, the progress bar showing their position in it. Each user can only wait for two computations at a time and no computation is accepted while the queue is full, a message then asking to try again later. Users asking for the same computation with the same inputs share its result, and a computation nobody waits for anymore, because its inputs were changed or it was cancelled, is stopped. The computation of normal and reverse attacks is stopped after one minute.
+
+#### Browsing the results
+The output text area only shows the framework itself. The arguments, attacks and normal/reverse attacks are displayed below it in tabs, as tables showing one page at a time. The number of rows per page and the page can be chosen, and the search field only keeps the rows involving all the literals typed, claims or assumptions, separated by commas or spaces. The `Download CSV` and `Download JSON` buttons export all the rows matching the search, the file only being written when the button is clicked.
+
+#### Statistics
+Once a framework has been computed, a `Statistics` panel is displayed below the output. It shows the time spent in each phase of the computation (parsing, conversion, derivation of the rules, expansion of the paths, assembly of the arguments, computation of the attacks...), counters of the work done and the peak memory used. The statistics can be exported as JSON using the `Export statistics as JSON` button.
 """)
 
@@ -1,5 +1,10 @@
+import math
+import uuid
 import streamlit as st
-from helpers.aba_generator import ABA_Generator, ConversionNotNeededError, ConvertTo
+from helpers.aba import ABA
+from helpers.result_table import ResultTable
+from helpers.aba_generator import ABA_Generator, AttackLevel, ConversionFailedError, ConversionNotNeededError, ConvertTo
+from helpers.jobs import AdmissionError, Job, JobCancelledError, JobRunner
 
 st.set_page_config(
     page_title='ABA Generator',
@@ -7,6 +12,12 @@ st.set_page_config(
     page_icon='💻'
 )
 
+# Runner shared by all the sessions of the server so the number of computations running at once stays bounded,
+# the other computations waiting in its queue
+@st.cache_resource
+def get_runner():
+    return JobRunner(max_workers=2, cache_size=64, max_queued=16, max_per_owner=2)
+
 st.sidebar.image("https://i.ibb.co/w4mGQk4/image-removebg-preview.png")
 
 st.title("ABA Generator")
@@ -22,6 +33,24 @@ if 'output' not in st.session_state:
     st.session_state.output = ""
 if "hide_select" not in st.session_state:
     st.session_state.hide_select = True
+# Background runner computing the frameworks off the rerun path and memoizing them by operation and inputs
+if 'runner' not in st.session_state:
+    st.session_state.runner = get_runner()
+# Identifier of the session limiting the number of computations it can wait for
+if 'owner' not in st.session_state:
+    st.session_state.owner = uuid.uuid4().hex
+# Computations cancelled by the session, only submitted again when their button is clicked
+if 'released' not in st.session_state:
+    st.session_state.released = set()
+if 'notice' not in st.session_state:
+    st.session_state.notice = ""
+# Tables of the results displayed, by name
+if 'tables' not in st.session_state:
+    st.session_state.tables = {}
+if 'current' not in st.session_state:
+    st.session_state.current = None
+if 'resubmit' not in st.session_state:
+    st.session_state.resubmit = False
 
 # Function to set default inputs based on selected option
 def get_default_inputs(option):
@@ -51,32 +80,135 @@ input3 = st.text_input("Rules", value=default_input3)
 input4 = st.text_input("Contraries", value=default_input4)
 input5 = st.text_input("Preferences", value=default_input5)
 
-# Function to display and process the output for each type
-def process_and_display(func, convert_to=None):
+# Functions whose framework can be edited when only the inputs change
+INCREMENTAL_FUNCS = (ABA_Generator.create_aba_framework, ABA_Generator.create_arguments,
+                     ABA_Generator.create_attacks, ABA_Generator.create_normal_reverse_attacks)
+
+# Number of seconds editing a framework may take, as computing the normal and reverse attacks from scratch
+EDIT_TIMEOUT = 60
+
+# Function computing the framework in a background job, editing the previous framework if possible
+def compute(func, inputs, convert_to, simplify, level, previous):
+    if previous is not None:
+        try:
+            # The previous framework may be displayed by other sessions so a copy of it is edited, the attacks which
+            # are only replaced by the edits being shared with it
+            with Job.time_limit(EDIT_TIMEOUT):
+                return ABA_Generator.update_framework(previous.edit_copy(), *inputs)
+        except (JobCancelledError, TimeoutError):
+            # A cancelled or timed out edit stops the job rather than starting the computation from scratch
+            raise
+        except (ConversionFailedError, ValueError):
+            # Build the framework from scratch if the edits couldn't be applied
+            pass
+    if level:
+        return func(*inputs, convert_to=convert_to, simplify=simplify, level=level)
+    elif convert_to or simplify:
+        return func(*inputs, convert_to=convert_to, simplify=simplify)
+    return func(*inputs)
+
+# Function to submit the computation of the output for each type, reruns with the same inputs reusing the same job
+def process_and_display(func, convert_to=None, simplify=False, level=None):
+    runner = st.session_state.runner
+    owner = st.session_state.owner
+    released = st.session_state.released
+    inputs = (input1, input2, input3, input4, input5)
+    options = (func.__name__, convert_to, simplify, level)
+    key = options + inputs
+    last = st.session_state.get('previous')
+    # Stop waiting for the previous computation, which is cancelled if no other session waits for it
+    if last is not None and last != key:
+        runner.release(last, owner)
+    if st.session_state.resubmit:
+        released.discard(key)
+    job = runner.get(key)
+    # A failed or cancelled job is only submitted again when its button is clicked, submitting a running job
+    # started by another session simply waits for it too
+    if key not in released and (job is None or not job.done() or (job.failed() and st.session_state.resubmit)):
+        previous = None
+        # Reuse the previous framework of the same computation by only applying the edits made to the inputs
+        if last is not None and last[:4] == options and func in INCREMENTAL_FUNCS and not convert_to and not simplify:
+            last_job = runner.get(last)
+            if last_job is not None and last_job.done() and not last_job.failed():
+                previous = last_job.result()
+        try:
+            runner.submit(key, compute, func, inputs, convert_to, simplify, level, previous, owner=owner)
+            st.session_state.notice = ""
+        except AdmissionError as ae:
+            st.session_state.notice = str(ae)
+            released.add(key)
+    st.session_state.previous = key
+    st.session_state.current = key
+    st.session_state.resubmit = False
+
+# Function to turn the result of a job into the output displayed
+def job_output(job):
     try:
-        if convert_to:
-            aba = func(input1, input2, input3, input4, input5, convert_to=convert_to)
-        else:
-            aba = func(input1, input2, input3, input4, input5)
-        st.session_state.output = aba
+        return job.result()
     except ConversionNotNeededError as cne:
-        st.session_state.output = str(cne)
+        return str(cne)
     except TimeoutError as te:
-        st.session_state.output = str(te)
+        return str(te)
+    except JobCancelledError as jce:
+        return str(jce)
     except Exception as e:
-        st.session_state.output = f"An error occurred: {str(e)}"
+        return f"An error occurred: {str(e)}"
+
+# Titles of the tabs displaying the results
+TABLE_TITLES = {"arguments": "Arguments", "attacks": "Attacks", "normal_attacks": "Normal Attacks", "reverse_attacks": "Reverse Attacks"}
+
+# Fragment displaying one page of a result with a search field and downloads, so browsing it doesn't rerun the page
+@st.fragment
+def show_table(aba, name):
+    # The table is kept across reruns so the rows matching each search are only found once
+    table = st.session_state.tables.get(name)
+    if table is None or table.aba is not aba:
+        table = st.session_state.tables[name] = ResultTable(aba, name)
+    col_query, col_size, col_page = st.columns([3, 1, 1])
+    query = col_query.text_input("Search by claim or assumption", key=f"{name}_query")
+    size = col_size.selectbox("Rows per page", [25, 100, 500], key=f"{name}_size")
+    total = table.count(query)
+    pages = max(1, math.ceil(total / size))
+    # Go back to the last page if the search left fewer pages than the one displayed
+    if st.session_state.get(f"{name}_page", 1) > pages:
+        st.session_state[f"{name}_page"] = pages
+    number = col_page.number_input(f"Page (out of {pages})", min_value=1, max_value=pages, key=f"{name}_page")
+    st.caption(f"{total} rows")
+    st.dataframe(table.page(number - 1, size, query), hide_index=True)
+    # The files are only written when a download is clicked and contain all the rows matching the search
+    col_csv, col_json = st.columns(2)
+    col_csv.download_button("Download CSV", lambda: table.export("csv", query), file_name=f"{name}.csv", mime="text/csv", key=f"{name}_csv", on_click="ignore")
+    col_json.download_button("Download JSON", lambda: table.export("json", query), file_name=f"{name}.json", mime="application/json", key=f"{name}_json", on_click="ignore")
+
+# Fragment polling the running job to display its progress, the whole page being rerun once it is over
+@st.fragment(run_every=0.5)
+def show_progress(job):
+    if job.done():
+        st.rerun()
+    position = st.session_state.runner.position(job)
+    if position:
+        st.progress(0.0, text=f"Waiting for other computations to finish, position {position} in the queue")
+    else:
+        st.progress(job.progress, text=job.message or "Computing...")
+    if st.button("Cancel"):
+        st.session_state.runner.release(job.key, st.session_state.owner)
+        st.session_state.released.add(job.key)
+        st.rerun()
 
 # Action buttons
 col1, col2, col3 = st.columns(3)
 if col1.button("Generate framework"):
     st.session_state.hide_select = True
+    st.session_state.resubmit = True
     process_and_display(ABA_Generator.create_aba_framework)
 
 if col2.button("Convert to atomic"):
     st.session_state.hide_select = True
+    st.session_state.resubmit = True
     process_and_display(ABA_Generator.convert_to_atomic)
 if col3.button("Convert to non circular"):
     st.session_state.hide_select = True
+    st.session_state.resubmit = True
     process_and_display(ABA_Generator.convert_to_non_circular)
 
 # Buttons to show arguments, attacks, and preferences
@@ -88,21 +220,24 @@ if col4.button("Create Arguments"):
     st.session_state.show_att = False
     st.session_state.show_pref = False
     st.session_state.hide_select = False
-    st.session_state.output = ""
+    st.session_state.current = None
+    st.session_state.resubmit = True
 
 if col5.button("Create Attacks"):
     st.session_state.show_att = True
     st.session_state.show_arg = False
     st.session_state.show_pref = False
     st.session_state.hide_select = False
-    st.session_state.output = "" 
+    st.session_state.current = None
+    st.session_state.resubmit = True
 
 if col6.button("Create normal/reverse attacks"):
     st.session_state.show_pref = True
     st.session_state.show_arg = False
     st.session_state.show_att = False
     st.session_state.hide_select = False
-    st.session_state.output = "" 
+    st.session_state.current = None
+    st.session_state.resubmit = True
 
 # Arguments, Attacks and Normal/Reverse Attacks creation logic
 if not st.session_state.hide_select:
@@ -110,15 +245,48 @@ if not st.session_state.hide_select:
             'Do you want to convert to atomic or non circular (Note that atomic conversion includes non circular)?',
             ['None', 'Atomic', 'Non circular'], key='choice')
     convert_to = ConvertTo.ATOMIC if choice == "Atomic" else ConvertTo.NON_CIRCULAR if choice == "Non circular" else None
+    simplify = st.checkbox('Simplify the framework (remove dead, duplicate and subsumed rules) before building arguments', key='simplify', help='Removing subsumed rules can remove assumptions from the arguments and so change the attacks')
     if st.session_state.show_arg:
         func = ABA_Generator.create_arguments
-        process_and_display(func, convert_to)
+        process_and_display(func, convert_to, simplify)
     elif st.session_state.show_att:
         func = ABA_Generator.create_attacks
-        process_and_display(func, convert_to)
+        process_and_display(func, convert_to, simplify)
     elif st.session_state.show_pref:
         func = ABA_Generator.create_normal_reverse_attacks
-        process_and_display(func, convert_to)
+        level = st.radio('Report normal and reverse attacks between', ['Sets of assumptions', 'Arguments'], key='level', horizontal=True)
+        level = AttackLevel.ARGUMENTS if level == 'Arguments' else AttackLevel.SUBSETS
+        process_and_display(func, convert_to, simplify, level)
+
+# Display the output of the current job once it is over and its progress while it is running
+job = st.session_state.runner.get(st.session_state.current) if st.session_state.current else None
+if st.session_state.current in st.session_state.released:
+    st.session_state.output = st.session_state.notice or str(JobCancelledError())
+elif job is not None and not job.done():
+    show_progress(job)
+    st.session_state.output = ""
+elif job is not None:
+    st.session_state.output = job_output(job)
+else:
+    st.session_state.output = ""
+
+# Only the framework itself is displayed as text, the arguments and attacks being displayed as paginated tables
+if isinstance(st.session_state.output, ABA):
+    aba = st.session_state.output
+    st.text_area("Output", aba.framework_repr(), height=300)
+    if aba.inert_assumptions:
+        st.caption(f"Inert assumptions: {', '.join(sorted(aba.inert_assumptions))} (each normal and reverse attack also holds when adding any of them to either side)")
+    names = ResultTable.available(aba)
+    if names:
+        for tab, name in zip(st.tabs([TABLE_TITLES[name] for name in names]), names):
+            with tab:
+                show_table(aba, name)
+else:
+    st.text_area("Output", st.session_state.output, height=600)
 
-# Display output
-st.text_area("Output", st.session_state.output, height=600)
+# Display the profiling statistics of the last computed framework
+if isinstance(st.session_state.output, ABA):
+    stats = st.session_state.output.stats
+    with st.expander("Statistics"):
+        st.json(stats.to_dict())
+        st.download_button("Export statistics as JSON", stats.to_json(), file_name="aba_stats.json", mime="application/json")
@@ -1,5 +1,5 @@
+import os
 import numpy as np
-import pandas as pd
 import tensorflow as tf
 from tensorflow.keras.layers import Input, Embedding, LSTM, Dense, Dropout, Bidirectional, Concatenate
 from tensorflow.keras.models import Model
@@ -10,16 +10,20 @@ from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
 from tensorflow.keras.regularizers import l2
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
+from pair_dataset import build_from_csv, load_dataset, save_dataset
 import matplotlib.pyplot as plt
 
-# Charger les données
-data = pd.read_csv('combined_arguments.csv', sep=',')
+# Charger les données : chaque texte unique n'est stocké qu'une fois, les paires le référencent par identifiant
+if not os.path.isdir('pair_dataset'):
+    save_dataset(*build_from_csv('combined_arguments.csv'), 'pair_dataset')
+texts, edges = load_dataset('pair_dataset')
 
 # Vérifier les colonnes et les premières lignes
-print("Colonnes du DataFrame:")
-print(data.columns)
-print("\nPremières lignes du DataFrame:")
-print(data.head())
+print("Colonnes des paires:")
+print(edges.columns)
+print("\nPremières paires:")
+print(edges.head())
+print(f"\n{len(edges)} paires, {len(texts)} textes uniques")
 
 # Paramètres
 max_words = 10000
@@ -29,33 +33,32 @@ batch_size = 128
 
 # Vérifier le contenu des colonnes Argument1 et Argument2
 print("\nExemple d'Argument1:")
-print(data['Argument1'].iloc[0])
+print(texts[edges['parent_id'].iloc[0]])
 print("\nExemple d'Argument2:")
-print(data['Argument2'].iloc[0])
+print(texts[edges['child_id'].iloc[0]])
 
-# Créer le tokenizer
+# Créer le tokenizer sur les textes uniques, un parent n'étant plus compté une fois par enfant
 tokenizer = Tokenizer(num_words=max_words)
-all_texts = data['Argument1'].tolist() + data['Argument2'].tolist()
-tokenizer.fit_on_texts(all_texts)
+tokenizer.fit_on_texts(texts)
+# Enregistrer le tokenizer pour les prédictions, voir inference.py
+with open('lstm_tokenizer.json', 'w', encoding='utf-8') as f:
+    f.write(tokenizer.to_json())
 
-# Tokeniser les arguments
-arg1_seq = tokenizer.texts_to_sequences(data['Argument1'])
-arg2_seq = tokenizer.texts_to_sequences(data['Argument2'])
+# Tokeniser et compléter chaque texte unique une seule fois, puis indexer les séquences par paire
+text_pad = pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=max_len, padding='post')
+arg1_pad = text_pad[edges['parent_id'].values]
+arg2_pad = text_pad[edges['child_id'].values]
 
 print("\nExemple de séquence tokenisée pour Argument1:")
-print(arg1_seq[0])
+print(arg1_pad[0])
 print("\nExemple de séquence tokenisée pour Argument2:")
-print(arg2_seq[0])
-
-# Padding
-arg1_pad = pad_sequences(arg1_seq, maxlen=max_len, padding='post')
-arg2_pad = pad_sequences(arg2_seq, maxlen=max_len, padding='post')
+print(arg2_pad[0])
 
 print("\nForme de arg1_pad:", arg1_pad.shape)
 print("Forme de arg2_pad:", arg2_pad.shape)
 
 # Encoder les labels
-labels = [1 if r == 'Support' else 0 for r in data['Relation']]
+labels = (edges['relation'] == 'Support').astype(int).tolist()
 
 print("\nExemple de labels:")
 print(labels[:10])
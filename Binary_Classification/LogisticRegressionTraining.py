@@ -1,31 +1,44 @@
+import os
 import numpy as np
-import pandas as pd
+import scipy.sparse as sp
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from pair_dataset import PairTfidfVectorizer, build_from_csv, load_dataset, save_dataset
+from pair_features import FEATURES, PairFeatures
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix, log_loss, accuracy_score
 import matplotlib.pyplot as plt
 import joblib
 
-# Charger les données
-data = pd.read_csv('combined_arguments.csv', sep=',')
-
-print("Colonnes du DataFrame:")
-print(data.columns)
-print("\nPremières lignes du DataFrame:")
-print(data.head())
-
-# Préparer les données
-X = data['Argument1'] + ' ' + data['Argument2']  # Combiner les deux arguments
-y = (data['Relation'] == 'Support').astype(int)  # Encoder 'Support' comme 1, 'Attack' comme 0
-
-# Diviser les données en ensembles d'entraînement et de test
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Vectoriser le texte
-vectorizer = TfidfVectorizer(max_features=5000)
-X_train_vectorized = vectorizer.fit_transform(X_train)
-X_test_vectorized = vectorizer.transform(X_test)
+# Charger les données : chaque texte unique n'est stocké qu'une fois, les paires le référencent par identifiant
+if not os.path.isdir('pair_dataset'):
+    save_dataset(*build_from_csv('combined_arguments.csv'), 'pair_dataset')
+texts, edges = load_dataset('pair_dataset')
+
+print("Colonnes des paires:")
+print(edges.columns)
+print("\nPremières paires:")
+print(edges.head())
+print(f"\n{len(edges)} paires, {len(texts)} textes uniques")
+
+# Préparer les données : une paire combine le texte du parent et celui de l'enfant
+parent_ids = edges['parent_id'].values
+child_ids = edges['child_id'].values
+y = (edges['relation'] == 'Support').astype(int)  # Encoder 'Support' comme 1, 'Attack' comme 0
+
+# Diviser les paires en ensembles d'entraînement et de test
+train_idx, test_idx, y_train, y_test = train_test_split(np.arange(len(edges)), y, test_size=0.2, random_state=42)
+
+# Vectoriser le texte : chaque texte unique n'est tokenisé qu'une fois
+vectorizer = PairTfidfVectorizer(max_features=5000).fit_texts(texts)
+X_train_vectorized = vectorizer.fit_transform(parent_ids[train_idx], child_ids[train_idx])
+X_test_vectorized = vectorizer.transform(parent_ids[test_idx], child_ids[test_idx])
+
+# Ajouter les caractéristiques de similarité des paires (cosinus, recouvrement, longueurs),
+# calculées sur les textes uniques avec les fréquences des paires d'entraînement
+features = PairFeatures().fit(texts, parent_ids[train_idx], child_ids[train_idx])
+X_train_vectorized = sp.hstack([X_train_vectorized, features.transform_ids(parent_ids[train_idx], child_ids[train_idx]).values]).tocsr()
+X_test_vectorized = sp.hstack([X_test_vectorized, features.transform_ids(parent_ids[test_idx], child_ids[test_idx]).values]).tocsr()
+print(f"Caractéristiques des paires: {', '.join(FEATURES)}")
 
 # Créer et entraîner le modèle
 model = LogisticRegression(random_state=42, max_iter=1000)
@@ -60,7 +73,11 @@ plt.savefig('confusion_matrix.png')
 
 # Enregistrer le modèle
 joblib.dump(model, 'logistic_regression_model.joblib')
-joblib.dump(vectorizer, 'tfidf_vectorizer.joblib')
+# Le vectoriseur enregistré s'applique directement au texte des deux arguments concaténés
+text_vectorizer = vectorizer.to_text_vectorizer()
+joblib.dump(text_vectorizer, 'tfidf_vectorizer.joblib')
+pair_features = features.without_texts()
+joblib.dump(pair_features, 'pair_features.joblib')
 
 # Enregistrer les métriques
 with open('model_metrics.txt', 'w') as f:
@@ -70,7 +87,7 @@ with open('model_metrics.txt', 'w') as f:
 # Fonction pour faire des prédictions sur de nouvelles paires d'arguments
 def predict_relation(arg1, arg2):
     combined_arg = arg1 + ' ' + arg2
-    vectorized_arg = vectorizer.transform([combined_arg])
+    vectorized_arg = sp.hstack([text_vectorizer.transform([combined_arg]), pair_features.transform([arg1], [arg2]).values]).tocsr()
     prediction = model.predict(vectorized_arg)[0]
     return "Support" if prediction == 1 else "Attack"
 
@@ -79,74 +96,62 @@ print("\nExemple de prédiction:")
 print(predict_relation("This policy will reduce crime rates.", "The policy focuses on rehabilitation programs."))
 
 print("\nModèle et métriques enregistrés avec succès.")
+import os
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from pair_dataset import PairTfidfVectorizer, build_from_csv, load_dataset, save_dataset
 from sklearn.linear_model import SGDClassifier
-from sklearn.metrics import log_loss, accuracy_score
+from epoch_training import fit_epochs, save_history
 import matplotlib.pyplot as plt
 import joblib
 
-# Charger les données
-data = pd.read_csv('combined_arguments.csv', sep=',')
+# Charger les données : chaque texte unique n'est stocké qu'une fois, les paires le référencent par identifiant
+if not os.path.isdir('pair_dataset'):
+    save_dataset(*build_from_csv('combined_arguments.csv'), 'pair_dataset')
+texts, edges = load_dataset('pair_dataset')
 
-print("Colonnes du DataFrame:")
-print(data.columns)
-print("\nPremières lignes du DataFrame:")
-print(data.head())
+print("Colonnes des paires:")
+print(edges.columns)
+print("\nPremières paires:")
+print(edges.head())
+print(f"\n{len(edges)} paires, {len(texts)} textes uniques")
 
 # Préparer les données
-X = data['Argument1'] + ' ' + data['Argument2']
-y = (data['Relation'] == 'Support').astype(int)
+parent_ids = edges['parent_id'].values
+child_ids = edges['child_id'].values
+y = (edges['relation'] == 'Support').astype(int)
 
 # Diviser les données
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+train_idx, test_idx, y_train, y_test = train_test_split(np.arange(len(edges)), y, test_size=0.2, random_state=42)
 
 # Vectoriser le texte
-vectorizer = TfidfVectorizer(max_features=10000)
-X_train_vectorized = vectorizer.fit_transform(X_train)
-X_test_vectorized = vectorizer.transform(X_test)
+vectorizer = PairTfidfVectorizer(max_features=10000).fit_texts(texts)
+X_train_vectorized = vectorizer.fit_transform(parent_ids[train_idx], child_ids[train_idx])
+X_test_vectorized = vectorizer.transform(parent_ids[test_idx], child_ids[test_idx])
 
 # Initialiser le modèle
 model = SGDClassifier(loss='log_loss', random_state=42, max_iter=1, tol=None)
 
-# Listes pour stocker les métriques
-train_losses = []
-val_losses = []
-train_accuracies = []
-val_accuracies = []
-
-# Entraînement itératif
+# Entraînement itératif : les métriques ne sont calculées que toutes les 5 époques, sur au plus
+# 20000 paires de chaque ensemble, et l'entraînement s'arrête quand la loss de validation stagne
 n_epochs = 100
-for epoch in range(n_epochs):
-    model.partial_fit(X_train_vectorized, y_train, classes=np.unique(y))
-    
-    # Calculer les métriques d'entraînement
-    train_pred = model.predict(X_train_vectorized)
-    train_pred_proba = model.predict_proba(X_train_vectorized)
-    train_loss = log_loss(y_train, train_pred_proba)
-    train_accuracy = accuracy_score(y_train, train_pred)
-    
-    # Calculer les métriques de validation
-    val_pred = model.predict(X_test_vectorized)
-    val_pred_proba = model.predict_proba(X_test_vectorized)
-    val_loss = log_loss(y_test, val_pred_proba)
-    val_accuracy = accuracy_score(y_test, val_pred)
-    
-    # Stocker les métriques
-    train_losses.append(train_loss)
-    val_losses.append(val_loss)
-    train_accuracies.append(train_accuracy)
-    val_accuracies.append(val_accuracy)
+model, history = fit_epochs(model, X_train_vectorized, y_train, X_test_vectorized, y_test, n_epochs=n_epochs,
+                            eval_every=5, eval_sample=20000, patience=5)
+save_history(history, 'trainingLogisticRegression_history.json')
+
+epochs = [entry['epoch'] for entry in history]
+train_losses = [entry['train_loss'] for entry in history]
+val_losses = [entry['val_loss'] for entry in history]
+train_accuracies = [entry['train_accuracy'] for entry in history]
+val_accuracies = [entry['val_accuracy'] for entry in history]
 
 # Créer les graphiques
 plt.figure(figsize=(12, 5))
 
 # Graphique de la loss
 plt.subplot(1, 2, 1)
-plt.plot(train_losses, label='Train Loss')
-plt.plot(val_losses, label='Validation Loss')
+plt.plot(epochs, train_losses, label='Train Loss')
+plt.plot(epochs, val_losses, label='Validation Loss')
 plt.title('Model Loss')
 plt.xlabel('Epoch')
 plt.ylabel('Loss')
@@ -154,8 +159,8 @@ plt.legend()
 
 # Graphique de l'accuracy
 plt.subplot(1, 2, 2)
-plt.plot(train_accuracies, label='Train Accuracy')
-plt.plot(val_accuracies, label='Validation Accuracy')
+plt.plot(epochs, train_accuracies, label='Train Accuracy')
+plt.plot(epochs, val_accuracies, label='Validation Accuracy')
 plt.title('Model Accuracy')
 plt.xlabel('Epoch')
 plt.ylabel('Accuracy')
@@ -167,12 +172,14 @@ print("Graphiques d'entraînement sauvegardés dans 'training_history.png'")
 
 # Enregistrer le modèle final
 joblib.dump(model, 'logistic_regression_model.joblib')
-joblib.dump(vectorizer, 'tfidf_vectorizer.joblib')
+# Le vectoriseur enregistré s'applique directement au texte des deux arguments concaténés
+text_vectorizer = vectorizer.to_text_vectorizer()
+joblib.dump(text_vectorizer, 'tfidf_vectorizer.joblib')
 
 # Fonction pour faire des prédictions
 def predict_relation(arg1, arg2):
     combined_arg = arg1 + ' ' + arg2
-    vectorized_arg = vectorizer.transform([combined_arg])
+    vectorized_arg = text_vectorizer.transform([combined_arg])
     prediction = model.predict(vectorized_arg)[0]
     return "Support" if prediction == 1 else "Attack"
 
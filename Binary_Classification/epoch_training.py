@@ -0,0 +1,71 @@
+import copy
+import json
+
+import numpy as np
+
+
+def evaluate_proba(model, X, y):
+    """
+    Log loss et accuracy à partir d'un seul predict_proba, la classe prédite étant celle de plus forte probabilité.
+    """
+    proba = model.predict_proba(X)
+    y = np.asarray(y)
+    columns = np.searchsorted(model.classes_, y)
+    p = np.clip(proba[np.arange(len(y)), columns], 1e-15, 1)
+    loss = float(-np.log(p).mean())
+    accuracy = float((model.classes_[proba.argmax(axis=1)] == y).mean())
+    return loss, accuracy
+
+
+def fit_epochs(model, X_train, y_train, X_val, y_val, n_epochs=100, eval_every=5, eval_sample=None,
+               patience=5, min_delta=1e-4, random_state=42, restore_best=True, verbose=True):
+    """
+    Entraîne le modèle époque par époque avec partial_fit. Les métriques ne sont calculées que toutes les
+    eval_every époques (et à la dernière), sur au plus eval_sample paires tirées une fois pour toutes dans
+    chaque ensemble. L'entraînement s'arrête quand la loss de validation ne s'est pas améliorée d'au moins
+    min_delta pendant patience évaluations, et le modèle de la meilleure évaluation est alors restauré.
+    Renvoie le modèle et l'historique des métriques, une entrée par évaluation.
+    """
+    rng = np.random.RandomState(random_state)
+    y_train, y_val = np.asarray(y_train), np.asarray(y_val)
+    classes = np.unique(np.concatenate([y_train, y_val]))
+
+    def subsample(X, y):
+        if eval_sample is None or X.shape[0] <= eval_sample:
+            return X, y
+        rows = np.sort(rng.choice(X.shape[0], eval_sample, replace=False))
+        return X[rows], y[rows]
+
+    X_train_eval, y_train_eval = subsample(X_train, y_train)
+    X_val_eval, y_val_eval = subsample(X_val, y_val)
+
+    history = []
+    best_loss, best_model, stale = np.inf, None, 0
+    for epoch in range(1, n_epochs + 1):
+        model.partial_fit(X_train, y_train, classes=classes)
+        if epoch % eval_every != 0 and epoch != n_epochs:
+            continue
+        train_loss, train_accuracy = evaluate_proba(model, X_train_eval, y_train_eval)
+        val_loss, val_accuracy = evaluate_proba(model, X_val_eval, y_val_eval)
+        history.append({'epoch': epoch, 'train_loss': train_loss, 'val_loss': val_loss,
+                        'train_accuracy': train_accuracy, 'val_accuracy': val_accuracy})
+        if verbose:
+            print(f"Époque {epoch}: loss {train_loss:.4f} / {val_loss:.4f}, accuracy {train_accuracy:.4f} / {val_accuracy:.4f}")
+        if val_loss < best_loss - min_delta:
+            best_loss, stale = val_loss, 0
+            if restore_best:
+                best_model = copy.deepcopy(model)
+        else:
+            stale += 1
+            if stale >= patience:
+                if verbose:
+                    print(f"Arrêt anticipé à l'époque {epoch}, meilleure loss de validation {best_loss:.4f}")
+                break
+    if restore_best and best_model is not None:
+        model = best_model
+    return model, history
+
+
+def save_history(history, path):
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=1)
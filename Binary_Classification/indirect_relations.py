@@ -0,0 +1,237 @@
+import argparse
+import csv
+import math
+import random
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Une attaque inverse le signe de la relation, un soutien le garde :
+# Attack∘Attack = Support, Support∘Support = Support, sinon Attack
+SIGNS = {'Support': 1, 'Attack': -1}
+RELATIONS = {1: 'Support', -1: 'Attack'}
+
+
+def build_graph(df):
+    """Construit le graphe des arguments, chaque arête allant de Argument1 vers Argument2 avec sa relation."""
+    G = nx.DiGraph()
+    G.add_edges_from((a, b, {'relation': r}) for a, b, r in zip(df['Argument1'], df['Argument2'], df['Relation']))
+    return G
+
+
+def to_adjacency(G):
+    """
+    Remplace les noeuds du graphe par des entiers. Renvoie la liste des noeuds et, pour chaque noeud,
+    la liste de ses successeurs avec le signe de l'arête. Les arêtes sans relation connue sont ignorées.
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    successors = [
+        [(index[b], SIGNS[data['relation']]) for b, data in G.succ[a].items() if data.get('relation') in SIGNS]
+        for a in nodes
+    ]
+    return nodes, successors
+
+
+def _paths(successors, n, source):
+    """
+    Parcours en profondeur borné à partir de source, le long des arêtes sortantes, en composant le signe.
+    Pour chaque chemin simple d'exactement n arêtes, renvoie le préfixe (liste réutilisée, à copier si on
+    la garde), le dernier noeud et le signe composé.
+    """
+    path, signs, on_path = [source], [1], {source}
+    stack = [iter(successors[source])]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            on_path.discard(path.pop())
+            signs.pop()
+            continue
+        node, sign = step
+        if node in on_path:
+            continue
+        composed = signs[-1] * sign
+        if len(path) == n:
+            yield path, node, composed
+        else:
+            path.append(node)
+            signs.append(composed)
+            on_path.add(node)
+            stack.append(iter(successors[node]))
+
+
+def iter_paths(G, n, sources=None):
+    """
+    Renvoie tous les chemins simples d'exactement n arêtes du graphe, sous la forme (chemin, relation),
+    la relation étant la composition des relations des arêtes du chemin.
+    """
+    nodes, successors = to_adjacency(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    starts = range(len(nodes)) if sources is None else [index[s] for s in sources]
+    for source in starts:
+        for prefix, last, sign in _paths(successors, n, source):
+            yield [nodes[i] for i in prefix] + [nodes[last]], RELATIONS[sign]
+
+
+def sample_paths(successors, n, sample_size, seed=0):
+    """
+    Tire uniformément sample_size chemins parmi tous les chemins d'exactement n arêtes du graphe,
+    en un seul parcours, par échantillonnage en réservoir (algorithme L). Les chemins qui ne sont pas
+    retenus ne sont jamais copiés, le temps est donc linéaire en le nombre de chemins parcourus.
+    """
+    rng = random.Random(seed)
+    reservoir = []
+    # Nombre de chemins à passer avant le prochain remplacement, et poids de l'algorithme L
+    w, skip = 1.0, 0
+
+    def next_skip():
+        nonlocal w
+        w *= math.exp(math.log(rng.random() or 1e-300) / sample_size)
+        return int(math.log(rng.random() or 1e-300) / math.log(1 - w)) if w < 1 else 0
+
+    for source in range(len(successors)):
+        for prefix, last, sign in _paths(successors, n, source):
+            if len(reservoir) < sample_size:
+                reservoir.append((tuple(prefix) + (last,), sign))
+                if len(reservoir) == sample_size:
+                    skip = next_skip()
+            elif skip > 0:
+                skip -= 1
+            else:
+                reservoir[rng.randrange(sample_size)] = (tuple(prefix) + (last,), sign)
+                skip = next_skip()
+    return reservoir
+
+
+def format_path_with_relations(path, relations):
+    formatted_path = [f"{path[i]} ({relations[i]})" for i in range(len(path) - 1)]
+    formatted_path.append(f"{path[-1]}")
+    return ' -> '.join(formatted_path)
+
+
+def get_indirect_relations(G, n, sample_size, seed=0):
+    """
+    Échantillon uniforme de sample_size relations indirectes de longueur exactement n, tirées parmi
+    tous les chemins du graphe. La relation entre le début et la fin d'un chemin est la composition
+    des relations de ses arêtes.
+    """
+    nodes, successors = to_adjacency(G)
+    rows = []
+    for path, sign in sample_paths(successors, n, sample_size, seed):
+        labels = [nodes[i] for i in path]
+        edge_relations = [G[labels[i]][labels[i + 1]]['relation'] for i in range(n)]
+        rows.append({
+            'Argument1': labels[0],
+            'Argument2': labels[-1],
+            'Relation': RELATIONS[sign],
+            'Path': format_path_with_relations(labels, edge_relations),
+        })
+    return pd.DataFrame(rows, columns=['Argument1', 'Argument2', 'Relation', 'Path'])
+
+
+def signed_matrices(G):
+    """
+    Renvoie la liste des noeuds et les matrices d'adjacence creuses (booléennes) des soutiens et des attaques,
+    la case (i, j) valant True si l'arête i -> j porte cette relation.
+    """
+    nodes, successors = to_adjacency(G)
+    rows = [i for i, edges in enumerate(successors) for _ in edges]
+    cols = [j for edges in successors for j, _ in edges]
+    signs = np.array([sign for edges in successors for _, sign in edges], dtype=np.int8)
+    shape = (len(nodes), len(nodes))
+
+    def matrix(mask):
+        data = np.ones(int(mask.sum()), dtype=bool)
+        return sp.csr_matrix((data, (np.array(rows)[mask], np.array(cols)[mask])), shape=shape)
+
+    return nodes, matrix(signs == 1), matrix(signs == -1)
+
+
+def signed_reachability(support, attack, n, cumulative=False):
+    """
+    Compose les matrices de soutien et d'attaque par produits creux, de la profondeur 1 à n.
+    À la profondeur d, la case (i, j) de la matrice de soutien (d'attaque) vaut True s'il existe un chemin
+    de d arêtes de i à j dont la relation composée est un soutien (une attaque) :
+    S(d+1) = S(d)·S + A(d)·A et A(d+1) = S(d)·A + A(d)·S.
+    Les produits portent sur des marches, qui peuvent repasser par un noeud, contrairement aux chemins
+    simples de get_indirect_relations ; la diagonale (un argument et lui-même) est retirée.
+    Si cumulative, les matrices renvoyées couvrent tous les chemins de longueur au plus d.
+    Renvoie pour chaque profondeur (d, soutiens, attaques).
+    """
+    S, A = support.tocsr(), attack.tocsr()
+    reach_support, reach_attack = S, A
+    for depth in range(1, n + 1):
+        if depth > 1:
+            S, A = (S @ support + A @ attack), (S @ attack + A @ support)
+            S.eliminate_zeros()
+            A.eliminate_zeros()
+            if cumulative:
+                reach_support, reach_attack = reach_support + S, reach_attack + A
+            else:
+                reach_support, reach_attack = S, A
+        yield depth, _drop_diagonal(reach_support), _drop_diagonal(reach_attack)
+
+
+def _drop_diagonal(matrix):
+    coo = matrix.tocoo()
+    keep = coo.row != coo.col
+    return sp.csr_matrix((coo.data[keep], (coo.row[keep], coo.col[keep])), shape=matrix.shape)
+
+
+def label_pairs(support, attack):
+    """
+    Sépare les paires atteintes en paires déterminées, dont tous les chemins donnent la même relation,
+    et paires en conflit, atteintes à la fois par un soutien et par une attaque.
+    Renvoie les matrices creuses (soutiens déterminés, attaques déterminées, conflits).
+    """
+    conflicts = support.multiply(attack).tocsr()
+    return (support > conflicts), (attack > conflicts), conflicts
+
+
+def write_reachability_csv(G, n, output_file, cumulative=False, block_size=10000):
+    """
+    Écrit au fur et à mesure dans un CSV toutes les paires déterminées et en conflit de chaque profondeur
+    jusqu'à n, avec les colonnes Argument1, Argument2, Relation (Support, Attack ou Conflict) et Depth.
+    Les paires sont écrites par blocs de block_size lignes de la matrice pour ne jamais construire
+    de DataFrame de toutes les paires. Renvoie le nombre de paires de chaque type par profondeur.
+    """
+    nodes, support, attack = signed_matrices(G)
+    labels = np.array(nodes, dtype=object)
+    counts = {}
+    with open(output_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Argument1', 'Argument2', 'Relation', 'Depth'])
+        for depth, reach_support, reach_attack in signed_reachability(support, attack, n, cumulative):
+            matrices = dict(zip(('Support', 'Attack', 'Conflict'), label_pairs(reach_support, reach_attack)))
+            counts[depth] = {relation: matrix.nnz for relation, matrix in matrices.items()}
+            for start in range(0, len(nodes), block_size):
+                for relation, matrix in matrices.items():
+                    block = matrix[start:start + block_size].tocoo()
+                    writer.writerows(zip(labels[block.row + start], labels[block.col],
+                                         [relation] * block.nnz, [depth] * block.nnz))
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Génère un échantillon de relations indirectes de longueur n")
+    parser.add_argument('n', type=int)
+    parser.add_argument('sample_size', type=int, nargs='?', default=500)
+    parser.add_argument('--input', default='datasets/arguments_dataset_cleaned.csv')
+    parser.add_argument('--output', default=None, help="par défaut generated_relations/indirect_n<n>.csv")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--all', action='store_true', help="écrit toutes les paires déterminées et en conflit jusqu'à la profondeur n")
+    parser.add_argument('--cumulative', action='store_true', help="avec --all, chaque profondeur d couvre les chemins de longueur au plus d")
+    args = parser.parse_args()
+
+    G = build_graph(pd.read_csv(args.input))
+    if args.all:
+        counts = write_reachability_csv(G, args.n, args.output or f"generated_relations/reachability_n{args.n}.csv", args.cumulative)
+        for depth, count in counts.items():
+            print(f"Profondeur {depth} : {count['Support']} soutiens, {count['Attack']} attaques, {count['Conflict']} conflits")
+    else:
+        indirect_df = get_indirect_relations(G, args.n, args.sample_size, args.seed)
+        indirect_df.to_csv(args.output or f"generated_relations/indirect_n{args.n}.csv", index=False)
+        print(f"{len(indirect_df)} relations indirectes de longueur {args.n}")
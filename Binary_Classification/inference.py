@@ -0,0 +1,209 @@
+import argparse
+import os
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+LABELS = np.array(['Attack', 'Support'])
+
+
+class LRUCache:
+    """Cache des caractéristiques par texte, les textes les moins récemment utilisés étant retirés en premier."""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def lookup(self, texts, compute):
+        """
+        Renvoie les valeurs des textes, dans l'ordre, en ne calculant qu'une fois par appel
+        à compute (sur une liste) celles des textes distincts absents du cache.
+        """
+        values = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            value = self.get(text)
+            if value is None:
+                missing.append(text)
+            else:
+                values[text] = value
+        if missing:
+            for text, value in zip(missing, compute(missing)):
+                self.put(text, value)
+                values[text] = value
+        return [values[text] for text in texts]
+
+
+def _pair_texts(pairs):
+    # Les paires peuvent être un DataFrame (Argument1, Argument2) ou une liste de couples de textes
+    if isinstance(pairs, pd.DataFrame):
+        return pairs['Argument1'].astype(str).tolist(), pairs['Argument2'].astype(str).tolist()
+    pairs = list(pairs)
+    return [str(pair[0]) for pair in pairs], [str(pair[1]) for pair in pairs]
+
+
+class LogisticRelationModel:
+    """
+    Régression logistique enregistrée par LogisticRegressionTraining.py, chargée une fois.
+    Le TF-IDF d'une paire est celui du texte du parent suivi de celui de l'enfant ; les comptes de mots
+    s'additionnant, les comptes de chaque texte sont gardés dans le cache et ceux de la paire sont leur somme.
+    Si le modèle a été entraîné avec les caractéristiques de pair_features, elles sont ajoutées.
+    """
+
+    def __init__(self, model_path='logistic_regression_model.joblib', vectorizer_path='tfidf_vectorizer.joblib',
+                 features_path='pair_features.joblib', cache_size=100000):
+        self.model = joblib.load(model_path)
+        self.vectorizer = joblib.load(vectorizer_path)
+        width = len(self.vectorizer.vocabulary_)
+        self.pair_features = None
+        if self.model.n_features_in_ != width:
+            # Le premier script ajoute les caractéristiques des paires après le TF-IDF
+            self.pair_features = joblib.load(features_path)
+        # La somme des comptes n'est celle du texte concaténé que pour des mots seuls sans tf sublinéaire
+        self.additive = self.vectorizer.ngram_range == (1, 1) and not self.vectorizer.sublinear_tf
+        self.cache = LRUCache(cache_size)
+
+    def _counts(self, texts):
+        counts = CountVectorizer.transform(self.vectorizer, texts).tocsr()
+        return [counts[i] for i in range(counts.shape[0])]
+
+    def transform(self, arguments1, arguments2):
+        if self.additive:
+            rows1 = self.cache.lookup(arguments1, self._counts)
+            rows2 = self.cache.lookup(arguments2, self._counts)
+            counts = sp.vstack(rows1, format='csr') + sp.vstack(rows2, format='csr')
+            X = counts @ sp.diags(self.vectorizer.idf_)
+            if self.vectorizer.norm:
+                X = normalize(X, norm=self.vectorizer.norm)
+        else:
+            X = self.vectorizer.transform([a + ' ' + b for a, b in zip(arguments1, arguments2)])
+        if self.pair_features is not None:
+            X = sp.hstack([X, self.pair_features.transform(arguments1, arguments2).values]).tocsr()
+        return X
+
+    def predict_proba_batch(self, pairs):
+        """Probabilité de 'Support' pour chaque paire."""
+        arguments1, arguments2 = _pair_texts(pairs)
+        if not arguments1:
+            return np.empty(0)
+        return self.model.predict_proba(self.transform(arguments1, arguments2))[:, 1]
+
+    def predict_batch(self, pairs):
+        """Relation prédite ('Attack' ou 'Support') pour chaque paire."""
+        return LABELS[(self.predict_proba_batch(pairs) > 0.5).astype(int)].tolist()
+
+
+class LSTMRelationModel:
+    """
+    Modèle LSTM enregistré par LSTMTraining.py (best_model.h5 et lstm_tokenizer.json), chargé une fois.
+    La séquence complétée de chaque texte est gardée dans le cache et toutes les paires d'un lot
+    sont évaluées par un seul appel à predict.
+    """
+
+    def __init__(self, model_path='best_model.h5', tokenizer_path='lstm_tokenizer.json', max_len=100,
+                 cache_size=100000, batch_size=256):
+        # TensorFlow n'est importé que pour ce modèle
+        import tensorflow as tf
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
+        from tensorflow.keras.preprocessing.text import tokenizer_from_json
+
+        self.model = tf.keras.models.load_model(model_path)
+        with open(tokenizer_path, encoding='utf-8') as f:
+            self.tokenizer = tokenizer_from_json(f.read())
+        self.pad_sequences = pad_sequences
+        self.max_len = max_len
+        self.batch_size = batch_size
+        self.cache = LRUCache(cache_size)
+
+    def _sequences(self, texts):
+        return list(self.pad_sequences(self.tokenizer.texts_to_sequences(texts), maxlen=self.max_len, padding='post'))
+
+    def predict_proba_batch(self, pairs):
+        """Probabilité de 'Support' pour chaque paire."""
+        arguments1, arguments2 = _pair_texts(pairs)
+        if not arguments1:
+            return np.empty(0)
+        X1 = np.array(self.cache.lookup(arguments1, self._sequences))
+        X2 = np.array(self.cache.lookup(arguments2, self._sequences))
+        return self.model.predict([X1, X2], batch_size=self.batch_size, verbose=0)[:, 0]
+
+    def predict_batch(self, pairs):
+        """Relation prédite ('Attack' ou 'Support') pour chaque paire."""
+        return LABELS[(self.predict_proba_batch(pairs) > 0.5).astype(int)].tolist()
+
+
+MODELS = {'logistic': LogisticRelationModel, 'lstm': LSTMRelationModel}
+
+
+def load_model(kind='logistic', artifacts_dir='.', cache_size=100000):
+    """Charge les fichiers enregistrés par le script d'entraînement du modèle depuis artifacts_dir."""
+    if kind == 'logistic':
+        return LogisticRelationModel(os.path.join(artifacts_dir, 'logistic_regression_model.joblib'),
+                                     os.path.join(artifacts_dir, 'tfidf_vectorizer.joblib'),
+                                     os.path.join(artifacts_dir, 'pair_features.joblib'), cache_size)
+    if kind == 'lstm':
+        return LSTMRelationModel(os.path.join(artifacts_dir, 'best_model.h5'),
+                                 os.path.join(artifacts_dir, 'lstm_tokenizer.json'), cache_size=cache_size)
+    raise ValueError(f"Modèle inconnu : {kind}")
+
+
+def iter_pair_chunks(path, chunk_size=10000):
+    """Lit un CSV ou un fichier Parquet de paires par blocs, avec toutes ses colonnes."""
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def score_file(model, input_file, output_file, chunk_size=10000):
+    """
+    Ajoute à chaque paire du fichier la relation prédite et la probabilité de 'Support', bloc par bloc,
+    en écrivant chaque bloc dans le CSV de sortie dès qu'il est évalué. Renvoie le nombre de paires.
+    """
+    count = 0
+    for k, chunk in enumerate(iter_pair_chunks(input_file, chunk_size)):
+        proba = model.predict_proba_batch(chunk)
+        chunk['Predicted'] = LABELS[(proba > 0.5).astype(int)]
+        chunk['Support_probability'] = proba
+        chunk.to_csv(output_file, mode='w' if k == 0 else 'a', header=k == 0, index=False)
+        count += len(chunk)
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prédit la relation de paires d'arguments avec un modèle enregistré")
+    parser.add_argument('input_file', help="CSV ou fichier Parquet avec les colonnes Argument1 et Argument2")
+    parser.add_argument('output_file', nargs='?', default='predictions.csv')
+    parser.add_argument('--model', choices=list(MODELS), default='logistic')
+    parser.add_argument('--artifacts-dir', default='.')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--cache-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    model = load_model(args.model, args.artifacts_dir, args.cache_size)
+    count = score_file(model, args.input_file, args.output_file, args.chunk_size)
+    print(f"{count} paires évaluées, {model.cache.hits} textes trouvés dans le cache sur {model.cache.hits + model.cache.misses}")
@@ -0,0 +1,171 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Une ligne commençant par un numéro hiérarchique (1., 1.2., 1.2.3.) ouvre un nouveau noeud
+NUMBER = re.compile(r'^\s*(\d+(?:\.\d+)*)\.\s*(.*)$')
+STANCE = re.compile(r'(Thesis|Pro|Con):\s*(.*)', re.DOTALL)
+RELATIONS = {"Pro": "Support", "Con": "Attack"}
+
+# Une ligne par noeud du débat, la thèse n'ayant ni parent ni relation
+SCHEMA = pa.schema([
+    ("debate_id", pa.string()),
+    ("node_id", pa.string()),
+    ("parent_id", pa.string()),
+    ("depth", pa.int32()),
+    ("stance", pa.string()),
+    ("relation", pa.string()),
+    ("text", pa.string()),
+])
+
+
+def file_hash(file_path):
+    """Empreinte SHA-256 du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_export(file_path):
+    """
+    Lit un export texte Kialo ligne par ligne et renvoie ses noeuds sous forme de colonnes.
+    Le parent d'un noeud est son plus proche ancêtre présent dans l'export (les liens et
+    noeuds sans Thesis/Pro/Con ne sont pas gardés), l'identifiant du débat est le nom du fichier.
+    """
+    debate_id = os.path.splitext(os.path.basename(file_path))[0]
+    columns = {name: [] for name in SCHEMA.names}
+    ids = set()
+    number, lines = None, []
+
+    def flush():
+        if number is None:
+            return
+        match = STANCE.match("\n".join(lines).strip())
+        if not match:
+            return
+        stance, text = match.groups()
+        parts = number.split('.')
+        parent_id = None
+        if stance != "Thesis":
+            # Remonter jusqu'au premier ancêtre présent
+            for k in range(len(parts) - 1, 0, -1):
+                candidate = '.'.join(parts[:k])
+                if candidate in ids:
+                    parent_id = candidate
+                    break
+        ids.add(number)
+        columns["debate_id"].append(debate_id)
+        columns["node_id"].append(number)
+        columns["parent_id"].append(parent_id)
+        columns["depth"].append(len(parts) - 1)
+        columns["stance"].append(stance)
+        columns["relation"].append(RELATIONS.get(stance))
+        columns["text"].append(text.strip())
+
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            # Les sources à la fin de l'export ne font pas partie du débat
+            if line.startswith('Sources:'):
+                break
+            match = NUMBER.match(line)
+            if match:
+                flush()
+                number, lines = match.group(1), [match.group(2)]
+            elif number is not None:
+                lines.append(line.rstrip('\n'))
+    flush()
+    return columns
+
+
+def _process_file(task):
+    # Exécuté dans un processus du pool : le fichier n'est analysé que si son contenu a changé
+    file_path, previous_hash = task
+    digest = file_hash(file_path)
+    if digest == previous_hash:
+        return file_path, digest, None
+    return file_path, digest, parse_export(file_path)
+
+
+def process_all_files(input_directory, output_file, workers=None):
+    """
+    Analyse tous les exports d'un dossier en parallèle et écrit leurs noeuds dans un seul fichier Parquet.
+    Un manifeste à côté du fichier garde l'empreinte de chaque export, de sorte qu'une nouvelle exécution
+    ne relit que les exports nouveaux ou modifiés et reprend les autres noeuds du fichier précédent.
+    Renvoie le nombre d'exports analysés.
+    """
+    manifest_file = output_file + '.manifest.json'
+    manifest = {}
+    if os.path.exists(output_file) and os.path.exists(manifest_file):
+        with open(manifest_file, encoding='utf-8') as file:
+            manifest = json.load(file)
+
+    file_paths = sorted(glob.glob(os.path.join(input_directory, '*.txt')))
+    tasks = [(path, manifest.get(os.path.basename(path))) for path in file_paths]
+    new_manifest = {}
+    parsed = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_path, digest, columns in executor.map(_process_file, tasks, chunksize=16):
+            new_manifest[os.path.basename(file_path)] = digest
+            if columns is not None:
+                parsed[file_path] = columns
+
+    # Rien à réécrire si aucun export n'a été ajouté, modifié ou supprimé
+    if not parsed and new_manifest == manifest:
+        return 0
+
+    # Reprendre les noeuds des exports inchangés depuis le fichier précédent
+    unchanged = [os.path.splitext(os.path.basename(path))[0] for path in file_paths if path not in parsed]
+    previous = None
+    if unchanged:
+        previous = pq.read_table(output_file, filters=[('debate_id', 'in', unchanged)], schema=SCHEMA)
+    tables = []
+    for file_path in file_paths:
+        if file_path in parsed:
+            tables.append(pa.Table.from_pydict(parsed[file_path], schema=SCHEMA))
+    if previous is not None:
+        tables.append(previous)
+    table = pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+
+    # Écrire dans un fichier temporaire puis le renommer pour ne jamais laisser de fichier partiel
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    pq.write_table(table, output_file + '.tmp')
+    os.replace(output_file + '.tmp', output_file)
+    with open(manifest_file, 'w', encoding='utf-8') as file:
+        json.dump(new_manifest, file, indent=1, sort_keys=True)
+    return len(parsed)
+
+
+def to_relations(nodes):
+    """
+    Construit les triplets (Argument1, Argument2, Relation) de combined_arguments.csv à partir des noeuds,
+    Argument1 étant le texte du parent et Argument2 celui de l'enfant.
+    """
+    parents = nodes[['debate_id', 'node_id', 'text']].rename(columns={'node_id': 'parent_id', 'text': 'Argument1'})
+    children = nodes[nodes['parent_id'].notna()]
+    pairs = children.merge(parents, on=['debate_id', 'parent_id'])
+    pairs = pairs[(pairs['Argument1'] != '') & (pairs['text'] != '')]
+    return pairs.rename(columns={'text': 'Argument2', 'relation': 'Relation'})[['Argument1', 'Argument2', 'Relation']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Analyse les exports Kialo et écrit les noeuds des débats en Parquet")
+    parser.add_argument('input_directory', nargs='?', default='rawData/kialo/debates/')
+    parser.add_argument('output_file', nargs='?', default='datasets/kialo_nodes.parquet')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--relations', default=None, help="écrit aussi les triplets au format de combined_arguments.csv")
+    args = parser.parse_args()
+
+    count = process_all_files(args.input_directory, args.output_file, args.workers)
+    print(f"{count} exports analysés")
+    if args.relations:
+        to_relations(pd.read_parquet(args.output_file)).to_csv(args.relations, index=False)
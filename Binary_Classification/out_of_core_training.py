@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from pair_dataset import EDGES_FILE, load_texts
+
+CLASSES = np.array([0, 1])  # 'Attack' -> 0, 'Support' -> 1
+
+
+def iter_chunks(source, chunk_size=100000):
+    """
+    Lit les paires par blocs de chunk_size lignes, sous la forme d'un DataFrame (Argument1, Argument2, Relation).
+    La source peut être un CSV de triplets, un fichier Parquet avec les mêmes colonnes ou un dossier
+    de pair_dataset ; dans ce dernier cas seule la table des textes uniques est chargée, les arêtes
+    étant lues par blocs.
+    """
+    if os.path.isdir(source):
+        texts = load_texts(source)
+        edges = pq.ParquetFile(os.path.join(source, EDGES_FILE))
+        for batch in edges.iter_batches(batch_size=chunk_size, columns=['parent_id', 'child_id', 'relation']):
+            chunk = batch.to_pandas()
+            yield pd.DataFrame({
+                'Argument1': texts[chunk['parent_id'].values],
+                'Argument2': texts[chunk['child_id'].values],
+                'Relation': chunk['relation'].astype(str).values,
+            })
+    elif source.endswith('.parquet'):
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size, columns=['Argument1', 'Argument2', 'Relation']):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, usecols=['Argument1', 'Argument2', 'Relation'], chunksize=chunk_size)
+
+
+def held_out_mask(chunk, test_percent):
+    """
+    Répartit les paires entre entraînement et évaluation selon l'empreinte de leurs textes, de sorte
+    qu'une paire est toujours du même côté, à chaque époque et quel que soit le découpage en blocs.
+    """
+    hashes = pd.util.hash_pandas_object(chunk[['Argument1', 'Argument2']], index=False).values
+    return (hashes % 100) < test_percent
+
+
+def _prepare(chunk):
+    chunk = chunk.dropna(subset=['Argument1', 'Argument2', 'Relation'])
+    texts = (chunk['Argument1'].astype(str) + ' ' + chunk['Argument2'].astype(str)).values
+    y = (chunk['Relation'] == 'Support').astype(int).values
+    return chunk, texts, y
+
+
+def evaluate(model, vectorizer, source, test_percent, chunk_size):
+    """Log loss et accuracy sur le flux d'évaluation, calculées bloc par bloc avec un seul predict_proba."""
+    total, loss, correct = 0, 0.0, 0
+    for chunk in iter_chunks(source, chunk_size):
+        chunk, texts, y = _prepare(chunk)
+        mask = held_out_mask(chunk, test_percent)
+        if not mask.any():
+            continue
+        proba = model.predict_proba(vectorizer.transform(texts[mask]))
+        y_test = y[mask]
+        p = np.clip(proba[np.arange(len(y_test)), y_test], 1e-15, 1)
+        loss -= np.log(p).sum()
+        correct += (proba.argmax(axis=1) == y_test).sum()
+        total += len(y_test)
+    if total == 0:
+        return {'loss': None, 'accuracy': None, 'count': 0}
+    return {'loss': float(loss / total), 'accuracy': float(correct / total), 'count': total}
+
+
+def train_out_of_core(source, n_features=2 ** 20, epochs=1, chunk_size=100000, test_percent=20, random_state=42):
+    """
+    Entraîne une régression logistique (SGD) sans jamais charger tout le jeu de données : les paires sont lues
+    par blocs, vectorisées par hachage (aucun vocabulaire à garder en mémoire) et apprises avec partial_fit.
+    La mémoire utilisée dépend de chunk_size et de n_features, pas de la taille du jeu de données.
+    Renvoie le modèle, le vectoriseur et les métriques d'évaluation de chaque époque.
+    """
+    # Le texte d'une paire est celui du parent suivi de celui de l'enfant, comme pour le TF-IDF
+    vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm='l2')
+    model = SGDClassifier(loss='log_loss', random_state=random_state)
+    history = []
+    for epoch in range(epochs):
+        trained = 0
+        for chunk in iter_chunks(source, chunk_size):
+            chunk, texts, y = _prepare(chunk)
+            mask = ~held_out_mask(chunk, test_percent)
+            if not mask.any():
+                continue
+            model.partial_fit(vectorizer.transform(texts[mask]), y[mask], classes=CLASSES)
+            trained += int(mask.sum())
+        metrics = {'epoch': epoch + 1, 'trained': trained, **evaluate(model, vectorizer, source, test_percent, chunk_size)}
+        history.append(metrics)
+        print(f"Époque {epoch + 1}: {trained} paires d'entraînement, "
+              f"loss {metrics['loss']}, accuracy {metrics['accuracy']} sur {metrics['count']} paires d'évaluation")
+    return model, vectorizer, history
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Entraînement hors mémoire par hachage et partial_fit")
+    parser.add_argument('source', nargs='?', default='pair_dataset', help="CSV, fichier Parquet ou dossier de pair_dataset")
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--n-features', type=int, default=2 ** 20)
+    parser.add_argument('--test-percent', type=int, default=20)
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    model, vectorizer, history = train_out_of_core(args.source, args.n_features, args.epochs, args.chunk_size, args.test_percent)
+    os.makedirs(args.output_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(args.output_dir, 'sgd_hashing_model.joblib'))
+    joblib.dump(vectorizer, os.path.join(args.output_dir, 'hashing_vectorizer.joblib'))
+    with open(os.path.join(args.output_dir, 'sgd_hashing_metrics.json'), 'w') as f:
+        json.dump(history, f, indent=1)
+    print("\nModèle enregistré avec succès.")
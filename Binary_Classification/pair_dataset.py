@@ -0,0 +1,152 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+
+# Le jeu de données est un dossier contenant une table des textes uniques et une table des arêtes
+# (parent_id, child_id, relation, debate_id) qui ne référence les textes que par leur identifiant
+TEXTS_FILE = 'texts.parquet'
+EDGES_FILE = 'edges.parquet'
+
+TEXTS_SCHEMA = pa.schema([("text_id", pa.int32()), ("text", pa.string())])
+EDGES_SCHEMA = pa.schema([
+    ("parent_id", pa.int32()),
+    ("child_id", pa.int32()),
+    ("relation", pa.dictionary(pa.int8(), pa.string())),
+    ("debate_id", pa.dictionary(pa.int32(), pa.string())),
+])
+
+
+def intern_pairs(parents, children, relations, debate_ids=None):
+    """
+    Remplace les textes des paires par des identifiants, chaque texte distinct n'étant gardé qu'une fois.
+    Renvoie la table des textes et la table des arêtes.
+    """
+    codes, uniques = pd.factorize(pd.concat([pd.Series(parents), pd.Series(children)], ignore_index=True))
+    n = len(parents)
+    texts = pd.DataFrame({'text_id': np.arange(len(uniques), dtype=np.int32), 'text': uniques.astype(object)})
+    edges = pd.DataFrame({
+        'parent_id': codes[:n].astype(np.int32),
+        'child_id': codes[n:].astype(np.int32),
+        'relation': pd.Categorical(relations),
+        'debate_id': pd.Categorical(debate_ids if debate_ids is not None else [None] * n),
+    })
+    return texts, edges
+
+
+def build_from_csv(csv_file):
+    """Construit le jeu de données à partir d'un CSV de triplets (Argument1, Argument2, Relation)."""
+    data = pd.read_csv(csv_file, usecols=['Argument1', 'Argument2', 'Relation'])
+    return intern_pairs(data['Argument1'].values, data['Argument2'].values, data['Relation'].values)
+
+
+def build_from_nodes(nodes):
+    """Construit le jeu de données à partir des noeuds écrits par kialo_parser, en gardant le débat de chaque arête."""
+    parents = nodes[['debate_id', 'node_id', 'text']].rename(columns={'node_id': 'parent_id', 'text': 'parent_text'})
+    pairs = nodes[nodes['parent_id'].notna()].merge(parents, on=['debate_id', 'parent_id'])
+    pairs = pairs[(pairs['parent_text'] != '') & (pairs['text'] != '')]
+    return intern_pairs(pairs['parent_text'].values, pairs['text'].values, pairs['relation'].values, pairs['debate_id'].values)
+
+
+def save_dataset(texts, edges, output_dir):
+    """Écrit les deux tables en Parquet dans le dossier donné."""
+    os.makedirs(output_dir, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(texts, schema=TEXTS_SCHEMA, preserve_index=False), os.path.join(output_dir, TEXTS_FILE))
+    pq.write_table(pa.Table.from_pandas(edges, schema=EDGES_SCHEMA, preserve_index=False), os.path.join(output_dir, EDGES_FILE))
+
+
+def load_texts(dataset_dir):
+    """Charge seulement la table des textes, sous la forme d'un tableau indexé par text_id."""
+    texts = pq.read_table(os.path.join(dataset_dir, TEXTS_FILE)).to_pandas()
+    # Les identifiants sont attribués dans l'ordre, mais on ne s'y fie pas
+    text_array = np.empty(len(texts), dtype=object)
+    text_array[texts['text_id'].values] = texts['text'].values
+    return text_array
+
+
+def load_dataset(dataset_dir):
+    """
+    Charge le jeu de données. Renvoie le tableau des textes, indexé par text_id, et la table des arêtes.
+    """
+    edges = pq.read_table(os.path.join(dataset_dir, EDGES_FILE)).to_pandas()
+    return load_texts(dataset_dir), edges
+
+
+def load_pairs(dataset_dir):
+    """
+    Charge le jeu de données sous la forme de combined_arguments.csv (Argument1, Argument2, Relation).
+    Les cellules d'un même texte référencent le même objet, le texte n'est donc en mémoire qu'une fois.
+    """
+    texts, edges = load_dataset(dataset_dir)
+    return pd.DataFrame({
+        'Argument1': texts[edges['parent_id'].values],
+        'Argument2': texts[edges['child_id'].values],
+        'Relation': edges['relation'].astype(str).values,
+    })
+
+
+class PairTfidfVectorizer:
+    """
+    TF-IDF des paires d'arguments, une paire étant le texte du parent suivi de celui de l'enfant.
+    Les comptes de mots de la concaténation étant la somme des comptes des deux textes, chaque texte unique
+    n'est tokenisé qu'une fois et les comptes des paires sont obtenus en additionnant des lignes. Le résultat
+    est celui de TfidfVectorizer(max_features) appliqué aux textes concaténés.
+    """
+
+    def __init__(self, max_features=None, **count_params):
+        self.max_features = max_features
+        self.count_vectorizer = CountVectorizer(**count_params)
+
+    def fit_texts(self, texts):
+        # Tokeniser une seule fois chaque texte unique
+        self.text_counts_ = self.count_vectorizer.fit_transform(texts).tocsr()
+        return self
+
+    def pair_counts(self, parent_ids, child_ids):
+        return self.text_counts_[parent_ids] + self.text_counts_[child_ids]
+
+    def fit_transform(self, parent_ids, child_ids):
+        counts = self.pair_counts(parent_ids, child_ids)
+        # Garder les max_features mots les plus fréquents parmi ceux présents dans les paires d'entraînement,
+        # dans l'ordre alphabétique du vocabulaire comme TfidfVectorizer ; le tri est celui de
+        # CountVectorizer._limit_features (argsort par défaut, non stable) pour départager les ex aequo de la même façon
+        totals = np.asarray(counts.sum(axis=0)).ravel()
+        present = np.flatnonzero(totals)
+        if self.max_features is not None and len(present) > self.max_features:
+            present = np.sort(present[(-totals[present]).argsort()[:self.max_features]])
+        self.columns_ = present
+        self.tfidf_ = TfidfTransformer()
+        return self.tfidf_.fit_transform(counts[:, self.columns_])
+
+    def transform(self, parent_ids, child_ids):
+        return self.tfidf_.transform(self.pair_counts(parent_ids, child_ids)[:, self.columns_])
+
+    def to_text_vectorizer(self):
+        """
+        Renvoie un TfidfVectorizer équivalent qui s'applique directement aux textes concaténés,
+        pour l'enregistrer avec le modèle et faire des prédictions sur de nouvelles paires.
+        """
+        terms = self.count_vectorizer.get_feature_names_out()[self.columns_]
+        params = {key: value for key, value in self.count_vectorizer.get_params().items() if key not in ('vocabulary', 'max_features', 'dtype')}
+        vectorizer = TfidfVectorizer(vocabulary=list(terms), **params)
+        vectorizer.fit(list(terms))
+        vectorizer.idf_ = self.tfidf_.idf_
+        return vectorizer
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Construit le jeu de données de paires avec une table de textes uniques")
+    parser.add_argument('source', nargs='?', default='combined_arguments.csv', help="CSV de triplets ou noeuds Parquet de kialo_parser")
+    parser.add_argument('output_dir', nargs='?', default='pair_dataset')
+    args = parser.parse_args()
+
+    if args.source.endswith('.parquet'):
+        texts, edges = build_from_nodes(pd.read_parquet(args.source))
+    else:
+        texts, edges = build_from_csv(args.source)
+    save_dataset(texts, edges, args.output_dir)
+    print(f"{len(edges)} paires, {len(texts)} textes uniques")
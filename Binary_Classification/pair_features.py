@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# Caractéristiques d'une paire (parent, enfant), toutes comprises entre 0 et 1
+FEATURES = ['cosine', 'jaccard', 'overlap', 'token_length_ratio', 'char_length_ratio']
+
+
+def _ratio(a, b):
+    # min/max ligne à ligne, 1 pour deux longueurs nulles
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    return np.divide(low, high, out=np.ones_like(low, dtype=float), where=high > 0)
+
+
+def _row_dot(A, B):
+    # Produit scalaire de chaque ligne de A avec la ligne de même rang de B, sans matrice dense
+    return np.asarray(A.multiply(B).sum(axis=1)).ravel()
+
+
+def _features(tfidf, counts, chars, parent_rows, child_rows):
+    """
+    Calcule toutes les caractéristiques des paires en un seul passage sur les matrices creuses.
+    tfidf contient les lignes normalisées des textes, counts leurs comptes de mots et chars leurs longueurs,
+    les paires étant données par les lignes du parent et de l'enfant.
+    """
+    binary = counts.copy()
+    binary.data = np.ones_like(binary.data)
+    intersection = _row_dot(binary[parent_rows], binary[child_rows])
+    words = np.asarray(binary.sum(axis=1)).ravel()
+    tokens = np.asarray(counts.sum(axis=1)).ravel()
+    parent_words, child_words = words[parent_rows], words[child_rows]
+    union = parent_words + child_words - intersection
+    smallest = np.minimum(parent_words, child_words)
+    return pd.DataFrame({
+        'cosine': _row_dot(tfidf[parent_rows], tfidf[child_rows]),
+        'jaccard': np.divide(intersection, union, out=np.zeros(len(union)), where=union > 0),
+        'overlap': np.divide(intersection, smallest, out=np.zeros(len(smallest)), where=smallest > 0),
+        'token_length_ratio': _ratio(tokens[parent_rows], tokens[child_rows]),
+        'char_length_ratio': _ratio(chars[parent_rows], chars[child_rows]),
+    }, columns=FEATURES)
+
+
+class PairFeatures:
+    """
+    Caractéristiques de similarité des paires d'arguments : cosinus TF-IDF, indice de Jaccard et coefficient
+    de recouvrement des mots, rapports des longueurs en mots et en caractères.
+    Chaque texte unique de la table des textes n'est vectorisé qu'une fois, les caractéristiques de toutes les
+    paires étant ensuite calculées ligne à ligne sur les matrices creuses.
+    Le TF-IDF est celui de TfidfVectorizer ajusté sur les textes de toutes les paires (un texte comptant autant
+    de fois qu'il apparaît), sans avoir à répéter les textes.
+    """
+
+    def __init__(self, **count_params):
+        self.count_vectorizer = CountVectorizer(**count_params)
+
+    def fit(self, texts, parent_ids=None, child_ids=None):
+        """
+        Vectorise les textes uniques. Si les paires sont données, les fréquences documentaires comptent chaque
+        texte autant de fois qu'il apparaît dans ces paires et les mots absents de ces paires sont ignorés
+        par le cosinus, comme des mots hors vocabulaire ; sinon chaque texte compte une fois.
+        """
+        self.counts_ = self.count_vectorizer.fit_transform(texts).tocsr()
+        if parent_ids is None:
+            weights = np.ones(len(texts))
+        else:
+            weights = np.bincount(np.concatenate([parent_ids, child_ids]), minlength=len(texts)).astype(float)
+        presence = self.counts_.copy()
+        presence.data = np.ones_like(presence.data)
+        document_frequency = presence.T @ weights
+        # idf lissé de TfidfVectorizer, nul pour les mots qui n'apparaissent pas dans les paires
+        self.idf_ = np.log((1 + weights.sum()) / (1 + document_frequency)) + 1
+        self.idf_[document_frequency == 0] = 0
+        self.tfidf_ = self._tfidf(self.counts_)
+        self.chars_ = np.fromiter((len(text) for text in texts), dtype=float, count=len(texts))
+        return self
+
+    def _tfidf(self, counts):
+        return normalize(counts @ sp.diags(self.idf_))
+
+    def without_texts(self):
+        """
+        Renvoie une copie sans les matrices de la table des textes, qui suffit pour transform
+        et peut être enregistrée avec le modèle.
+        """
+        features = PairFeatures()
+        features.count_vectorizer = self.count_vectorizer
+        features.idf_ = self.idf_
+        return features
+
+    def transform_ids(self, parent_ids, child_ids):
+        """Caractéristiques des paires de textes de la table, données par leurs identifiants."""
+        return _features(self.tfidf_, self.counts_, self.chars_, parent_ids, child_ids)
+
+    def transform(self, arguments1, arguments2):
+        """
+        Caractéristiques de nouvelles paires de textes. Le cosinus utilise le vocabulaire et l'idf appris,
+        les mots communs et les longueurs sont comptés sur tous les mots des nouveaux textes.
+        """
+        arguments1, arguments2 = list(arguments1), list(arguments2)
+        codes, uniques = pd.factorize(pd.Series(arguments1 + arguments2, dtype=object))
+        uniques = list(uniques)
+        # Vocabulaire propre aux nouveaux textes pour ne perdre aucun mot dans les recouvrements
+        local = CountVectorizer(**self.count_vectorizer.get_params())
+        local.set_params(vocabulary=None, max_features=None, min_df=1, max_df=1.0)
+        try:
+            counts = local.fit_transform(uniques).tocsr()
+        except ValueError:
+            # Aucun mot dans les nouveaux textes
+            counts = sp.csr_matrix((len(uniques), 1))
+        tfidf = self._tfidf(self.count_vectorizer.transform(uniques))
+        chars = np.array([len(text) for text in uniques], dtype=float)
+        n = len(arguments1)
+        return _features(tfidf, counts, chars, codes[:n], codes[n:])
+
+
+def pair_features(df, column1='Argument1', column2='Argument2', **count_params):
+    """
+    Caractéristiques de toutes les paires d'un DataFrame de textes, chaque texte distinct des deux colonnes
+    n'étant vectorisé qu'une fois. Renvoie un DataFrame aligné sur df.
+    """
+    codes, uniques = pd.factorize(pd.concat([df[column1], df[column2]], ignore_index=True))
+    n = len(df)
+    features = PairFeatures(**count_params).fit(np.asarray(uniques, dtype=object), codes[:n], codes[n:])
+    return features.transform_ids(codes[:n], codes[n:]).set_axis(df.index)
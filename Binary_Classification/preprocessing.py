@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import os
+import re
+import string
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from langdetect import DetectorFactory, detect
+from langdetect.detector_factory import init_factory
+from langdetect.lang_detect_exception import LangDetectException
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+CACHE_SCHEMA = pa.schema([("hash", pa.string()), ("result", pa.string())])
+
+# Ressources chargées une seule fois par processus, au premier appel ou à l'initialisation du worker
+_stop_words = None
+_lemmatizer = None
+_langdetect_ready = False
+
+
+def _get_stop_words():
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = set(stopwords.words('english'))
+    return _stop_words
+
+
+def _get_lemmatizer():
+    global _lemmatizer
+    if _lemmatizer is None:
+        _lemmatizer = WordNetLemmatizer()
+        # WordNet n'est lu qu'au premier appel
+        _lemmatizer.lemmatize('arguments')
+    return _lemmatizer
+
+
+def _init_langdetect():
+    global _langdetect_ready
+    if not _langdetect_ready:
+        # La détection est aléatoire, une graine fixe rend le résultat de chaque texte reproductible
+        DetectorFactory.seed = 0
+        init_factory()
+        _langdetect_ready = True
+
+
+def clean_text(text):
+    # Remove references such as -> See 1.1.3.1.3.1.
+    text = re.sub(r'-> See (\d+\.)+(\d+)(,\s*)?', '', text)
+    # Remove patterns like [12], [1], [138]
+    text = re.sub(r'\[\d+\]', '', text)
+    if text:
+        # Lowercase
+        text = text.lower()
+        # Remove punctuation
+        text = re.sub(r'[^\w\s]', '', text)
+        text = re.sub(f"[{string.punctuation}]", "", text)
+        # Tokenize the text and remove stopwords
+        tokens = word_tokenize(text)
+        stop_words = _get_stop_words()
+        text = " ".join(word for word in tokens if word not in stop_words)
+    return text
+
+
+def lemmatize(text):
+    lemmatizer = _get_lemmatizer()
+    return " ".join(lemmatizer.lemmatize(token) for token in word_tokenize(text))
+
+
+def detect_language(text):
+    _init_langdetect()
+    try:
+        return detect(text)
+    except LangDetectException:
+        return 'unk'
+
+
+# Étapes disponibles, appliquées dans l'ordre donné, avec les ressources qu'elles utilisent
+STEPS = {'clean': clean_text, 'lemmatize': lemmatize, 'language': detect_language}
+RESOURCES = {'clean': _get_stop_words, 'lemmatize': _get_lemmatizer, 'language': _init_langdetect}
+
+
+def _load_resources(steps):
+    # Initialisation des processus du pool : charger les ressources avant le premier lot
+    for step in steps:
+        RESOURCES[step]()
+
+
+def _process_batch(task):
+    # Exécuté dans un processus du pool
+    steps, texts = task
+    results = []
+    for text in texts:
+        for step in steps:
+            text = STEPS[step](text)
+        results.append(text)
+    return results
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TextCache:
+    """
+    Cache sur disque des textes prétraités, un fichier Parquet par suite d'étapes,
+    chaque résultat étant indexé par l'empreinte SHA-256 du texte d'origine.
+    """
+
+    def __init__(self, cache_dir, steps):
+        self.path = os.path.join(cache_dir, '+'.join(steps) + '.parquet')
+        self.entries = {}
+        self.added = False
+        if os.path.exists(self.path):
+            table = pq.read_table(self.path)
+            self.entries = dict(zip(table.column('hash').to_pylist(), table.column('result').to_pylist()))
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def add(self, keys, results):
+        self.entries.update(zip(keys, results))
+        self.added = True
+
+    def save(self):
+        """Réécrit le fichier s'il y a de nouveaux résultats, via un fichier temporaire renommé."""
+        if not self.added:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        table = pa.table({'hash': list(self.entries), 'result': list(self.entries.values())}, schema=CACHE_SCHEMA)
+        pq.write_table(table, self.path + '.tmp')
+        os.replace(self.path + '.tmp', self.path)
+        self.added = False
+
+
+def preprocess(texts, steps=('clean',), cache_dir='preprocessing_cache', workers=None, batch_size=1000):
+    """
+    Applique les étapes aux textes et renvoie les résultats dans le même ordre.
+    Chaque texte distinct n'est traité qu'une fois, les textes déjà présents dans le cache ne sont pas
+    retraités et les autres sont traités par lots dans un pool de processus, chaque processus ne chargeant
+    qu'une fois les ressources des étapes (stopwords, WordNet, profils de langues). Les valeurs qui ne sont pas des textes (NaN) sont gardées telles quelles.
+    """
+    steps = tuple(steps)
+    for step in steps:
+        if step not in STEPS:
+            raise ValueError(f"Étape inconnue : {step}")
+    values = pd.Series(texts, dtype=object)
+    is_text = values.map(lambda value: isinstance(value, str)).values
+    codes, uniques = pd.factorize(values[is_text])
+    uniques = list(uniques)
+
+    cache = TextCache(cache_dir, steps) if cache_dir else None
+    keys = [text_hash(text) for text in uniques] if cache else []
+    results = [cache.get(key) for key in keys] if cache else [None] * len(uniques)
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        tasks = [(steps, [uniques[i] for i in batch]) for batch in batches]
+        if workers == 1 or len(batches) == 1:
+            outputs = map(_process_batch, tasks)
+            for batch, output in zip(batches, outputs):
+                for i, result in zip(batch, output):
+                    results[i] = result
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_load_resources, initargs=(steps,)) as executor:
+                for batch, output in zip(batches, executor.map(_process_batch, tasks)):
+                    for i, result in zip(batch, output):
+                        results[i] = result
+        if cache:
+            cache.add([keys[i] for i in missing], [results[i] for i in missing])
+            cache.save()
+
+    output = values.copy()
+    output[is_text] = [results[code] for code in codes]
+    return output.tolist()
+
+
+def preprocess_columns(df, columns=('Argument1', 'Argument2'), steps=('clean',), output_columns=None, **kwargs):
+    """
+    Prétraite plusieurs colonnes en une fois, un texte présent dans plusieurs lignes ou colonnes
+    (un parent et ses enfants) n'étant traité qu'une fois. Les résultats remplacent les colonnes,
+    ou sont écrits dans output_columns. Renvoie une copie du DataFrame.
+    """
+    df = df.copy()
+    columns = list(columns)
+    stacked = pd.concat([df[column] for column in columns], ignore_index=True)
+    results = preprocess(stacked, steps, **kwargs)
+    for k, column in enumerate(output_columns or columns):
+        df[column] = results[k * len(df):(k + 1) * len(df)]
+    return df
+
+
+def detect_languages(df, columns=('Argument1', 'Argument2'), **kwargs):
+    """
+    Ajoute la langue de chaque colonne (Language1, Language2...), 'unk' si elle n'est pas reconnue.
+    Chaque texte unique n'est détecté qu'une fois, dans le pool de processus, et le résultat est gardé en cache.
+    """
+    output_columns = [f'Language{k + 1}' for k in range(len(columns))]
+    return preprocess_columns(df, columns, steps=('language',), output_columns=output_columns, **kwargs)
+
+
+def filter_language(df, language='en', columns=('Argument1', 'Argument2'), **kwargs):
+    """Garde les paires dont tous les arguments sont dans la langue donnée."""
+    languages = detect_languages(df[list(columns)], columns, **kwargs)
+    return df[(languages.drop(columns=list(columns)) == language).all(axis=1)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Nettoie, lemmatise et filtre par langue les arguments d'un CSV avec un cache sur disque")
+    parser.add_argument('input_file', nargs='?', default='combined_arguments.csv')
+    parser.add_argument('output_file', nargs='?', default='arguments_dataset_preprocessed.csv')
+    parser.add_argument('--steps', default='clean', help="étapes séparées par des virgules parmi : " + ', '.join(STEPS))
+    parser.add_argument('--cache-dir', default='preprocessing_cache')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--language', default=None, help="ne garde que les paires dans cette langue (par exemple en)")
+    args = parser.parse_args()
+
+    df = preprocess_columns(pd.read_csv(args.input_file), steps=args.steps.split(','),
+                            cache_dir=args.cache_dir, workers=args.workers)
+    # Retirer les lignes dont un argument est vide après nettoyage
+    df = df[~(df[['Argument1', 'Argument2']] == '').any(axis=1)]
+    if args.language:
+        df = filter_language(df, args.language, cache_dir=args.cache_dir, workers=args.workers)
+    df.to_csv(args.output_file, index=False)
+    print(f"{len(df)} paires prétraitées")
@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score, log_loss
+from sklearn.model_selection import train_test_split
+
+from kialo_parser import file_hash
+from pair_dataset import EDGES_FILE, TEXTS_FILE, PairTfidfVectorizer, build_from_csv, load_dataset, save_dataset
+
+MODELS = {'logistic': LogisticRegression, 'sgd': SGDClassifier}
+DEFAULT_MODEL_PARAMS = {
+    'logistic': {'random_state': 42, 'max_iter': 1000},
+    'sgd': {'random_state': 42},
+}
+
+# Grille utilisée sans fichier de configuration
+DEFAULT_GRID = {
+    'vectorizers': [{'max_features': 5000}, {'max_features': 10000}, {'max_features': 10000, 'ngram_range': [1, 2]}],
+    'models': [
+        {'model': 'logistic', 'C': 0.1}, {'model': 'logistic', 'C': 1.0}, {'model': 'logistic', 'C': 10.0},
+        {'model': 'sgd', 'loss': 'log_loss', 'alpha': 1e-5}, {'model': 'sgd', 'loss': 'log_loss', 'alpha': 1e-4},
+        {'model': 'sgd', 'loss': 'hinge', 'alpha': 1e-4}, {'model': 'sgd', 'loss': 'modified_huber', 'alpha': 1e-4},
+    ],
+}
+
+
+def _key(obj):
+    return json.dumps(obj, sort_keys=True)
+
+
+def _save_csr(matrix, prefix):
+    matrix = matrix.tocsr()
+    np.save(prefix + '_data.npy', matrix.data)
+    np.save(prefix + '_indices.npy', matrix.indices)
+    np.save(prefix + '_indptr.npy', matrix.indptr)
+    with open(prefix + '_shape.json', 'w') as f:
+        json.dump(list(matrix.shape), f)
+
+
+def _load_csr(prefix):
+    # Les tableaux sont projetés en mémoire : les processus du pool partagent les mêmes pages du cache système
+    arrays = [np.load(f'{prefix}_{name}.npy', mmap_mode='r') for name in ('data', 'indices', 'indptr')]
+    with open(prefix + '_shape.json') as f:
+        shape = tuple(json.load(f))
+    return sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+
+
+def vectorized_split(dataset_dir, vectorizer_params, cache_dir, test_size=0.2, random_state=42):
+    """
+    Renvoie le dossier contenant les matrices d'entraînement et de test pour ces paramètres du vectoriseur,
+    en ne vectorisant que si elles ne sont pas déjà en cache. La clé du cache dépend des paramètres,
+    du découpage et du contenu du jeu de données.
+    """
+    fingerprint = {
+        'vectorizer': vectorizer_params,
+        'test_size': test_size,
+        'random_state': random_state,
+        'dataset': [file_hash(os.path.join(dataset_dir, name)) for name in (TEXTS_FILE, EDGES_FILE)],
+    }
+    directory = os.path.join(cache_dir, hashlib.sha256(_key(fingerprint).encode()).hexdigest()[:16])
+    if os.path.exists(os.path.join(directory, 'done')):
+        return directory
+
+    texts, edges = load_dataset(dataset_dir)
+    parent_ids, child_ids = edges['parent_id'].values, edges['child_id'].values
+    y = (edges['relation'] == 'Support').astype(int).values
+    train_idx, test_idx, y_train, y_test = train_test_split(np.arange(len(edges)), y, test_size=test_size, random_state=random_state)
+    params = {name: tuple(value) if isinstance(value, list) else value for name, value in vectorizer_params.items()}
+    vectorizer = PairTfidfVectorizer(**params).fit_texts(texts)
+    os.makedirs(directory, exist_ok=True)
+    _save_csr(vectorizer.fit_transform(parent_ids[train_idx], child_ids[train_idx]), os.path.join(directory, 'X_train'))
+    _save_csr(vectorizer.transform(parent_ids[test_idx], child_ids[test_idx]), os.path.join(directory, 'X_test'))
+    np.save(os.path.join(directory, 'y_train.npy'), y_train)
+    np.save(os.path.join(directory, 'y_test.npy'), y_test)
+    with open(os.path.join(directory, 'config.json'), 'w') as f:
+        json.dump(fingerprint, f, indent=1)
+    # Marqueur écrit en dernier : un cache interrompu est recalculé
+    open(os.path.join(directory, 'done'), 'w').close()
+    return directory
+
+
+def run_model(task):
+    """Entraîne et évalue une configuration de modèle sur des matrices en cache, dans un processus du pool."""
+    directory, vectorizer_params, model_config = task
+    X_train, X_test = _load_csr(os.path.join(directory, 'X_train')), _load_csr(os.path.join(directory, 'X_test'))
+    y_train, y_test = np.load(os.path.join(directory, 'y_train.npy')), np.load(os.path.join(directory, 'y_test.npy'))
+    params = dict(model_config)
+    name = params.pop('model')
+    model = MODELS[name](**{**DEFAULT_MODEL_PARAMS[name], **params})
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    y_pred = model.predict(X_test)
+    # Certaines loss de SGDClassifier (hinge) ne donnent pas de probabilités
+    loss = log_loss(y_test, model.predict_proba(X_test)) if hasattr(model, 'predict_proba') else None
+    return {
+        'vectorizer': _key(vectorizer_params),
+        'model': name,
+        'params': _key(params),
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1': f1_score(y_test, y_pred),
+        'log_loss': loss,
+        'fit_seconds': fit_seconds,
+    }
+
+
+def run_sweep(dataset_dir, grid, cache_dir='sweep_cache', leaderboard_file='sweep_leaderboard.csv', workers=None):
+    """
+    Vectorise une fois chaque configuration du vectoriseur (ou la reprend du cache), puis répartit toutes les
+    configurations de modèles dans un pool de processus. Les résultats sont fusionnés avec le classement
+    existant, un nouveau résultat remplaçant l'ancien pour la même configuration, et classés par accuracy.
+    """
+    directories = [(vectorized_split(dataset_dir, params, cache_dir), params) for params in grid['vectorizers']]
+    tasks = [(directory, params, model) for (directory, params), model in itertools.product(directories, grid['models'])]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_model, task) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['model']} {result['params']} / {result['vectorizer']}: accuracy {result['accuracy']:.4f}")
+
+    leaderboard = pd.DataFrame(results)
+    if os.path.exists(leaderboard_file):
+        leaderboard = pd.concat([pd.read_csv(leaderboard_file), leaderboard], ignore_index=True)
+    leaderboard = leaderboard.drop_duplicates(subset=['vectorizer', 'model', 'params'], keep='last')
+    leaderboard = leaderboard.sort_values('accuracy', ascending=False, ignore_index=True)
+    leaderboard.to_csv(leaderboard_file, index=False)
+    return leaderboard
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Balayage d'hyperparamètres des modèles linéaires avec matrices en cache")
+    parser.add_argument('--config', default=None, help="JSON avec les listes 'vectorizers' et 'models'")
+    parser.add_argument('--dataset', default='pair_dataset')
+    parser.add_argument('--cache-dir', default='sweep_cache')
+    parser.add_argument('--leaderboard', default='sweep_leaderboard.csv')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.config:
+        with open(args.config) as f:
+            grid = json.load(f)
+    if not os.path.isdir(args.dataset):
+        save_dataset(*build_from_csv('combined_arguments.csv'), args.dataset)
+    leaderboard = run_sweep(args.dataset, grid, args.cache_dir, args.leaderboard, args.workers)
+    print("\nClassement:")
+    print(leaderboard.head(10).to_string())